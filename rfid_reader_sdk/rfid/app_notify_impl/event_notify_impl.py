@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Имплементация на AppNotify, която подава типизирани събития на абонати.
+
+Всяка рамка се декодира веднъж от четеца (get_tag_reads, get_response_status,
+get_tag_block) в събитие от rfid.reader.reader_events. Ако за събитието няма
+абонати, рамката не се декодира. Имплементациите с print() могат да се
+зададат като debug_notify и получават суровите рамки след абонатите.
+"""
+
+import time
+
+from rfid.reader.app_notify import AppNotify
+from rfid.reader.reader_events import (
+    TagReadEvent,
+    InventoryStartedEvent,
+    InventoryStoppedEvent,
+    ResetEvent,
+    BlockReadEvent,
+    TagOperationEvent,
+)
+
+
+class EventNotifyImpl(AppNotify):
+    """Имплементация на AppNotify с абонати за типизирани събития."""
+
+    # Получава и OPTIONAL_NOTIFY_HANDLERS на четеца (например старт и стоп на M четеца)
+    NOTIFY_OPTIONAL_RESPONSES = True
+
+    def __init__(self, reader, debug_notify=None):
+        """Инициализация.
+
+        Args:
+            reader (RfidReader): Четецът, чийто формат на рамки се декодира
+            debug_notify (AppNotify): Допълнителен получател на суровите рамки (например
+                GeneralReaderNotifyImpl за отпечатване) или None
+        """
+        self.reader = reader
+        self.debug_notify = debug_notify
+        # {клас на събитие: [функции]}
+        self._subscribers = {}
+        # {конкретен клас на събитие: tuple(функции за него и за родителите му)}
+        self._callbacks = {}
+        # Статистика за рамки с тагове, които не са декодирани
+        self.decode_error_count = 0
+        self.last_decode_error = None
+
+    def subscribe(self, event_class, callback):
+        """Абонира функция за събития от даден клас и наследниците му.
+
+        Args:
+            event_class (type): Клас на събитието (ReaderEvent - всички събития)
+            callback (callable): Функция callback(event)
+        """
+        self._subscribers.setdefault(event_class, []).append(callback)
+        self._callbacks.clear()
+
+    def unsubscribe(self, event_class, callback):
+        """Премахва абонамент.
+
+        Args:
+            event_class (type): Клас на събитието
+            callback (callable): Функцията, подадена на subscribe
+        """
+        callbacks = self._subscribers.get(event_class)
+
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            self._callbacks.clear()
+
+    def _get_callbacks(self, event_class):
+        """Връща абонатите за конкретен клас на събитие.
+
+        Args:
+            event_class (type): Клас на събитието
+
+        Returns:
+            tuple: Функции в реда на абонирането по класове от най-общия
+        """
+        callbacks = self._callbacks.get(event_class)
+
+        if callbacks is None:
+            callbacks = []
+
+            for klass in reversed(event_class.__mro__):
+                callbacks.extend(self._subscribers.get(klass, ()))
+
+            callbacks = tuple(callbacks)
+            self._callbacks[event_class] = callbacks
+
+        return callbacks
+
+    def publish(self, event):
+        """Подава събитие на абонатите му.
+
+        Args:
+            event (ReaderEvent): Събитие
+        """
+        for callback in self._get_callbacks(type(event)):
+            callback(event)
+
+    def _publish_tag_reads(self, get_tag_reads, message, start_index):
+        """Декодира тагове и подава TagReadEvent, ако има абонати.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        callbacks = self._get_callbacks(TagReadEvent)
+
+        if not callbacks:
+            return 0
+
+        receive_time = time.time()
+
+        try:
+            tag_reads = get_tag_reads(message, start_index, receive_time)
+        except ValueError as e:
+            # Без печат за всяка рамка - повреденият поток се вижда в get_statistics()
+            self.decode_error_count += 1
+            self.last_decode_error = str(e)
+            return -1
+
+        event = TagReadEvent(tag_reads, self.reader.key, receive_time)
+
+        for callback in callbacks:
+            callback(event)
+
+        return 0
+
+    def _publish_status(self, event_class, message, start_index, *args):
+        """Подава събитие със статуса на отговора, ако има абонати.
+
+        Args:
+            event_class (type): Клас на събитието
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+            *args: Полета на събитието преди статуса
+        """
+        callbacks = self._get_callbacks(event_class)
+
+        if not callbacks:
+            return
+
+        status = self.reader.get_response_status(message, start_index)
+        event = event_class(*args, status, self.reader.key, time.time())
+
+        for callback in callbacks:
+            callback(event)
+
+    def notify_recv_tags(self, message, start_index):
+        """Известяване за получени RFID тагове.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        result = self._publish_tag_reads(self.reader.get_tag_reads, message, start_index)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_recv_tags(message, start_index)
+
+        return result
+
+    def notify_inventory_once(self, message, start_index):
+        """Известяване за еднократна инвентаризация.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        result = self._publish_tag_reads(self.reader.get_identified_tag_reads, message, start_index)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_inventory_once(message, start_index)
+
+        return result
+
+    def notify_start_inventory(self, message, start_index):
+        """Известяване за начало на инвентаризация.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._publish_status(InventoryStartedEvent, message, start_index)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_start_inventory(message, start_index)
+
+        return 0
+
+    def notify_stop_inventory(self, message, start_index):
+        """Известяване за край на инвентаризация.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._publish_status(InventoryStoppedEvent, message, start_index)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_stop_inventory(message, start_index)
+
+        return 0
+
+    def notify_reset(self, message, start_index):
+        """Известяване за ресетиране на четеца.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._publish_status(ResetEvent, message, start_index)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_reset(message, start_index)
+
+        return 0
+
+    def notify_read_tag_block(self, message, start_index):
+        """Известяване за прочетен блок от таг.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        callbacks = self._get_callbacks(BlockReadEvent)
+
+        if callbacks:
+            status = self.reader.get_response_status(message, start_index)
+            block = self.reader.get_tag_block(message, start_index)
+            event = BlockReadEvent(status, *(block or ()), reader_key=self.reader.key, receive_time=time.time())
+
+            for callback in callbacks:
+                callback(event)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_read_tag_block(message, start_index)
+
+        return 0
+
+    def notify_write_tag_block(self, message, start_index):
+        """Известяване за записан блок в таг.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._publish_status(TagOperationEvent, message, start_index, TagOperationEvent.OPERATION_WRITE)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_write_tag_block(message, start_index)
+
+        return 0
+
+    def notify_lock_tag(self, message, start_index):
+        """Известяване за заключен таг.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._publish_status(TagOperationEvent, message, start_index, TagOperationEvent.OPERATION_LOCK)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_lock_tag(message, start_index)
+
+        return 0
+
+    def notify_kill_tag(self, message, start_index):
+        """Известяване за унищожен таг.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._publish_status(TagOperationEvent, message, start_index, TagOperationEvent.OPERATION_KILL)
+
+        if self.debug_notify is not None:
+            self.debug_notify.notify_kill_tag(message, start_index)
+
+        return 0
+
+    def notify_query_muti_param(self, message, start_index):
+        """Известяване за заявени множество параметри (само към debug_notify).
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if self.debug_notify is not None:
+            self.debug_notify.notify_query_muti_param(message, start_index)
+
+        return 0
+
+    def notify_set_muti_param(self, message, start_index):
+        """Известяване за зададени множество параметри (само към debug_notify).
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if self.debug_notify is not None:
+            self.debug_notify.notify_set_muti_param(message, start_index)
+
+        return 0
+
+    def get_statistics(self):
+        """Връща статистиката.
+
+        Returns:
+            dict: Брой рамки с тагове, които не са декодирани, и последната грешка
+        """
+        return {
+            'decode_errors': self.decode_error_count,
+            'last_decode_error': self.last_decode_error,
+        }
@@ -6,6 +6,7 @@
 """
 
 from rfid.reader.app_notify import AppNotify
+from rfid.reader.r2000_reader import R2000Reader
 
 
 class R2000ReaderNotifyImpl(AppNotify):
@@ -21,18 +22,17 @@ class R2000ReaderNotifyImpl(AppNotify):
         Returns:
             int: Резултат от операцията
         """
-        tag_count = 0
-        tag_count = message[start_index + 7]
-        tag_count = tag_count << 8
-        tag_count = tag_count + message[start_index + 8]
+        try:
+            epcs = R2000Reader.decode_tag_epcs(message, start_index)
+        except ValueError as e:
+            print(f"Invalid tag notification: {e}")
+            return -1
 
-        print(f"Total tags received: {tag_count}")
+        print(f"Total tags received: {len(epcs)}")
         print("Received tag data:")
 
-        for i_index in range(tag_count):
-            for j_index in range(12):
-                print(f"{message[start_index + 9 + i_index * 12 + j_index]:02X} ", end="")
-            print()
+        for epc in epcs:
+            print("".join(f"{byte:02X} " for byte in epc))
 
         return 0
 
@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмаркове на SDK.
+"""
+
+from .runner import BENCHMARKS, register_benchmark, run_benchmark, run_benchmarks
\ No newline at end of file
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Стартиране на бенчмарковете от командния ред.
+
+    rfid-benchmark --filter 'reader\.' --output results.json
+"""
+
+import argparse
+import json
+import sys
+
+from rfid.benchmarks.runner import BENCHMARKS, run_benchmarks
+
+
+def main(argv=None):
+    """Изпълнява бенчмарковете и извежда резултата като JSON."""
+    parser = argparse.ArgumentParser(description="RFID Reader SDK benchmarks")
+    parser.add_argument('--filter', default=None, help="Regular expression for benchmark names")
+    parser.add_argument('--frames', type=int, default=1000, help="Number of synthetic frames")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds per repetition")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetitions (the best one is reported)")
+    parser.add_argument('--output', default=None, help="Write JSON to this file instead of stdout")
+    parser.add_argument('--list', action='store_true', help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        from rfid.benchmarks import cases  # noqa: F401
+        for name in sorted(BENCHMARKS):
+            print(name)
+        return 0
+
+    report = run_benchmarks(args.filter, args.frames, args.min_time, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
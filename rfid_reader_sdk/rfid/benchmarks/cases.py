@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмаркове на парсерите, контролните суми и известяването.
+
+Синтетичните рамки се кодират от протоколите на симулатора, затова са в
+същия формат, който четците получават по мрежата.
+"""
+
+import itertools
+import time
+
+from rfid.app_notify_impl.event_notify_impl import EventNotifyImpl
+from rfid.app_notify_impl.general_reader_notify_impl import GeneralReaderNotifyImpl
+from rfid.app_notify_impl.m_rfid_reader_notify_impl import MRfidReaderNotifyImpl
+from rfid.app_notify_impl.r2000_reader_notify_impl import R2000ReaderNotifyImpl
+from rfid.benchmarks.runner import register_benchmark
+from rfid.reader.general_reader import GeneralReader
+from rfid.reader.m_rfid_reader import MRfidReader
+from rfid.reader.r2000_reader import R2000Reader
+from rfid.reader.inventory_table import InventoryTable
+from rfid.reader.presence_tracker import PresenceTracker
+from rfid.reader.reader_events import TagReadEvent
+from rfid.reader.tag_read import TagRead
+from rfid.reader.uhf_protocol import NotificationFrame, NotificationType, UHFFrame, TagTLV, EPCTLV, RSSITLV, TIDTLV, TLVType
+from rfid.simulator.protocols import GeneralProtocol, MReaderProtocol, R2000Protocol
+from rfid.simulator.tag_population import TagPopulation
+
+# Размер на блоковете, с които се подават данните (както при едно четене)
+CHUNK_SIZE = 1024
+
+# Фамилии четци: (клас на четеца, протокол на симулатора, клас за известяване)
+READER_FAMILIES = {
+    'general': (GeneralReader, GeneralProtocol, GeneralReaderNotifyImpl),
+    'm': (MRfidReader, MReaderProtocol, MRfidReaderNotifyImpl),
+    'r2000': (R2000Reader, R2000Protocol, R2000ReaderNotifyImpl),
+}
+
+# Команда с параметри за всяка фамилия: (име на метода, аргументи)
+PARAMETERIZED_COMMANDS = {
+    'general': ('read_tag_block', (1, 2, 6)),
+    'm': ('relay_operation', (3, 1, 10)),
+}
+
+
+class NullTransport:
+    """Транспорт, който приема изпратените данни, без да ги изпраща."""
+
+    def send_data(self, data, data_len):
+        """Приема данните."""
+        return 0
+
+
+def null_notify(notify_class):
+    """Създава обект за известяване, чиито notify_* методи не правят нищо."""
+    methods = {name: (lambda self, message, start_index: 0)
+               for name in dir(notify_class) if name.startswith('notify_')}
+    return type(f"Null{notify_class.__name__}", (notify_class,), methods)()
+
+
+def build_frames(family, frame_count):
+    """Кодира известия за тагове за зададената фамилия.
+
+    Returns:
+        list: Списък с (рамка, брой тагове в рамката)
+    """
+    protocol = READER_FAMILIES[family][1]()
+    # R2000 групира няколко тага в една рамка
+    population = TagPopulation(frame_count * getattr(protocol, 'MAX_TAGS_PER_FRAME', 1))
+    frames = protocol.build_tag_frames(population.tags)
+    return frames[:frame_count]
+
+
+def build_uhf_frames(frame_count):
+    """Кодира UHF известия TAGS_UPLOADED с по един таг (EPC, RSSI, TID)."""
+    frames = []
+
+    for tag in TagPopulation(frame_count).tags:
+        tag_tlv = TagTLV([EPCTLV(tag.epc), RSSITLV(tag.rssi), TIDTLV(bytes(tag.memory[2]))])
+        frame = NotificationFrame(NotificationType.TAGS_UPLOADED, 0x0001, tag_tlv.to_bytes())
+        frames.append(frame.to_bytes())
+
+    return frames
+
+
+def _register_reader_benchmarks(family):
+    """Регистрира бенчмарковете на една фамилия четци."""
+    reader_class, _, notify_class = READER_FAMILIES[family]
+
+    @register_benchmark(f"reader.{family}.handle_message")
+    def handle_message(frame_count):
+        """Декодиране на поток от рамки без известяване на приложението."""
+        frames = build_frames(family, frame_count)
+        stream = b''.join(frame for frame, _ in frames)
+        chunks = [stream[i:i + CHUNK_SIZE] for i in range(0, len(stream), CHUNK_SIZE)]
+        reader = reader_class()
+        handle_data = reader.handle_data
+
+        def run():
+            for chunk in chunks:
+                handle_data(chunk)
+
+        return run, len(frames)
+
+    @register_benchmark(f"reader.{family}.notify_message_to_app")
+    def notify_message_to_app(frame_count):
+        """Разпределяне на готови рамки към методите за известяване."""
+        frames = [bytearray(frame) for frame, _ in build_frames(family, frame_count)]
+        reader = reader_class()
+        reader.set_app_notify(null_notify(notify_class))
+        notify = reader.notify_message_to_app
+
+        def run():
+            for frame in frames:
+                notify(frame, 0)
+
+        return run, len(frames)
+
+    @register_benchmark(f"reader.{family}.tag_events")
+    def tag_events(frame_count):
+        """Декодиране на известия в TagReadEvent за един абонат."""
+        frames = [bytearray(frame) for frame, _ in build_frames(family, frame_count)]
+        reader = reader_class()
+        event_notify = EventNotifyImpl(reader)
+        event_notify.subscribe(TagReadEvent, lambda event: None)
+        reader.set_app_notify(event_notify)
+        notify = reader.notify_message_to_app
+
+        def run():
+            for frame in frames:
+                notify(frame, 0)
+
+        return run, len(frames)
+
+    @register_benchmark(f"reader.{family}.notify_unsubscribed")
+    def notify_unsubscribed(frame_count):
+        """Пропускане на рамки с код, за който няма обработчик."""
+        frames = [bytearray(frame) for frame, _ in build_frames(family, frame_count)]
+        reader = reader_class()
+        notify = reader.notify_message_to_app
+
+        def run():
+            for frame in frames:
+                notify(frame, 0)
+
+        return run, len(frames)
+
+    @register_benchmark(f"checksum.{family}")
+    def checksum(frame_count):
+        """Контролна сума на четеца върху рамките без последния байт."""
+        frames = [bytearray(frame) for frame, _ in build_frames(family, frame_count)]
+        calculate_checksum = reader_class()._calculate_checksum
+
+        def run():
+            for frame in frames:
+                calculate_checksum(frame, 0, len(frame) - 1)
+
+        return run, len(frames)
+
+    @register_benchmark(f"command.{family}.stop")
+    def stop_command(frame_count):
+        """Кодиране и изпращане на командата stop."""
+        reader = reader_class()
+        reader.transport = NullTransport()
+        stop = reader.stop
+
+        def run():
+            for _ in range(frame_count):
+                stop()
+
+        return run, frame_count
+
+    if family in PARAMETERIZED_COMMANDS:
+        method_name, args = PARAMETERIZED_COMMANDS[family]
+
+        @register_benchmark(f"command.{family}.{method_name}")
+        def parameterized_command(frame_count):
+            """Кодиране и изпращане на команда с параметри."""
+            reader = reader_class()
+            reader.transport = NullTransport()
+            command = getattr(reader, method_name)
+
+            def run():
+                for _ in range(frame_count):
+                    command(*args)
+
+            return run, frame_count
+
+
+for _family in READER_FAMILIES:
+    _register_reader_benchmarks(_family)
+
+
+@register_benchmark("r2000.decode_tag_epcs")
+def r2000_decode_tag_epcs(frame_count):
+    """Групово декодиране на EPC от известия на R2000 (по 20 тага в рамка)."""
+    frames = [bytearray(frame) for frame, _ in build_frames('r2000', frame_count)]
+    decode_tag_epcs = R2000Reader.decode_tag_epcs
+
+    def run():
+        for frame in frames:
+            decode_tag_epcs(frame, 0)
+
+    return run, len(frames)
+
+
+@register_benchmark("inventory_table.update")
+def inventory_table_update(frame_count):
+    """Отразяване на повтарящи се прочитания (100 различни EPC) в InventoryTable."""
+    population = TagPopulation(100)
+    receive_time = time.time()
+    tag_reads = [TagRead(tag.epc, tag.rssi, None, None, 'bench', receive_time, tag.antenna)
+                 for tag in itertools.islice(itertools.cycle(population.tags), frame_count)]
+    table = InventoryTable(ttl=3600.0)
+    update = table.update
+
+    def run():
+        for tag_read in tag_reads:
+            update((tag_read,))
+
+    return run, len(tag_reads)
+
+
+@register_benchmark("presence_tracker.update")
+def presence_tracker_update(frame_count):
+    """Отразяване на прочитания (10000 различни EPC, два четеца в една зона) в PresenceTracker."""
+    population = TagPopulation(10000)
+    receive_time = time.time()
+    tag_reads = [TagRead(tag.epc, tag.rssi, None, None, f"bench-{index % 2}", receive_time, tag.antenna)
+                 for index, tag in enumerate(itertools.islice(itertools.cycle(population.tags), frame_count))]
+    tracker = PresenceTracker(timeout=3600.0, zones={'bench-0': 'zone', 'bench-1': 'zone'})
+    update = tracker.update
+
+    def run():
+        for tag_read in tag_reads:
+            update((tag_read,))
+
+    return run, len(tag_reads)
+
+
+@register_benchmark("checksum.uhf_frame")
+def uhf_frame_checksum(frame_count):
+    """XOR контролна сума на UHFFrame."""
+    frames = [frame[:-1] for frame in build_uhf_frames(frame_count)]
+    calculate_checksum = UHFFrame(0).calculate_checksum
+
+    def run():
+        for frame in frames:
+            calculate_checksum(frame)
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.from_bytes")
+def uhf_from_bytes(frame_count):
+    """UHFFrame.from_bytes върху известия с един таг."""
+    frames = build_uhf_frames(frame_count)
+    from_bytes = UHFFrame.from_bytes
+
+    def run():
+        for frame in frames:
+            from_bytes(frame)
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.get_tlvs")
+def uhf_get_tlvs(frame_count):
+    """Първо UHFFrame.get_tlvs върху вече разпознати рамки.
+
+    Присвояването на payload изчиства запомнените TLV, така че всяко
+    извикване разбира полезния товар отново.
+    """
+    frames = [UHFFrame.from_bytes(frame) for frame in build_uhf_frames(frame_count)]
+
+    def run():
+        for frame in frames:
+            frame.payload = frame.payload
+            frame.get_tlvs()
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.find_tlv")
+def uhf_find_tlv(frame_count):
+    """Повторно UHFFrame.find_tlv върху рамки с вече изграден индекс."""
+    frames = [UHFFrame.from_bytes(frame) for frame in build_uhf_frames(frame_count)]
+
+    for frame in frames:
+        frame.find_tlv(TLVType.TAG)
+
+    def run():
+        for frame in frames:
+            frame.find_tlv(TLVType.TAG)
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.get_tags")
+def uhf_get_tags(frame_count):
+    """UHFFrame.from_bytes и get_tags с копиране на полезния товар."""
+    frames = build_uhf_frames(frame_count)
+    from_bytes = UHFFrame.from_bytes
+
+    def run():
+        for frame in frames:
+            from_bytes(frame).get_tags()
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.get_tags.zero_copy")
+def uhf_get_tags_zero_copy(frame_count):
+    """UHFFrame.from_buffer и get_tags върху изгледи на приемния буфер."""
+    frames = [bytearray(frame) for frame in build_uhf_frames(frame_count)]
+    from_buffer = UHFFrame.from_buffer
+
+    def run():
+        for frame in frames:
+            from_buffer(frame).get_tags()
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.get_tag_reads")
+def uhf_get_tag_reads(frame_count):
+    """UHFFrame.from_bytes и get_tag_reads (записи TagRead без TLV обекти)."""
+    frames = build_uhf_frames(frame_count)
+    from_bytes = UHFFrame.from_bytes
+
+    def run():
+        for frame in frames:
+            from_bytes(frame).get_tag_reads()
+
+    return run, len(frames)
+
+
+@register_benchmark("uhf.tag_tlv_from_value")
+def uhf_tag_tlv_from_value(frame_count):
+    """TagTLV.from_value върху стойността на TLV 0x50."""
+    values = [frame[10:-1] for frame in build_uhf_frames(frame_count)]
+    from_value = TagTLV.from_value
+
+    def run():
+        for value in values:
+            from_value(value)
+
+    return run, len(values)
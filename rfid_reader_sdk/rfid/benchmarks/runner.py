@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Регистър и изпълнение на бенчмаркове.
+"""
+
+import platform
+import re
+import sys
+import time
+
+import rfid
+
+# Регистър на бенчмарковете: име -> функция за подготовка
+BENCHMARKS = {}
+
+
+def register_benchmark(name):
+    """Декоратор за регистриране на бенчмарк.
+
+    Функцията за подготовка получава броя рамки и връща (функция, брой
+    рамки, които функцията обработва при едно извикване).
+
+    Args:
+        name (str): Име на бенчмарка (например 'reader.general.handle_message')
+    """
+
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def run_benchmark(name, frame_count=1000, min_time=0.2, repeat=5):
+    """Изпълнява един бенчмарк.
+
+    Функцията се извиква, докато не мине поне min_time секунди, и това се
+    повтаря repeat пъти. Резултатът е от най-бързото повторение.
+
+    Args:
+        name (str): Име на бенчмарка
+        frame_count (int): Брой синтетични рамки
+        min_time (float): Минимално време на едно повторение в секунди
+        repeat (int): Брой повторения
+
+    Returns:
+        dict: Резултат на бенчмарка
+    """
+    func, frames_per_call = BENCHMARKS[name](frame_count)
+
+    # Загряване и калибриране на броя извиквания
+    start = time.perf_counter_ns()
+    func()
+    single_ns = max(time.perf_counter_ns() - start, 1)
+    calls = max(1, int(min_time * 1e9 / single_ns))
+
+    best_ns = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            func()
+        elapsed_ns = time.perf_counter_ns() - start
+        if best_ns is None or elapsed_ns < best_ns:
+            best_ns = elapsed_ns
+
+    frames = frames_per_call * calls
+    return {
+        'name': name,
+        'frames': frames,
+        'calls': calls,
+        'repeat': repeat,
+        'seconds': best_ns / 1e9,
+        'frames_per_second': frames * 1e9 / best_ns if best_ns else 0.0,
+        'ns_per_frame': best_ns / frames if frames else 0.0,
+    }
+
+
+def run_benchmarks(pattern=None, frame_count=1000, min_time=0.2, repeat=5):
+    """Изпълнява всички бенчмаркове, чието име съвпада с pattern.
+
+    Args:
+        pattern (str): Регулярен израз за имената (None - всички)
+        frame_count (int): Брой синтетични рамки
+        min_time (float): Минимално време на едно повторение в секунди
+        repeat (int): Брой повторения
+
+    Returns:
+        dict: Описание на средата и списък с резултати
+    """
+    # Регистрира бенчмарковете
+    from rfid.benchmarks import cases  # noqa: F401
+
+    names = sorted(BENCHMARKS)
+    if pattern:
+        names = [name for name in names if re.search(pattern, name)]
+
+    return {
+        'sdk_version': rfid.__version__,
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'frame_count': frame_count,
+        'results': [run_benchmark(name, frame_count, min_time, repeat) for name in names],
+    }
@@ -4,4 +4,8 @@
 Модул за съобщения.
 """
 
-from .reader_adapt import ReaderAdapt
\ No newline at end of file
+from .reader_adapt import ReaderAdapt
+from .frame_decoder import FrameDecoder
+
+from .checksum import CHECKSUM_SUM, CHECKSUM_XOR, sum_checksum, xor_checksum, calculate_checksum, IncrementalChecksum, PrefixChecksum
+from .tlv import iter_tlvs, COMPOUND_TLV_TYPES
\ No newline at end of file
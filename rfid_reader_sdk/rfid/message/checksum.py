@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Контролни суми на рамките.
+
+Четците General, M и R2000 използват допълнение до две на сумата на
+байтовете, а протоколът UHF - XOR на байтовете. Функциите приемат bytes,
+bytearray и memoryview и изчисляват сумата с вградените sum() и
+int.from_bytes() вместо байт по байт с get_unsigned_byte. PrefixChecksum
+дава контролната сума на произволен прозорец за O(1) при повторна
+синхронизация в декодера.
+
+Срезът на bytearray се копира с memcpy и след това се обхожда по-бързо от
+memoryview, затова за кратките рамки на четците срезът е по-евтин.
+"""
+
+import itertools
+import operator
+
+# Видове контролни суми
+CHECKSUM_SUM = 0
+CHECKSUM_XOR = 1
+
+# Под тази дължина XOR в цикъл е по-бърз от сгъването на цяло число
+_XOR_FOLD_MIN_LEN = 64
+
+
+def sum_checksum(data, start_pos=0, length=None):
+    """Допълнение до две на сумата на байтовете.
+
+    Args:
+        data (bytes): Данни (bytes, bytearray или memoryview)
+        start_pos (int): Начална позиция
+        length (int): Брой байтове (None - до края на данните)
+
+    Returns:
+        int: Контролна сума (0-255)
+    """
+    if start_pos == 0 and length is None:
+        return -sum(data) & 0xFF
+
+    end_pos = len(data) if length is None else start_pos + length
+    return -sum(data[start_pos:end_pos]) & 0xFF
+
+
+def xor_checksum(data, start_pos=0, length=None):
+    """XOR на байтовете.
+
+    Дългите блокове се сгъват като едно цяло число, вместо байт по байт.
+
+    Args:
+        data (bytes): Данни (bytes, bytearray или memoryview)
+        start_pos (int): Начална позиция
+        length (int): Брой байтове (None - до края на данните)
+
+    Returns:
+        int: Контролна сума (0-255)
+    """
+    end_pos = len(data) if length is None else start_pos + length
+    block = data if start_pos == 0 and end_pos == len(data) else data[start_pos:end_pos]
+
+    if len(block) < _XOR_FOLD_MIN_LEN:
+        checksum = 0
+        for byte in block:
+            checksum ^= byte
+        return checksum
+
+    value = int.from_bytes(block, 'little')
+    width = len(block) * 8
+
+    while width > 8:
+        half = ((width // 8 + 1) // 2) * 8
+        value = (value >> half) ^ (value & ((1 << half) - 1))
+        width = half
+
+    return value
+
+
+CHECKSUM_FUNCTIONS = {
+    CHECKSUM_SUM: sum_checksum,
+    CHECKSUM_XOR: xor_checksum,
+}
+
+
+def calculate_checksum(checksum_type, data, start_pos=0, length=None):
+    """Изчислява контролна сума от зададения вид.
+
+    Args:
+        checksum_type (int): CHECKSUM_SUM или CHECKSUM_XOR
+        data (bytes): Данни
+        start_pos (int): Начална позиция
+        length (int): Брой байтове (None - до края на данните)
+
+    Returns:
+        int: Контролна сума (0-255)
+    """
+    return CHECKSUM_FUNCTIONS[checksum_type](data, start_pos, length)
+
+
+class IncrementalChecksum:
+    """Контролна сума, която се натрупва на части.
+
+    Подходяща е, когато рамката се сглобява от няколко блока (заглавие,
+    параметри) и не е в един непрекъснат буфер.
+    """
+
+    def __init__(self, checksum_type=CHECKSUM_SUM):
+        """Инициализация.
+
+        Args:
+            checksum_type (int): CHECKSUM_SUM или CHECKSUM_XOR
+        """
+        self.checksum_type = checksum_type
+        self._state = 0
+
+    def update(self, data, start_pos=0, length=None):
+        """Добавя блок данни.
+
+        Args:
+            data (bytes): Данни
+            start_pos (int): Начална позиция
+            length (int): Брой байтове (None - до края на данните)
+
+        Returns:
+            IncrementalChecksum: Същият обект (за верижни извиквания)
+        """
+        if self.checksum_type == CHECKSUM_XOR:
+            self._state ^= xor_checksum(data, start_pos, length)
+        else:
+            end_pos = len(data) if length is None else start_pos + length
+            self._state += sum(data[start_pos:end_pos])
+        return self
+
+    def get_checksum(self):
+        """Връща контролната сума на добавените данни."""
+        if self.checksum_type == CHECKSUM_XOR:
+            return self._state & 0xFF
+        return -self._state & 0xFF
+
+    def reset(self):
+        """Започва нова контролна сума."""
+        self._state = 0
+
+
+class PrefixChecksum:
+    """Префиксни суми върху област от буфер.
+
+    След еднократно O(n) изчисление контролната сума на всеки прозорец в
+    областта се получава за O(1). Декодерът я използва след несъвпадение на
+    контролната сума, когато проверява рамка от всяка следваща позиция.
+    Буферът не трябва да се променя в областта, докато обектът се използва.
+    """
+
+    def __init__(self, data, start_pos, end_pos, checksum_type=CHECKSUM_SUM):
+        """Изчислява префиксните суми.
+
+        Args:
+            data (bytes): Буфер
+            start_pos (int): Начало на областта
+            end_pos (int): Край на областта (без него)
+            checksum_type (int): CHECKSUM_SUM или CHECKSUM_XOR
+        """
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.checksum_type = checksum_type
+        func = operator.xor if checksum_type == CHECKSUM_XOR else operator.add
+
+        self._prefix = [0]
+        self._prefix.extend(itertools.accumulate(data[start_pos:end_pos], func))
+
+    def covers(self, start_pos, length):
+        """Проверява дали прозорецът е в областта."""
+        return self.start_pos <= start_pos and start_pos + length <= self.end_pos
+
+    def checksum(self, start_pos, length):
+        """Контролна сума на length байта от start_pos.
+
+        Args:
+            start_pos (int): Начална позиция в буфера
+            length (int): Брой байтове
+
+        Returns:
+            int: Контролна сума (0-255)
+        """
+        first = start_pos - self.start_pos
+        last = first + length
+
+        if self.checksum_type == CHECKSUM_XOR:
+            return (self._prefix[last] ^ self._prefix[first]) & 0xFF
+        return -(self._prefix[last] - self._prefix[first]) & 0xFF
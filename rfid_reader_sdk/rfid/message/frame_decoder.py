@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Поточен декодер на рамки за RFID четци.
+
+Данните от транспорта пристигат на произволни парчета - една рамка може да
+бъде разделена между два TCP сегмента или две четения от серийния порт.
+Декодерът пази непълната рамка между отделните четения и я допълва със
+следващите байтове, вместо да я изхвърля.
+"""
+
+from rfid.message.checksum import PrefixChecksum
+
+
+class FrameDecoder:
+    """Поточен декодер на рамки с буфер за пренасяне на непълни рамки.
+
+    Форматът на рамките се описва от четеца, на който принадлежи декодерът:
+
+    - ``FRAME_START_FLAGS`` - кортеж с байтовите последователности, с които
+      започва рамка (например ``(b'\\xE4', b'\\xE0')`` или ``(b'RF',)``);
+    - ``FRAME_HEADER_LEN`` - брой байтове, нужни за определяне на дължината;
+    - ``_get_frame_length(message, start_pos)`` - пълна дължина на рамката
+      или -1 при невалидно заглавие;
+    - ``_calculate_checksum(message, start_pos, length)`` - контролна сума,
+      която се сравнява с последния байт на рамката;
+    - ``CHECKSUM_TYPE`` - вид на контролната сума от ``rfid.message.checksum``
+      или None, ако ``_calculate_checksum`` е собствена. При известен вид
+      проверките след несъвпадение използват префиксни суми, затова
+      повторната синхронизация върху случайни данни е линейна.
+
+    Всяка валидна рамка се подава на ``reader.notify_message_to_app``.
+    Байтовете, които не принадлежат на валидна рамка, се отхвърлят при
+    повторна синхронизация по началните флагове и се броят в
+    ``discarded_bytes``.
+    """
+
+    DEFAULT_CAPACITY = 2048
+
+    def __init__(self, reader, capacity=DEFAULT_CAPACITY):
+        """Инициализация на декодера.
+
+        Args:
+            reader (RfidReader): Четецът, чийто формат на рамки се декодира
+            capacity (int): Размер на буфера в байтове
+        """
+        self.reader = reader
+        self.buffer = bytearray(capacity)
+        self.data_len = 0
+        self.discarded_bytes = 0
+        self.frame_count = 0
+        self._start_flags = tuple(bytes(flag) for flag in reader.FRAME_START_FLAGS)
+        self._checksum_type = getattr(reader, 'CHECKSUM_TYPE', None)
+        # Непълен начален флаг в края на буфера трябва да се запази
+        self._keep_len = max((len(flag) for flag in self._start_flags), default=1) - 1
+
+    def get_free_space(self):
+        """Връща броя свободни байтове в буфера."""
+        return len(self.buffer) - self.data_len
+
+    def get_write_buffer(self):
+        """Връща memoryview към свободната част на буфера.
+
+        Транспортът записва получените байтове директно в него, след което
+        се извиква ``commit`` с броя записани байтове.
+
+        Returns:
+            memoryview: Изглед към свободната част на буфера
+        """
+        return memoryview(self.buffer)[self.data_len:]
+
+    def commit(self, length):
+        """Отбелязва, че в свободната част на буфера са записани данни.
+
+        Args:
+            length (int): Брой записани байтове
+        """
+        if length > 0:
+            self.data_len = min(self.data_len + length, len(self.buffer))
+
+    def feed(self, data):
+        """Добавя данни в буфера и декодира всички пълни рамки.
+
+        Args:
+            data (bytes): Получени данни
+
+        Returns:
+            int: Брой декодирани рамки
+        """
+        frames = 0
+        view = memoryview(data)
+        offset = 0
+
+        while offset < len(view):
+            chunk_len = min(self.get_free_space(), len(view) - offset)
+            self.buffer[self.data_len:self.data_len + chunk_len] = view[offset:offset + chunk_len]
+            self.data_len += chunk_len
+            offset += chunk_len
+            frames += self.decode()
+
+        return frames
+
+    def decode(self):
+        """Декодира всички пълни рамки в буфера.
+
+        Непълната рамка в края на буфера се премества в началото му и
+        изчаква следващото четене.
+
+        Returns:
+            int: Брой декодирани рамки
+        """
+        reader = self.reader
+        buffer = self.buffer
+        capacity = len(buffer)
+        header_len = reader.FRAME_HEADER_LEN
+        end = self.data_len
+        pos = 0
+        frames = 0
+        prefix = None
+
+        try:
+            while pos < end:
+                start = self._find_frame_start(pos, end)
+                if start < 0:
+                    # Няма начален флаг - пазим само евентуално непълен флаг
+                    start = max(pos, end - self._keep_len)
+                    self.discarded_bytes += start - pos
+                    pos = start
+                    break
+
+                self.discarded_bytes += start - pos
+                pos = start
+
+                if end - pos < header_len:
+                    break
+
+                frame_len = reader._get_frame_length(buffer, pos)
+                if frame_len <= 0 or frame_len > capacity:
+                    pos += 1
+                    self.discarded_bytes += 1
+                    continue
+
+                if end - pos < frame_len:
+                    break
+
+                checksum = buffer[pos + frame_len - 1]
+                if prefix is not None and prefix.covers(pos, frame_len - 1):
+                    calculated = prefix.checksum(pos, frame_len - 1)
+                else:
+                    calculated = reader._calculate_checksum(buffer, pos, frame_len - 1)
+
+                if calculated != checksum:
+                    if prefix is None and self._checksum_type is not None:
+                        # Следват проверки от всяка следваща позиция
+                        prefix = PrefixChecksum(buffer, pos, end, self._checksum_type)
+                    pos += 1
+                    self.discarded_bytes += 1
+                    continue
+
+                frame_start = pos
+                pos += frame_len
+                frames += 1
+                self.frame_count += 1
+                reader.notify_message_to_app(buffer, frame_start)
+        finally:
+            self._compact(pos)
+
+        return frames
+
+    def _find_frame_start(self, start_pos, end_pos):
+        """Търси най-близкия начален флаг на рамка.
+
+        Args:
+            start_pos (int): Начална позиция
+            end_pos (int): Крайна позиция (без нея)
+
+        Returns:
+            int: Позиция на флага или -1 ако не е намерен
+        """
+        found = -1
+
+        for flag in self._start_flags:
+            index = self.buffer.find(flag, start_pos, end_pos)
+            if index >= 0 and (found < 0 or index < found):
+                found = index
+
+        return found
+
+    def _compact(self, consumed):
+        """Премества необработените байтове в началото на буфера.
+
+        Args:
+            consumed (int): Брой обработени байтове от началото на буфера
+        """
+        remaining = self.data_len - consumed
+
+        if consumed > 0 and remaining > 0:
+            self.buffer[0:remaining] = self.buffer[consumed:self.data_len]
+
+        self.data_len = remaining
+
+    def get_discarded_bytes(self):
+        """Връща броя отхвърлени байтове от създаването на декодера."""
+        return self.discarded_bytes
+
+    def get_frame_count(self):
+        """Връща броя декодирани рамки от създаването на декодера."""
+        return self.frame_count
+
+    def reset(self):
+        """Изчиства натрупаните данни, например след повторно свързване."""
+        self.data_len = 0
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Обхождане на TLV (тип, дължина, стойност) в рамките 'RF'.
+
+Параметрите на рамките на M четеца и на протокола UHF са поредица от TLV с
+еднобайтов тип и еднобайтова дължина. Съставните TLV (например 0x50 - един
+таг) съдържат вложени TLV. iter_tlvs обхожда всички нива с едно минаване,
+без да търси всеки тип отначало.
+"""
+
+# Съставни TLV, чиято стойност е поредица от вложени TLV
+TLV_TAG = 0x50
+COMPOUND_TLV_TYPES = frozenset((TLV_TAG,))
+
+
+def iter_tlvs(data, start, end, compound_types=COMPOUND_TLV_TYPES):
+    """Обхожда TLV на всички нива в реда, в който са в буфера.
+
+    Съставният TLV се връща преди вложените в него. Непълен TLV прекратява
+    текущото ниво и обхождането продължава след родителя.
+
+    Args:
+        data (bytes): Буфер
+        start (int): Позиция на първия TLV
+        end (int): Позиция след последния байт на TLV
+        compound_types (frozenset): Типове, чиято стойност се обхожда като вложени TLV
+
+    Yields:
+        tuple: (тип, позиция на заглавието, дължина на стойността)
+    """
+    # Незавършени родители: (позиция след родителя, край на нивото на родителя)
+    parents = []
+    offset = start
+
+    while True:
+        if offset + 2 > end or offset + 2 + data[offset + 1] > end:
+            if not parents:
+                return
+            offset, end = parents.pop()
+            continue
+
+        tlv_type = data[offset]
+        length = data[offset + 1]
+        yield tlv_type, offset, length
+
+        value_start = offset + 2
+        offset = value_start + length
+
+        if tlv_type in compound_types:
+            parents.append((offset, end))
+            offset, end = value_start, offset
@@ -5,4 +5,26 @@
 """
 
 from .app_notify import AppNotify
-from .rfid_reader import RfidReader
\ No newline at end of file
+from .rfid_reader import RfidReader
+from .async_rfid_reader import AsyncRfidReader
+
+from .tag_read import TagRead
+from .tag_batch import TagBatch
+from .reader_events import (
+    ReaderEvent,
+    TagReadEvent,
+    StatusEvent,
+    InventoryStartedEvent,
+    InventoryStoppedEvent,
+    ResetEvent,
+    BlockReadEvent,
+    TagOperationEvent,
+    TagPresenceEvent,
+    TagEnteredEvent,
+    TagExitedEvent,
+)
+from .notify_executor import NotifyExecutor, NotifyQueue
+from .tag_batcher import TagBatcher
+from .inventory_table import InventoryTable, InventoryEntry
+from .timing_wheel import TimingWheel
+from .presence_tracker import PresenceTracker, PresenceRecord
\ No newline at end of file
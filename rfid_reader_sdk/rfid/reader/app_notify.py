@@ -126,4 +126,32 @@ class AppNotify(ABC):
         Returns:
             int: Резултат от операцията
         """
-        pass
\ No newline at end of file
+        pass
+
+    def notify_query_muti_param(self, message, start_index):
+        """Известяване за заявени множество параметри.
+
+        Не е задължителен; по подразбиране не прави нищо.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        return 0
+
+    def notify_set_muti_param(self, message, start_index):
+        """Известяване за зададени множество параметри.
+
+        Не е задължителен; по подразбиране не прави нищо.
+
+        Args:
+            message (bytes): Съобщение от четеца
+            start_index (int): Начален индекс в съобщението
+
+        Returns:
+            int: Резултат от операцията
+        """
+        return 0
\ No newline at end of file
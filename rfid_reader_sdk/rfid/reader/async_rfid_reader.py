@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Асинхронен интерфейс към RFID четци.
+
+Обвива произволен RfidReader (GeneralReader, MRfidReader, R2000Reader) и го
+свързва чрез asyncio транспортите. Получените рамки се декодират и
+известяват в цикъла на събитията, без TransportThreadManager.
+"""
+
+from rfid.reader.rfid_reader import RfidReader
+from rfid.transport.transport_asyncio import (
+    AsyncioSerialTransport,
+    AsyncioTcpClientTransport,
+    AsyncioUdpTransport,
+)
+
+
+class AsyncRfidReader:
+    """Асинхронна обвивка около RfidReader."""
+
+    def __init__(self, reader):
+        """Инициализация на обвивката.
+
+        Args:
+            reader (RfidReader): Четецът, който се обвива
+        """
+        self.reader = reader
+
+    def get_reader(self):
+        """Връща обвития четец."""
+        return self.reader
+
+    def set_app_notify(self, app_notify):
+        """Задава обекта за известяване."""
+        self.reader.set_app_notify(app_notify)
+
+    def get_key(self):
+        """Връща ключа на четеца."""
+        return self.reader.get_key()
+
+    async def connect_physical_interface(self, physical_name, physical_param, local_addr_str, local_addr_port,
+                                         connect_type):
+        """Свързване към физически интерфейс.
+
+        Args:
+            physical_name (str): Име на физическия интерфейс (порт или IP)
+            physical_param (int): Параметър (скорост или порт)
+            local_addr_str (str): Локален IP адрес
+            local_addr_port (int): Локален порт
+            connect_type (int): Тип на връзка
+
+        Returns:
+            int: Резултат от операцията
+        """
+        reader = self.reader
+        reader.connect_type = connect_type
+
+        if connect_type == RfidReader.CONNECT_TYPE_NET_TCP_CLIENT:
+            transport = AsyncioTcpClientTransport()
+            transport.set_config(physical_name, physical_param, local_addr_str, local_addr_port)
+            reader.key = f"TCP:{local_addr_str}:{local_addr_port}"
+
+        elif connect_type == RfidReader.CONNECT_TYPE_NET_UDP:
+            transport = AsyncioUdpTransport()
+            transport.set_config(physical_name, physical_param, local_addr_str, local_addr_port)
+            reader.key = f"UDP:{local_addr_str}:{local_addr_port}"
+
+        elif connect_type == RfidReader.CONNECT_TYPE_SERIALPORT:
+            transport = AsyncioSerialTransport()
+            transport.set_serial_port_config(physical_name, physical_param)
+            reader.key = physical_name
+
+        else:
+            # Не реализирано
+            return -1
+
+        result = await transport.open(reader)
+        if result == 0:
+            reader.frame_decoder.reset()
+            reader.transport = transport
+
+        return result
+
+    async def _drain(self, result):
+        """Изчаква изпращането на командата, ако е била приета.
+
+        Args:
+            result (int): Резултат от синхронната команда
+
+        Returns:
+            int: Резултат от операцията
+        """
+        transport = self.reader.get_transport()
+
+        if result == 0 and transport is not None and hasattr(transport, 'drain'):
+            await transport.drain()
+
+        return result
+
+    async def inventory(self):
+        """Започва инвентаризация на тагове."""
+        return await self._drain(self.reader.inventory())
+
+    async def inventory_once(self):
+        """Започва еднократна инвентаризация на тагове."""
+        return await self._drain(self.reader.inventory_once())
+
+    async def stop(self):
+        """Спира инвентаризацията."""
+        return await self._drain(self.reader.stop())
+
+    async def reset(self):
+        """Ресетиране на четеца."""
+        return await self._drain(self.reader.reset())
+
+    async def relay_operation(self, relay_no, operation_type, time):
+        """Операция с релета."""
+        return await self._drain(self.reader.relay_operation(relay_no, operation_type, time))
+
+    async def read_tag_block(self, membank, addr, length):
+        """Прочита блок данни от таг."""
+        return await self._drain(self.reader.read_tag_block(membank, addr, length))
+
+    async def write_tag_block(self, membank, addr, length, written_data, write_start_index):
+        """Записва блок данни в таг."""
+        return await self._drain(
+            self.reader.write_tag_block(membank, addr, length, written_data, write_start_index))
+
+    async def lock_tag(self, lock_type):
+        """Заключва таг."""
+        return await self._drain(self.reader.lock_tag(lock_type))
+
+    async def kill_tag(self):
+        """Унищожава таг."""
+        return await self._drain(self.reader.kill_tag())
+
+    async def close(self):
+        """Затваря връзката с четеца.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        transport = self.reader.get_transport()
+        if transport is None:
+            return 0
+
+        self.reader.transport = None
+        return transport.release_resource()
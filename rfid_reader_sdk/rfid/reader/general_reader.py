@@ -5,8 +5,10 @@
 Еквивалент на GeneralReader.java
 """
 
+import time
+
 from rfid.reader.rfid_reader import RfidReader
-from rfid.app_notify_impl.general_reader_notify_impl import GeneralReaderNotifyImpl
+from rfid.reader.tag_read import TagRead
 
 
 class GeneralReader(RfidReader):
@@ -46,6 +48,26 @@ class GeneralReader(RfidReader):
     RFID_LOCK_KILL_PASSWORD = 4
     RFID_LOCK_ALL = 5
 
+    # Описание на рамките за поточния декодер
+    FRAME_START_FLAGS = (bytes([START_RSP_FLAG]), bytes([START_NOTIFY_FLAG]))
+    FRAME_HEADER_LEN = 2
+    # Заглавие на командите: флаг, дължина, код на команда
+    COMMAND_HEADER_FORMAT = '>BBB'
+    # Разпределяне на известията по код на команда (форматът няма поле за тип)
+    FRAME_COMMAND_OFFSET = 2
+    NOTIFY_HANDLERS = {
+        (None, CMD_NOTIFY_TAG): 'notify_recv_tags',
+        (None, RFID_CMD_STOP_INVETORY): 'notify_stop_inventory',
+        (None, RFID_CMD_RESET_DEVICE): 'notify_reset',
+        (None, RFID_CMD_READ_TAG_BLOCK): 'notify_read_tag_block',
+        (None, RFID_CMD_WRITE_TAG_BLOCK): 'notify_write_tag_block',
+        (None, RFID_CMD_LOCK_TAG): 'notify_lock_tag',
+        (None, RFID_CMD_KILL_TAG): 'notify_kill_tag',
+        (None, RFID_CMD_IDENTIFY_TAG): 'notify_inventory_once',
+        (None, RFID_CMD_QUERY_SINGLE_PARAM): 'notify_query_muti_param',
+        (None, RFID_CMD_SET_MUTI_PARAM): 'notify_set_muti_param',
+    }
+
     def __init__(self):
         """Инициализация на стандартен RFID четец."""
         super().__init__()
@@ -78,13 +100,7 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_IDENTIFY_TAG)
-        self.send_msg_buff[self.send_index] = 0x04
-        self.send_index += 1
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_IDENTIFY_TAG, b'\x04')
         return 0
 
     def stop(self):
@@ -93,11 +109,7 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_STOP_INVETORY)
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_STOP_INVETORY)
         return 0
 
     def reset(self):
@@ -106,99 +118,150 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_RESET_DEVICE)
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_RESET_DEVICE)
         return 0
 
-    def handle_message(self):
-        """Обработва съобщение."""
-        message = self.recv_msg_buff
-        buff_pos = 0
-        rsp_len = 0
+    def _get_command_header(self, command_code, frame_len):
+        """Връща стойностите на заглавието на команда.
 
-        while buff_pos <= self.recv_msg_len - 4:
-            if message[buff_pos] != self.START_RSP_FLAG and message[buff_pos] != self.START_NOTIFY_FLAG:
-                buff_pos += 1
-                continue
+        Args:
+            command_code (int): Код на командата
+            frame_len (int): Пълна дължина на рамката
 
-            rsp_len = self.get_unsigned_byte(message[buff_pos + 1])
-            checksum = message[buff_pos + rsp_len + 1]
-            calculated_checksum = self._calculate_checksum(message, buff_pos, rsp_len + 1)
+        Returns:
+            tuple: Флаг, дължина и код на командата
+        """
+        return self.START_CMD_FLAG, frame_len - 2, command_code
 
-            if calculated_checksum == checksum:
-                # Валидация на данните и обработка на съобщението
-                self.notify_message_to_app(message, buff_pos)
-                # Преминаване към следващата команда
-                buff_pos = buff_pos + rsp_len + 2
-            else:
-                buff_pos += 1
+    def _get_frame_length(self, message, start_pos):
+        """Връща пълната дължина на рамката, започваща от start_pos.
 
-    def handle_recv(self):
-        """Обработва получени данни.
+        Args:
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началния флаг
 
         Returns:
-            int: Резултат от операцията
+            int: Дължина на рамката или -1 при невалидно заглавие
         """
-        self.recv_msg_len = self.transport.read_data(self.recv_msg_buff)
-        self.handle_message()
-        return 0
+        rsp_len = self.get_unsigned_byte(message[start_pos + 1])
+
+        # Най-малко код на команда и контролна сума
+        if rsp_len < 2:
+            return -1
 
-    def _calculate_checksum(self, message, start_pos, length):
-        """Изчислява контролна сума.
+        return rsp_len + 2
+
+    @classmethod
+    def decode_tag_reads(cls, message, start_index, reader_key=None, receive_time=None):
+        """Декодира известие за таг: флаг, дължина, 0xFF, устройство, дължина на EPC, EPC.
 
         Args:
-            message (bytearray): Съобщение
-            start_pos (int): Начална позиция
-            length (int): Дължина
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            reader_key (str): Ключ на четеца за записите
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            list: Един запис TagRead
+
+        Raises:
+            ValueError: При дължина на EPC, която не се побира в рамката
+        """
+        # Дължината на рамката брои 0xFF, устройство, дължина на EPC, EPC и контролна сума
+        frame_len = message[start_index + 1]
+        epc_len = message[start_index + 4]
+
+        if epc_len + 4 > frame_len:
+            raise ValueError(f"General EPC length {epc_len} does not fit frame length {frame_len}")
+
+        epc_start = start_index + 5
+        if len(message) < epc_start + epc_len:
+            raise ValueError(f"General tag notification is truncated: {len(message) - start_index} bytes")
+
+        if receive_time is None:
+            receive_time = time.time()
+
+        epc = bytes(message[epc_start:epc_start + epc_len])
+        return [TagRead(epc, None, None, None, reader_key, receive_time)]
+
+    def get_tag_reads(self, message, start_index, receive_time=None):
+        """Декодира известие за таг като записи TagRead с ключа на четеца.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            list: Записи TagRead
+        """
+        return self.decode_tag_reads(message, start_index, self.key, receive_time)
+
+    def get_identified_tag_reads(self, message, start_index, receive_time=None):
+        """Декодира отговора на еднократна инвентаризация: дължина на EPC, EPC.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
 
         Returns:
-            int: Контролна сума
+            list: Записи TagRead (празен при неуспех)
+
+        Raises:
+            ValueError: При дължина на EPC, която не се побира в рамката
         """
-        checksum = 0
+        frame_len = message[start_index + 1]
+
+        # Само при грешка се връща дължина по-малка от 4
+        if frame_len <= 3:
+            return []
+
+        # Дължината на рамката брои кода на командата, дължина на EPC, EPC и контролна сума
+        epc_len = message[start_index + 3]
+
+        if epc_len + 3 > frame_len:
+            raise ValueError(f"General EPC length {epc_len} does not fit frame length {frame_len}")
+
+        epc_start = start_index + 4
+        if len(message) < epc_start + epc_len:
+            raise ValueError(f"General inventory response is truncated: {len(message) - start_index} bytes")
+
+        if receive_time is None:
+            receive_time = time.time()
 
-        for i in range(length):
-            checksum += self.get_unsigned_byte(message[start_pos + i])
+        epc = bytes(message[epc_start:epc_start + epc_len])
+        return [TagRead(epc, None, None, None, self.key, receive_time)]
 
-        checksum = (~checksum + 1) & 0xFF
-        return checksum
+    def get_response_status(self, message, start_index):
+        """Връща статуса от отговор на команда (байтът след кода на командата).
 
-    def notify_message_to_app(self, message, start_index):
-        """Известява приложението за съобщение.
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            int: Статус (0 - успех)
+        """
+        return message[start_index + 3]
+
+    def get_tag_block(self, message, start_index):
+        """Декодира отговор на четене на блок: статус, област, адрес, дължина, данни.
 
         Args:
-            message (bytearray): Съобщение
-            start_index (int): Начален индекс
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            tuple: (област, адрес, дължина, данни) или None при неуспех
         """
-        app_notify = self.get_app_notify()
-
-        if not app_notify or not isinstance(app_notify, GeneralReaderNotifyImpl):
-            return
-
-        command = message[start_index + 2]
-
-        if command == self.CMD_NOTIFY_TAG:
-            app_notify.notify_recv_tags(message, start_index)
-        elif command == self.RFID_CMD_STOP_INVETORY:
-            app_notify.notify_stop_inventory(message, start_index)
-        elif command == self.RFID_CMD_RESET_DEVICE:
-            app_notify.notify_reset(message, start_index)
-        elif command == self.RFID_CMD_READ_TAG_BLOCK:
-            app_notify.notify_read_tag_block(message, start_index)
-        elif command == self.RFID_CMD_WRITE_TAG_BLOCK:
-            app_notify.notify_write_tag_block(message, start_index)
-        elif command == self.RFID_CMD_LOCK_TAG:
-            app_notify.notify_lock_tag(message, start_index)
-        elif command == self.RFID_CMD_KILL_TAG:
-            app_notify.notify_kill_tag(message, start_index)
-        elif command == self.RFID_CMD_IDENTIFY_TAG:
-            app_notify.notify_inventory_once(message, start_index)
-        elif command == self.RFID_CMD_QUERY_SINGLE_PARAM:
-            app_notify.notify_query_muti_param(message, start_index)
-        elif command == self.RFID_CMD_SET_MUTI_PARAM:
-            app_notify.notify_set_muti_param(message, start_index)
+        if message[start_index + 1] <= 3:
+            return None
+
+        length = message[start_index + 6]
+        data_start = start_index + 7
+        return (message[start_index + 4], message[start_index + 5], length,
+                bytes(message[data_start:data_start + length * 2]))
 
     def read_tag_block(self, membank, addr, length):
         """Прочита блок данни от таг.
@@ -211,19 +274,7 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_READ_TAG_BLOCK)
-        self.send_msg_buff[self.send_index] = 0x04
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = membank
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = addr
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = length
-        self.send_index += 1
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_command(self.RFID_CMD_READ_TAG_BLOCK, 'BBBB', 0x04, membank, addr, length)
         return 0
 
     def write_tag_block(self, membank, addr, length, written_data, write_start_index):
@@ -239,27 +290,10 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_WRITE_TAG_BLOCK)
-        self.send_msg_buff[self.send_index] = 0x04
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x01
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = membank
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = addr
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = length
-        self.send_index += 1
-
-        # Запълване на данните за запис
-        for i in range(length * 2):
-            self.send_msg_buff[self.send_index] = written_data[write_start_index + i]
-            self.send_index += 1
-
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        data_len = length * 2
+        written = bytes(written_data[write_start_index:write_start_index + data_len])
+        self.send_command(self.RFID_CMD_WRITE_TAG_BLOCK, f'BBBBB{data_len}s',
+                          0x04, 0x01, membank, addr, length, written)
         return 0
 
     def lock_tag(self, lock_type):
@@ -271,15 +305,7 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_LOCK_TAG)
-        self.send_msg_buff[self.send_index] = 0x04
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = lock_type
-        self.send_index += 1
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_command(self.RFID_CMD_LOCK_TAG, 'BB', 0x04, lock_type)
         return 0
 
     def kill_tag(self):
@@ -288,22 +314,8 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_KILL_TAG)
-        self.send_msg_buff[self.send_index] = 0x04
-        self.send_index += 1
         # Парола по подразбиране е 0
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_KILL_TAG, b'\x04\x00\x00\x00\x00')
         return 0
 
     def query_parameter(self, mem_address, query_len):
@@ -316,17 +328,7 @@ class GeneralReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_QUERY_MUTI_PARAM)
-        self.send_msg_buff[self.send_index] = query_len
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = mem_address
-        self.send_index += 1
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_command(self.RFID_CMD_QUERY_MUTI_PARAM, 'BBB', query_len, 0x00, mem_address)
         return 0
 
     def set_muti_parameter(self, mem_address, param_len, params):
@@ -343,22 +345,8 @@ class GeneralReader(RfidReader):
         if params is None or param_len > len(params):
             return -1
 
-        self.build_message_header(self.RFID_CMD_SET_MUTI_PARAM)
-        self.send_msg_buff[self.send_index] = param_len
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = mem_address
-        self.send_index += 1
-
-        for param_index in range(param_len):
-            self.send_msg_buff[self.send_index] = params[param_index]
-            self.send_index += 1
-
-        self.send_msg_buff[1] = self.send_index - 1
-        self.send_msg_buff[self.send_index] = self._calculate_checksum(self.send_msg_buff, 0, self.send_index)
-        self.send_index += 1
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_command(self.RFID_CMD_SET_MUTI_PARAM, f'BBB{param_len}s',
+                          param_len, 0x00, mem_address, bytes(params[:param_len]))
         return 0
 
     def relay_operation(self, relay_no, operation_type, time):
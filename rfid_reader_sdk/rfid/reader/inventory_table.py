@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Таблица на инвентаризацията с премахване на повторенията.
+
+При непрекъсната инвентаризация четецът съобщава един и същ EPC много пъти
+в секунда. InventoryTable пази по един запис на EPC (първо и последно
+прочитане, брой, RSSI, последна антена) и подава на приложението само
+промените: нов таг (on_new_tag) и изчезнал таг (on_tag_gone), когато не е
+прочетен в продължение на ttl секунди.
+
+Сроковете на записите са в колело на таймерите (TimingWheel). Повторното
+прочитане само обновява last_seen; когато срокът на запис изтече, той се
+поставя отново към last_seen + ttl, ако междувременно е прочетен. Така
+прочитания, пристигнали извън реда на receive_time (няколко четеца в различни
+шардове, закъснели рамки от NotifyExecutor или TagBatcher), не задържат
+премахването на други записи.
+"""
+
+import threading
+import time
+
+from rfid.reader.reader_events import TagReadEvent
+from rfid.reader.timing_wheel import TimingWheel
+
+
+class InventoryEntry:
+    """Запис за един EPC в таблицата на инвентаризацията."""
+
+    __slots__ = ('epc', 'first_seen', 'last_seen', 'read_count', 'rssi_min', 'rssi_max', 'rssi_sum',
+                 'rssi_count', 'antenna', 'reader_key')
+
+    def __init__(self, epc, seen_time):
+        """Инициализация.
+
+        Args:
+            epc (bytes): EPC на тага
+            seen_time (float): Време на първото прочитане (time.time())
+        """
+        self.epc = epc
+        self.first_seen = seen_time
+        self.last_seen = seen_time
+        self.read_count = 0
+        self.rssi_min = None
+        self.rssi_max = None
+        self.rssi_sum = 0
+        self.rssi_count = 0
+        self.antenna = None
+        self.reader_key = None
+
+    @property
+    def rssi_mean(self):
+        """Средна стойност на RSSI или None, ако четецът не съобщава RSSI."""
+        if not self.rssi_count:
+            return None
+        return self.rssi_sum / self.rssi_count
+
+    def __repr__(self):
+        """Текстово представяне."""
+        return (f"InventoryEntry(epc={self.epc.hex()}, reads={self.read_count}, "
+                f"first_seen={self.first_seen}, last_seen={self.last_seen}, "
+                f"rssi={self.rssi_min}/{self.rssi_mean}/{self.rssi_max}, antenna={self.antenna}, "
+                f"reader_key={self.reader_key!r})")
+
+
+class InventoryTable:
+    """Таблица с един запис на EPC и събития само при промяна."""
+
+    def __init__(self, ttl=5.0, on_new_tag=None, on_tag_gone=None, scheduler=None, sweep_interval=None,
+                 resolution=0.1):
+        """Инициализация.
+
+        Args:
+            ttl (float): Секунди без прочитане, след които тагът се смята за изчезнал
+            on_new_tag (callable): Функция on_new_tag(entry) при първо прочитане на EPC
+            on_tag_gone (callable): Функция on_tag_gone(entry) при премахване на изтекъл запис
+            scheduler: Обект с call_later(delay, callback, *args), например шардът от
+                TransportThreadManager.get_reader_shard(reader). Без него изтеклите
+                записи се премахват само при update() и expire().
+            sweep_interval (float): Секунди между проверките за изтекли записи
+                (None - половината от ttl)
+            resolution (float): Точност на сроковете в секунди
+        """
+        self.ttl = ttl
+        self.on_new_tag = on_new_tag
+        self.on_tag_gone = on_tag_gone
+        self.scheduler = scheduler
+        self.sweep_interval = sweep_interval if sweep_interval is not None else ttl / 2.0
+        self.entries = {}  # EPC -> InventoryEntry
+        self.wheel = TimingWheel(resolution, ttl, start_time=time.time())
+        self._lock = threading.Lock()
+        self._sweeping = False
+        # Статистика
+        self.read_count = 0
+        self.new_tag_count = 0
+        self.gone_tag_count = 0
+
+    def __len__(self):
+        """Брой тагове в таблицата."""
+        return len(self.entries)
+
+    def __contains__(self, epc):
+        """Дали EPC е в таблицата."""
+        return epc in self.entries
+
+    def get(self, epc):
+        """Връща записа за EPC или None.
+
+        Args:
+            epc (bytes): EPC на тага
+
+        Returns:
+            InventoryEntry: Записът или None
+        """
+        return self.entries.get(epc)
+
+    def attach(self, event_notify):
+        """Абонира таблицата за прочетените тагове.
+
+        Args:
+            event_notify (EventNotifyImpl): Източник на събития
+        """
+        event_notify.subscribe(TagReadEvent, self._on_tag_read_event)
+
+    def detach(self, event_notify):
+        """Прекратява абонамента.
+
+        Args:
+            event_notify (EventNotifyImpl): Източник на събития
+        """
+        event_notify.unsubscribe(TagReadEvent, self._on_tag_read_event)
+
+    def _on_tag_read_event(self, event):
+        """Обработва TagReadEvent."""
+        self.update(event.tag_reads)
+
+    def update(self, tag_reads):
+        """Отразява прочитания в таблицата.
+
+        Args:
+            tag_reads (list): Записи TagRead
+        """
+        new_entries = []
+        entries = self.entries
+
+        with self._lock:
+            now = time.time()
+
+            for tag_read in tag_reads:
+                epc = tag_read.epc
+                seen_time = tag_read.receive_time if tag_read.receive_time is not None else now
+                entry = entries.get(epc)
+
+                if entry is None:
+                    entry = InventoryEntry(epc, seen_time)
+                    entries[epc] = entry
+                    self.wheel.schedule(entry, seen_time + self.ttl)
+                    new_entries.append(entry)
+                elif seen_time > entry.last_seen:
+                    # Срокът в колелото не се мести - проверява се при изтичането му
+                    entry.last_seen = seen_time
+
+                entry.read_count += 1
+                entry.reader_key = tag_read.reader_key
+
+                rssi = tag_read.rssi
+                if rssi is not None:
+                    if entry.rssi_count == 0:
+                        entry.rssi_min = entry.rssi_max = rssi
+                    elif rssi < entry.rssi_min:
+                        entry.rssi_min = rssi
+                    elif rssi > entry.rssi_max:
+                        entry.rssi_max = rssi
+                    entry.rssi_sum += rssi
+                    entry.rssi_count += 1
+
+                if tag_read.antenna is not None:
+                    entry.antenna = tag_read.antenna
+
+            self.read_count += len(tag_reads)
+            self.new_tag_count += len(new_entries)
+            gone_entries = self._pop_expired(now)
+            start_sweep = self.scheduler is not None and not self._sweeping and bool(entries)
+            if start_sweep:
+                self._sweeping = True
+
+        if start_sweep:
+            self.scheduler.call_later(self.sweep_interval, self._on_sweep)
+
+        self._notify(new_entries, gone_entries)
+
+    def _pop_expired(self, now):
+        """Премахва записите без прочитане след now - ttl (под заключването).
+
+        Returns:
+            list: Премахнатите записи
+        """
+        entries = self.entries
+        ttl = self.ttl
+        gone_entries = []
+
+        for entry in self.wheel.advance(now):
+            deadline = entry.last_seen + ttl
+
+            if deadline > now:
+                self.wheel.schedule(entry, deadline)
+            else:
+                del entries[entry.epc]
+                gone_entries.append(entry)
+
+        self.gone_tag_count += len(gone_entries)
+        return gone_entries
+
+    def _notify(self, new_entries, gone_entries):
+        """Извиква функциите за нови и изчезнали тагове извън заключването."""
+        if self.on_new_tag is not None:
+            for entry in new_entries:
+                self.on_new_tag(entry)
+
+        if self.on_tag_gone is not None:
+            for entry in gone_entries:
+                self.on_tag_gone(entry)
+
+    def expire(self, now=None):
+        """Премахва изтеклите записи и извиква on_tag_gone за тях.
+
+        Args:
+            now (float): Текущо време (None - time.time())
+
+        Returns:
+            int: Брой премахнати записи
+        """
+        with self._lock:
+            gone_entries = self._pop_expired(time.time() if now is None else now)
+
+        self._notify((), gone_entries)
+        return len(gone_entries)
+
+    def _on_sweep(self):
+        """Таймер на шарда: премахва изтеклите записи, докато таблицата не е празна."""
+        self.expire()
+
+        with self._lock:
+            self._sweeping = sweeping = bool(self.entries)
+
+        if sweeping:
+            self.scheduler.call_later(self.sweep_interval, self._on_sweep)
+
+    def clear(self):
+        """Изпразва таблицата без да извиква on_tag_gone."""
+        with self._lock:
+            self.entries.clear()
+            self.wheel = TimingWheel(self.wheel.resolution, self.ttl, start_time=time.time())
+
+    def get_statistics(self):
+        """Връща статистиката.
+
+        Returns:
+            dict: Брой тагове, прочитания, нови и изчезнали тагове
+        """
+        return {
+            'tags': len(self.entries),
+            'reads': self.read_count,
+            'new_tags': self.new_tag_count,
+            'gone_tags': self.gone_tag_count,
+            # Прочитания, които не са стигнали до приложението
+            'suppressed_reads': self.read_count - self.new_tag_count,
+        }
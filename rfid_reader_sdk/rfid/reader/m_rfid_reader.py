@@ -5,8 +5,12 @@
 Еквивалент на MRfidReader.java
 """
 
+import time
+
+from rfid.message.tlv import iter_tlvs
 from rfid.reader.rfid_reader import RfidReader
-from rfid.app_notify_impl.m_rfid_reader_notify_impl import MRfidReaderNotifyImpl
+from rfid.reader.uhf_protocol.protocol_base import TLVType
+from rfid.reader.uhf_protocol.tlv_structures import decode_tag_read
 
 
 class MRfidReader(RfidReader):
@@ -14,8 +18,32 @@ class MRfidReader(RfidReader):
 
     # Константи за команди
     MREADER_CMD_RESET = 0x10
+    MREADER_CMD_INVENTORY = 0x21
+    MREADER_CMD_INVENTORY_ONCE = 0x22
+    MREADER_CMD_STOP = 0x23
     MREADER_NOTIFY_TAG = 0x80
 
+    # Описание на рамките за поточния декодер
+    FRAME_START_FLAGS = (b'RF',)
+    FRAME_HEADER_LEN = 8
+    # Заглавие на командите: 'RF', тип, reader_id, код на команда, дължина
+    COMMAND_HEADER_FORMAT = '>2sB2sBH'
+    # Разпределяне на известията: тип 1 - отговор, тип 2 - известие
+    FRAME_TYPE_RESPONSE = 1
+    FRAME_TYPE_NOTIFY = 2
+    FRAME_TYPE_OFFSET = 2
+    FRAME_COMMAND_OFFSET = 5
+    NOTIFY_HANDLERS = {
+        (FRAME_TYPE_RESPONSE, MREADER_CMD_RESET): 'notify_reset',
+        (FRAME_TYPE_NOTIFY, MREADER_NOTIFY_TAG): 'notify_recv_tags',
+    }
+    # Отговорите за старт и стоп се подават само на EventNotifyImpl (InventoryStartedEvent,
+    # InventoryStoppedEvent); MRfidReaderNotifyImpl и наследниците му не ги получават
+    OPTIONAL_NOTIFY_HANDLERS = {
+        (FRAME_TYPE_RESPONSE, MREADER_CMD_INVENTORY): 'notify_start_inventory',
+        (FRAME_TYPE_RESPONSE, MREADER_CMD_STOP): 'notify_stop_inventory',
+    }
+
     def __init__(self):
         """Инициализация на M RFID четец."""
         super().__init__()
@@ -23,25 +51,6 @@ class MRfidReader(RfidReader):
         self.reader_id[0] = 0
         self.reader_id[1] = 0
 
-    def _calculate_checksum(self, message, start_pos, length):
-        """Изчислява контролна сума.
-
-        Args:
-            message (bytearray): Съобщение
-            start_pos (int): Начална позиция
-            length (int): Дължина
-
-        Returns:
-            int: Контролна сума
-        """
-        checksum = 0
-
-        for i in range(length):
-            checksum += self.get_unsigned_byte(message[start_pos + i])
-
-        checksum = (~checksum + 1) & 0xFF
-        return checksum
-
     def _fill_length_and_checksum(self):
         """Запълва дължината и контролната сума."""
         indeed_len = self.send_index + 1 - 6
@@ -84,9 +93,7 @@ class MRfidReader(RfidReader):
         if self.transport is None:
             return -1
 
-        self.build_message_header(0x21)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.MREADER_CMD_INVENTORY)
         return 0
 
     def inventory_once(self):
@@ -98,9 +105,7 @@ class MRfidReader(RfidReader):
         if self.transport is None:
             return -1
 
-        self.build_message_header(0x22)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.MREADER_CMD_INVENTORY_ONCE)
         return 0
 
     def stop(self):
@@ -112,9 +117,7 @@ class MRfidReader(RfidReader):
         if self.transport is None:
             return -1
 
-        self.build_message_header(0x23)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.MREADER_CMD_STOP)
         return 0
 
     def reset(self):
@@ -126,9 +129,7 @@ class MRfidReader(RfidReader):
         if self.transport is None:
             return -1
 
-        self.build_message_header(0x10)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.MREADER_CMD_RESET)
         return 0
 
     def read_tag_block(self, membank, addr, length):
@@ -178,54 +179,132 @@ class MRfidReader(RfidReader):
         """
         return 0
 
-    def handle_message(self):
-        """Обработва съобщение."""
-        message = self.recv_msg_buff
-        buff_pos = 0
-        param_len = 0
+    def _get_command_header(self, command_code, frame_len):
+        """Връща стойностите на заглавието на команда.
 
-        while buff_pos <= self.recv_msg_len - 9:
-            if message[buff_pos] != ord('R') or message[buff_pos + 1] != ord('F'):
-                buff_pos += 1
-                continue
+        Args:
+            command_code (int): Код на командата
+            frame_len (int): Пълна дължина на рамката
 
-            param_len = self.get_unsigned_byte(message[buff_pos + 6])
-            param_len = param_len << 8
-            param_len += self.get_unsigned_byte(message[buff_pos + 7])
+        Returns:
+            tuple: Стойности на полетата на заглавието
+        """
+        return b'RF', 0, bytes(self.reader_id), command_code, frame_len - 6
 
-            if param_len > 255:
-                buff_pos += 1
-                continue
+    def _get_frame_length(self, message, start_pos):
+        """Връща пълната дължина на рамката, започваща от start_pos.
 
-            checksum = message[buff_pos + param_len + 8]
-            calculated_checksum = self._calculate_checksum(message, buff_pos, param_len + 8)
+        Args:
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началния флаг
 
-            if calculated_checksum == checksum:
-                # Валидация на данните и обработка на съобщението
-                self.notify_message_to_app(message, buff_pos)
-                # Преминаване към следващата команда
-                buff_pos = buff_pos + param_len + 9
-            else:
-                buff_pos += 1
+        Returns:
+            int: Дължина на рамката или -1 при невалидно заглавие
+        """
+        param_len = self.get_unsigned_byte(message[start_pos + 6])
+        param_len = param_len << 8
+        param_len += self.get_unsigned_byte(message[start_pos + 7])
 
-    def notify_message_to_app(self, message, start_index):
-        """Известява приложението за съобщение.
+        if param_len > 255:
+            return -1
+
+        return param_len + 9
+
+    def _get_frame_reader_id(self, message, start_pos):
+        """Връща идентификатора на четеца от валидна рамка.
 
         Args:
-            message (bytearray): Съобщение
-            start_index (int): Начален индекс
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началото на рамката
+
+        Returns:
+            bytes: Идентификатор на четеца (2 байта)
         """
-        app_notify = self.get_app_notify()
+        return bytes(message[start_pos + 3:start_pos + 5])
+
+    @classmethod
+    def decode_tag_reads(cls, message, start_index, reader_key=None, receive_time=None):
+        """Декодира всички тагове от известие с едно обхождане на TLV.
 
-        if not app_notify or not isinstance(app_notify, MRfidReaderNotifyImpl):
-            return
+        Всеки TLV 0x50 е един таг; вложените в него EPC, TID, RSSI, време и
+        антена се декодират с decode_tag_read от uhf_protocol. Тагове без EPC
+        се пропускат.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            reader_key (str): Ключ на четеца за записите
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            list: Записи TagRead в реда на рамката
+        """
+        if receive_time is None:
+            receive_time = time.time()
 
-        if message[start_index + 2] == 1:
-            if message[start_index + 5] == self.MREADER_CMD_RESET:
-                app_notify.notify_reset(message, start_index)
-        elif message[start_index + 2] == 2:
-            if message[start_index + 5] == self.MREADER_NOTIFY_TAG:
-                app_notify.notify_recv_tags(message, start_index)
+        param_len = (message[start_index + 6] << 8) | message[start_index + 7]
+        params_start = start_index + 8
+        params_end = min(params_start + param_len, len(message))
+        tag_reads = []
+
+        # Обхождат се само TLV от горното ниво; вложените декодира decode_tag_read
+        for tlv_type, offset, length in iter_tlvs(message, params_start, params_end, ()):
+            if tlv_type == TLVType.TAG:
+                value_start = offset + 2
+                tag_read = decode_tag_read(message, value_start, value_start + length, reader_key, receive_time)
+                if tag_read is not None:
+                    tag_reads.append(tag_read)
+
+        return tag_reads
+
+    def get_tag_reads(self, message, start_index, receive_time=None):
+        """Декодира известие за тагове като записи TagRead с ключа на четеца.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            list: Записи TagRead
+        """
+        return self.decode_tag_reads(message, start_index, self.key, receive_time)
+
+    def get_response_status(self, message, start_index):
+        """Връща статуса от TLV 0x07 на отговор.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            int: Статус (0 - успех); 0, ако отговорът няма TLV за статус
+        """
+        param_len = (message[start_index + 6] << 8) | message[start_index + 7]
+        params_start = start_index + 8
+        params_end = min(params_start + param_len, len(message))
+
+        for tlv_type, offset, length in iter_tlvs(message, params_start, params_end, ()):
+            if tlv_type == TLVType.STATUS and length:
+                return message[offset + 2]
+
+        return 0
+
+    def append_tags_to(self, batch, message, start_index, receive_time=None):
+        """Добавя таговете от известие към колонна партида.
+
+        Args:
+            batch (TagBatch): Партида
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            int: Брой добавени тагове
+        """
+        tag_reads = self.get_tag_reads(message, start_index, receive_time)
+        batch.extend_tag_reads(tag_reads)
+        return len(tag_reads)
 
     def relay_operation(self, relay_no, operation_type, op_time):
         """Операция с релета.
@@ -238,36 +317,17 @@ class MRfidReader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        index = 0
-
         if self.transport is None:
             return -1
 
-        self.build_message_header(0x4C)
-        # Добавяне на TLV
-        self.send_msg_buff[self.send_index] = 0x27
-        self.send_index += 1
-        index = self.send_index
-        self.send_index += 1
-        self.send_msg_buff[self.send_index] = 0x00
-        self.send_index += 1
+        # TLV 0x27: дължина на стойността, 0x00 и по три байта за всяко реле
+        params = ()
 
         if (relay_no & 0x01) != 0:
-            self.send_msg_buff[self.send_index] = 1
-            self.send_index += 1
-            self.send_msg_buff[self.send_index] = operation_type
-            self.send_index += 1
-            self.send_msg_buff[self.send_index] = op_time
-            self.send_index += 1
+            params += (1, operation_type, op_time)
 
         if (relay_no & 0x02) != 0:
-            self.send_msg_buff[self.send_index] = 2
-            self.send_index += 1
-            self.send_msg_buff[self.send_index] = operation_type
-            self.send_index += 1
-            self.send_msg_buff[self.send_index] = op_time
-            self.send_index += 1
-
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+            params += (2, operation_type, op_time)
+
+        self.send_command(0x4C, 'BBB' + 'B' * len(params), 0x27, 1 + len(params), 0x00, *params)
         return 0
\ No newline at end of file
@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Изпълнение на известията към приложението в отделни нишки.
+
+Без изпълнител notify_message_to_app извиква обработчика в нишката за
+получаване, така че бавен обработчик (например запис в база данни) спира
+четенето на всички четци в шарда. Четец, свързан с NotifyExecutor, копира
+рамката в собствена ограничена опашка и се връща веднага; нишките на
+изпълнителя изпразват опашките.
+
+Рамките на един четец се обработват последователно и в реда на получаване;
+различни четци се обработват паралелно. Обработчиците на AppNotify, общ за
+няколко четеца, трябва да са безопасни за нишки.
+"""
+
+import collections
+import threading
+import time
+
+
+class NotifyQueue:
+    """Ограничена опашка с рамки за известяване на един четец."""
+
+    # Поведение при пълна опашка
+    POLICY_BLOCK = 'block'                  # Нишката за получаване чака място
+    POLICY_DROP_OLDEST = 'drop_oldest'      # Изхвърля се най-старата рамка
+    POLICY_DROP_NEWEST = 'drop_newest'      # Изхвърля се новата рамка
+    POLICY_COALESCE_EPC = 'coalesce_epc'    # Нова рамка със същите EPC замества чакащата
+
+    POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_COALESCE_EPC)
+
+    def __init__(self, executor, reader, capacity, policy):
+        """Инициализация.
+
+        Args:
+            executor (NotifyExecutor): Изпълнителят, който изпразва опашката
+            reader (RfidReader): Четецът на опашката
+            capacity (int): Най-много чакащи рамки
+            policy (str): Една от константите POLICY_*
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown notify queue policy: {policy}")
+
+        self.executor = executor
+        self.reader = reader
+        self.capacity = max(1, capacity)
+        self.policy = policy
+        # Чакащи рамки: [обработчик, рамка, време на поставяне (ns), ключ за сливане]
+        self.items = collections.deque()
+        # {ключ за сливане: чакащ елемент} при POLICY_COALESCE_EPC
+        self.pending_keys = {}
+        self.scheduled = False
+        self.not_full = threading.Condition(executor.lock)
+        # Статистика
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.errors = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+        self.callback_total_ns = 0
+
+    def get_coalesce_key(self, handler, frame):
+        """Връща ключа за сливане на рамка с тагове или None.
+
+        Args:
+            handler (callable): Обработчикът на рамката
+            frame (bytes): Копие на рамката
+
+        Returns:
+            tuple: EPC на таговете в рамката или None, ако рамката не е с тагове
+        """
+        if getattr(handler, '__name__', None) != 'notify_recv_tags':
+            return None
+
+        try:
+            return tuple(tag_read.epc for tag_read in self.reader.get_tag_reads(frame, 0, 0.0))
+        except (ValueError, IndexError):
+            return None
+
+    def put(self, handler, message, start_index):
+        """Копира рамката и я поставя в опашката според политиката.
+
+        Args:
+            handler (callable): Обработчик handler(message, start_index)
+            message (bytearray): Буфер с рамката (презаписва се след връщането)
+            start_index (int): Начало на рамката
+        """
+        executor = self.executor
+
+        if not executor.running:
+            # Изпълнителят не е стартиран или е спрян - известява се веднага
+            handler(message, start_index)
+            return
+
+        frame_len = self.reader._get_frame_length(message, start_index)
+        frame = bytes(message[start_index:start_index + frame_len])
+        key = None
+
+        if self.policy == self.POLICY_COALESCE_EPC:
+            key = self.get_coalesce_key(handler, frame)
+
+        with executor.lock:
+            if key is not None:
+                pending = self.pending_keys.get(key)
+
+                if pending is not None:
+                    # Същите тагове чакат - подава се само най-новото четене
+                    pending[1] = frame
+                    self.coalesced += 1
+                    return
+
+            if len(self.items) >= self.capacity:
+                if self.policy == self.POLICY_BLOCK:
+                    while len(self.items) >= self.capacity and executor.running:
+                        self.not_full.wait()
+                elif self.policy == self.POLICY_DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                else:
+                    self._discard(self.items.popleft())
+                    self.dropped += 1
+
+            if executor.running:
+                self._append(handler, frame, key)
+                return
+
+        # Изпълнителят е спрян, докато нишката е чакала място
+        handler(frame, 0)
+
+    def _append(self, handler, frame, key):
+        """Добавя рамка и планира опашката (под заключването на изпълнителя)."""
+        items = self.items
+        item = [handler, frame, time.perf_counter_ns(), key]
+        items.append(item)
+
+        if key is not None:
+            self.pending_keys[key] = item
+
+        self.enqueued += 1
+        if len(items) > self.max_depth:
+            self.max_depth = len(items)
+
+        if not self.scheduled:
+            self.scheduled = True
+            self.executor.schedule(self)
+
+    def _discard(self, item):
+        """Премахва ключа за сливане на елемент, който напуска опашката."""
+        key = item[3]
+
+        if key is not None and self.pending_keys.get(key) is item:
+            del self.pending_keys[key]
+
+    def take(self, max_items):
+        """Взема до max_items чакащи рамки (извиква се под заключването на изпълнителя)."""
+        items = self.items
+        batch = []
+
+        while items and len(batch) < max_items:
+            item = items.popleft()
+            self._discard(item)
+            batch.append(item)
+
+        self.not_full.notify_all()
+        return batch
+
+    def get_statistics(self):
+        """Връща статистиката на опашката.
+
+        Returns:
+            dict: Дълбочина, изхвърлени и слети рамки, закъснение на обработчиците
+        """
+        processed = self.processed
+
+        return {
+            'reader': self.reader.get_key(),
+            'policy': self.policy,
+            'capacity': self.capacity,
+            'depth': len(self.items),
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'processed': processed,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            # От поставянето в опашката до края на обработчика
+            'latency_avg_ns': self.latency_total_ns // processed if processed else 0,
+            'latency_max_ns': self.latency_max_ns,
+            'callback_avg_ns': self.callback_total_ns // processed if processed else 0,
+        }
+
+
+class NotifyExecutor:
+    """Нишки, които изпълняват известията на свързаните четци."""
+
+    # Най-много рамки на един четец, обработени преди да се даде ред на друг
+    BATCH_SIZE = 64
+
+    def __init__(self, worker_count=2):
+        """Инициализация.
+
+        Args:
+            worker_count (int): Брой нишки за известяване
+        """
+        self.worker_count = max(1, worker_count)
+        self.lock = threading.Lock()
+        self.ready = collections.deque()  # Опашки с чакащи рамки
+        self.work_available = threading.Condition(self.lock)
+        self.queues = {}  # четец -> NotifyQueue
+        self.workers = []
+        self.running = False
+
+    def start(self):
+        """Стартира нишките за известяване."""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+
+        self.workers = [threading.Thread(target=self._run, name=f"RfidNotifyWorker-{index}", daemon=True)
+                        for index in range(self.worker_count)]
+
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self, timeout=2.0):
+        """Спира нишките, след като обработят вече чакащите рамки.
+
+        Args:
+            timeout (float): Най-много секунди за изчакване на всяка нишка
+        """
+        with self.lock:
+            self.running = False
+            self.work_available.notify_all()
+
+            for queue in self.queues.values():
+                queue.not_full.notify_all()
+
+        for worker in self.workers:
+            worker.join(timeout)
+
+        self.workers = []
+
+    def attach(self, reader, capacity=1024, policy=NotifyQueue.POLICY_BLOCK):
+        """Свързва четец с изпълнителя.
+
+        Args:
+            reader (RfidReader): Четецът
+            capacity (int): Най-много чакащи рамки на четеца
+            policy (str): Поведение при пълна опашка (NotifyQueue.POLICY_*)
+
+        Returns:
+            NotifyQueue: Опашката на четеца
+        """
+        queue = NotifyQueue(self, reader, capacity, policy)
+
+        with self.lock:
+            self.queues[reader] = queue
+
+        reader.notify_queue = queue
+        return queue
+
+    def detach(self, reader):
+        """Премахва четеца; следващите рамки се обработват в нишката за получаване.
+
+        Вече поставените рамки се обработват.
+
+        Args:
+            reader (RfidReader): Четецът
+        """
+        if reader.notify_queue is not None and reader.notify_queue.executor is self:
+            reader.notify_queue = None
+
+        with self.lock:
+            self.queues.pop(reader, None)
+
+    def schedule(self, queue):
+        """Поставя опашка с чакащи рамки за обработка (под заключването)."""
+        self.ready.append(queue)
+        self.work_available.notify()
+
+    def _run(self):
+        """Цикъл на нишка за известяване."""
+        lock = self.lock
+        ready = self.ready
+
+        while True:
+            with lock:
+                while not ready and self.running:
+                    self.work_available.wait()
+
+                if not ready:
+                    return
+
+                queue = ready.popleft()
+                batch = queue.take(self.BATCH_SIZE)
+
+            errors = 0
+            latency_total = 0
+            latency_max = 0
+            callback_total = 0
+
+            for handler, frame, enqueue_ns, _ in batch:
+                callback_start = time.perf_counter_ns()
+
+                try:
+                    handler(frame, 0)
+                except Exception as e:
+                    errors += 1
+                    print(f"Error in notify callback: {e}")
+
+                callback_end = time.perf_counter_ns()
+                callback_total += callback_end - callback_start
+                latency = callback_end - enqueue_ns
+                latency_total += latency
+                if latency > latency_max:
+                    latency_max = latency
+
+            with lock:
+                queue.processed += len(batch)
+                queue.errors += errors
+                queue.latency_total_ns += latency_total
+                queue.callback_total_ns += callback_total
+                if latency_max > queue.latency_max_ns:
+                    queue.latency_max_ns = latency_max
+
+                # Опашката остава за една нишка, докато има рамки, за да се запази редът
+                if queue.items:
+                    ready.append(queue)
+                    self.work_available.notify()
+                else:
+                    queue.scheduled = False
+
+    def get_statistics(self):
+        """Връща статистиката на всички опашки.
+
+        Returns:
+            list: Речник със статистика за всеки свързан четец
+        """
+        with self.lock:
+            return [queue.get_statistics() for queue in self.queues.values()]
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Присъствие на тагове пред четци и в зони.
+
+PresenceTracker получава прочитанията от всички четци и подава TagEnteredEvent
+при първо прочитане на EPC пред четец или в зона и TagExitedEvent, когато EPC
+не е прочетен там в продължение на timeout секунди.
+
+Сроковете са в йерархично колело на таймерите (TimingWheel), така че
+изтеклите записи се намират без обхождане на всички тагове. Всеки запис е в
+колелото най-много веднъж: повторното прочитане само обновява last_seen, а
+при изтичане на поставения срок записът се поставя отново към
+last_seen + timeout, ако междувременно е прочетен. Така цената на едно
+прочитане е O(1), а всеки запис се мести в колелото най-много веднъж на
+timeout.
+"""
+
+import threading
+import time
+
+from rfid.reader.reader_events import TagReadEvent, TagPresenceEvent, TagEnteredEvent, TagExitedEvent
+from rfid.reader.timing_wheel import TimingWheel
+
+
+class PresenceRecord:
+    """Присъствие на един EPC в един обхват (четец или зона)."""
+
+    __slots__ = ('key', 'first_seen', 'last_seen', 'reader_key')
+
+    def __init__(self, key, seen_time, reader_key):
+        """Инициализация.
+
+        Args:
+            key (tuple): (обхват, ключ на обхвата, EPC)
+            seen_time (float): Време на първото прочитане
+            reader_key (str): Ключ на четеца с последното прочитане
+        """
+        self.key = key
+        self.first_seen = seen_time
+        self.last_seen = seen_time
+        self.reader_key = reader_key
+
+
+class PresenceTracker:
+    """Събития за влизане и излизане на тагове по четци и зони."""
+
+    SCOPE_READER = TagPresenceEvent.SCOPE_READER
+    SCOPE_ZONE = TagPresenceEvent.SCOPE_ZONE
+
+    def __init__(self, timeout=5.0, resolution=0.1, max_timeout=3600.0, zones=None, on_tag_entered=None,
+                 on_tag_exited=None, scheduler=None):
+        """Инициализация.
+
+        Args:
+            timeout (float): Секунди без прочитане, след които тагът е излязъл
+            resolution (float): Точност на сроковете в секунди (продължителност на тик)
+            max_timeout (float): Най-големият timeout, който колелото поддържа
+            zones (dict): Зона за ключ на четец или за (ключ на четец, антена);
+                (ключ, антена) има предимство. Прочитания без зона се следят само по четец.
+            on_tag_entered (callable): Функция on_tag_entered(event) с TagEnteredEvent
+            on_tag_exited (callable): Функция on_tag_exited(event) с TagExitedEvent
+            scheduler: Обект с call_later(delay, callback, *args), например шардът от
+                TransportThreadManager.get_reader_shard(reader). Без него излизанията
+                се откриват само при update() и tick().
+        """
+        if timeout > max_timeout:
+            raise ValueError(f"Presence timeout {timeout} exceeds max_timeout {max_timeout}")
+
+        self.timeout = timeout
+        self.resolution = resolution
+        self.zones = dict(zones) if zones else {}
+        self.on_tag_entered = on_tag_entered
+        self.on_tag_exited = on_tag_exited
+        self.scheduler = scheduler
+        self.wheel = TimingWheel(resolution, max_timeout, start_time=time.time())
+        self.records = {}  # (обхват, ключ на обхвата, EPC) -> PresenceRecord
+        self._lock = threading.Lock()
+        self._ticking = False
+        # Статистика
+        self.read_count = 0
+        self.entered_count = 0
+        self.exited_count = 0
+        self.rescheduled_count = 0
+
+    def __len__(self):
+        """Брой записи за присъствие (таг в обхват)."""
+        return len(self.records)
+
+    def is_present(self, epc, scope_key, scope=SCOPE_READER):
+        """Дали тагът е в обхвата.
+
+        Args:
+            epc (bytes): EPC на тага
+            scope_key (str): Ключ на четеца или име на зоната
+            scope (str): SCOPE_READER или SCOPE_ZONE
+
+        Returns:
+            bool: True, ако тагът е прочетен в обхвата в последните timeout секунди
+        """
+        return (scope, scope_key, epc) in self.records
+
+    def set_zone(self, reader_key, zone, antenna=None):
+        """Задава зона на четец или на антена на четец.
+
+        Args:
+            reader_key (str): Ключ на четеца
+            zone (str): Име на зоната или None за премахване
+            antenna (int): Антена или None за целия четец
+        """
+        key = reader_key if antenna is None else (reader_key, antenna)
+
+        with self._lock:
+            if zone is None:
+                self.zones.pop(key, None)
+            else:
+                self.zones[key] = zone
+
+    def attach(self, event_notify):
+        """Абонира се за прочетените тагове.
+
+        Args:
+            event_notify (EventNotifyImpl): Източник на събития
+        """
+        event_notify.subscribe(TagReadEvent, self._on_tag_read_event)
+
+    def detach(self, event_notify):
+        """Прекратява абонамента.
+
+        Args:
+            event_notify (EventNotifyImpl): Източник на събития
+        """
+        event_notify.unsubscribe(TagReadEvent, self._on_tag_read_event)
+
+    def attach_reader(self, reader):
+        """Абонира се за прочитанията на четец.
+
+        Ако app_notify на четеца не е EventNotifyImpl, той се замества с
+        EventNotifyImpl, който подава суровите рамки на предишния.
+
+        Args:
+            reader (RfidReader): Четецът
+
+        Returns:
+            EventNotifyImpl: Източникът на събития на четеца
+        """
+        # rfid.app_notify_impl зарежда rfid.reader - вносът е тук, за да няма цикъл
+        from rfid.app_notify_impl.event_notify_impl import EventNotifyImpl
+
+        event_notify = reader.get_app_notify()
+
+        if not isinstance(event_notify, EventNotifyImpl):
+            event_notify = EventNotifyImpl(reader, debug_notify=event_notify)
+            reader.set_app_notify(event_notify)
+
+        self.attach(event_notify)
+        return event_notify
+
+    def attach_manager(self, manager):
+        """Абонира се за прочитанията на всички четци в reader_map на мениджъра.
+
+        Четци, добавени след извикването, се свързват с attach_reader().
+
+        Args:
+            manager (TransportThreadManager): Мениджърът на транспортните нишки
+
+        Returns:
+            int: Брой свързани четци
+        """
+        if self.scheduler is None:
+            self.scheduler = manager.shards[0]
+
+        readers = list(manager.reader_map.values())
+
+        for reader in readers:
+            self.attach_reader(reader)
+
+        return len(readers)
+
+    def _on_tag_read_event(self, event):
+        """Обработва TagReadEvent."""
+        self.update(event.tag_reads)
+
+    def update(self, tag_reads):
+        """Отразява прочитания.
+
+        Args:
+            tag_reads (list): Записи TagRead
+        """
+        entered = []
+        records = self.records
+        zones = self.zones
+        timeout = self.timeout
+
+        with self._lock:
+            now = time.time()
+
+            for tag_read in tag_reads:
+                epc = tag_read.epc
+                reader_key = tag_read.reader_key
+                seen_time = tag_read.receive_time if tag_read.receive_time is not None else now
+
+                keys = [(self.SCOPE_READER, reader_key, epc)]
+                if zones:
+                    zone = zones.get((reader_key, tag_read.antenna))
+                    if zone is None:
+                        zone = zones.get(reader_key)
+                    if zone is not None:
+                        keys.append((self.SCOPE_ZONE, zone, epc))
+
+                for key in keys:
+                    record = records.get(key)
+
+                    if record is None:
+                        record = PresenceRecord(key, seen_time, reader_key)
+                        records[key] = record
+                        self.wheel.schedule(record, seen_time + timeout)
+                        entered.append(record)
+                    elif seen_time > record.last_seen:
+                        # Срокът в колелото не се мести - проверява се при изтичането му
+                        record.last_seen = seen_time
+                        record.reader_key = reader_key
+
+            self.read_count += len(tag_reads)
+            self.entered_count += len(entered)
+            entered = [self._make_event(TagEnteredEvent, record, now) for record in entered]
+            exited = self._advance(now)
+            start_tick = self.scheduler is not None and not self._ticking and bool(records)
+            if start_tick:
+                self._ticking = True
+
+        if start_tick:
+            self.scheduler.call_later(self.resolution, self._on_tick)
+
+        self._notify(entered, exited)
+
+    def _make_event(self, event_class, record, now):
+        """Създава събитие за запис."""
+        scope, scope_key, epc = record.key
+        return event_class(epc, scope, scope_key, record.first_seen, record.last_seen, record.reader_key, now)
+
+    def _advance(self, now):
+        """Придвижва колелото и премахва изтеклите записи (под заключването).
+
+        Returns:
+            list: TagExitedEvent за премахнатите записи
+        """
+        exited = []
+        timeout = self.timeout
+        records = self.records
+
+        for record in self.wheel.advance(now):
+            deadline = record.last_seen + timeout
+
+            if deadline > now:
+                self.wheel.schedule(record, deadline)
+                self.rescheduled_count += 1
+            else:
+                del records[record.key]
+                exited.append(self._make_event(TagExitedEvent, record, now))
+
+        self.exited_count += len(exited)
+        return exited
+
+    def _notify(self, entered, exited):
+        """Извиква функциите за влизане и излизане извън заключването."""
+        if self.on_tag_entered is not None:
+            for event in entered:
+                self.on_tag_entered(event)
+
+        if self.on_tag_exited is not None:
+            for event in exited:
+                self.on_tag_exited(event)
+
+    def tick(self, now=None):
+        """Открива излезлите тагове и извиква on_tag_exited за тях.
+
+        Args:
+            now (float): Текущо време (None - time.time())
+
+        Returns:
+            int: Брой излезли тагове
+        """
+        with self._lock:
+            exited = self._advance(time.time() if now is None else now)
+
+        self._notify((), exited)
+        return len(exited)
+
+    def _on_tick(self):
+        """Таймер на шарда: придвижва колелото, докато има записи."""
+        self.tick()
+
+        with self._lock:
+            self._ticking = ticking = bool(self.records)
+
+        if ticking:
+            self.scheduler.call_later(self.resolution, self._on_tick)
+
+    def get_statistics(self):
+        """Връща статистиката.
+
+        Returns:
+            dict: Брой записи, прочитания, влизания, излизания и повторни поставяния в колелото
+        """
+        return {
+            'present': len(self.records),
+            'reads': self.read_count,
+            'entered': self.entered_count,
+            'exited': self.exited_count,
+            'rescheduled': self.rescheduled_count,
+            'wheel_levels': len(self.wheel.level_spans),
+        }
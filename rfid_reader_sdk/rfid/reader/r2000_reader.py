@@ -5,7 +5,14 @@
 Еквивалент на R2000Reader.java
 """
 
+import struct
+import time
+
 from rfid.reader.rfid_reader import RfidReader
+from rfid.reader.tag_read import TagRead
+
+# struct.Struct за N записа EPC по 12 байта: {N: struct.Struct}
+_TAG_RECORD_STRUCTS = {}
 
 
 class R2000Reader(RfidReader):
@@ -21,6 +28,24 @@ class R2000Reader(RfidReader):
     RFID_CMD_START_INVENTORY = 0x32
     RFID_CMD_RESET_DEVICE = 0x65
 
+    # Известие за тагове: заглавие до брояча включително, после записи EPC
+    TAG_HEADER_LEN = 9
+    TAG_EPC_LENGTH = 12
+
+    # Описание на рамките за поточния декодер
+    FRAME_START_FLAGS = (bytes([START_RSP_FLAG]),)
+    FRAME_HEADER_LEN = 3
+    # Заглавие на командите: флаг, 0, дължина, reader_id, код на команда
+    COMMAND_HEADER_FORMAT = '>BBB2sB'
+    # Разпределяне на известията по код на команда (форматът няма поле за тип)
+    FRAME_COMMAND_OFFSET = 5
+    NOTIFY_HANDLERS = {
+        (None, RFID_CMD_STOP_INVETORY): 'notify_stop_inventory',
+        (None, RFID_CMD_RESET_DEVICE): 'notify_reset',
+        (None, RFID_CMD_START_INVENTORY): 'notify_start_inventory',
+        (None, RFID_CMD_TAG_NOTIFY): 'notify_recv_tags',
+    }
+
     def __init__(self):
         """Инициализация на R2000 RFID четец."""
         super().__init__()
@@ -48,25 +73,6 @@ class R2000Reader(RfidReader):
         self.send_msg_buff[self.send_index] = command_code
         self.send_index += 1
 
-    def _calculate_checksum(self, message, start_pos, length):
-        """Изчислява контролна сума.
-
-        Args:
-            message (bytearray): Съобщение
-            start_pos (int): Начална позиция
-            length (int): Дължина
-
-        Returns:
-            int: Контролна сума
-        """
-        checksum = 0
-
-        for i in range(length):
-            checksum += self.get_unsigned_byte(message[start_pos + i])
-
-        checksum = (~checksum + 1) & 0xFF
-        return checksum
-
     def _fill_length_and_checksum(self):
         """Запълва дължината и контролната сума."""
         self.send_msg_buff[1] = 0
@@ -80,9 +86,7 @@ class R2000Reader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_START_INVENTORY)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_START_INVENTORY)
         return 0
 
     def inventory_once(self):
@@ -100,9 +104,7 @@ class R2000Reader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_STOP_INVETORY)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_STOP_INVETORY)
         return 0
 
     def reset(self):
@@ -111,9 +113,7 @@ class R2000Reader(RfidReader):
         Returns:
             int: Резултат от операцията
         """
-        self.build_message_header(self.RFID_CMD_RESET_DEVICE)
-        self._fill_length_and_checksum()
-        self.transport.send_data(self.send_msg_buff, self.send_index)
+        self.send_cached_command(self.RFID_CMD_RESET_DEVICE)
         return 0
 
     def read_tag_block(self, membank, addr, length):
@@ -167,68 +167,158 @@ class R2000Reader(RfidReader):
         print("Now R2000 does not support this function.")
         return -1
 
-    def handle_recv(self):
-        """Обработва получени данни.
+    def _get_command_header(self, command_code, frame_len):
+        """Връща стойностите на заглавието на команда.
+
+        Args:
+            command_code (int): Код на командата
+            frame_len (int): Пълна дължина на рамката
+
+        Returns:
+            tuple: Стойности на полетата на заглавието
+        """
+        return self.START_CMD_FLAG, 0, (frame_len - 3) & 0xFF, bytes(self.reader_id), command_code
+
+    def _get_frame_length(self, message, start_pos):
+        """Връща пълната дължина на рамката, започваща от start_pos.
+
+        Args:
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началния флаг
 
         Returns:
-            int: Резултат от операцията
+            int: Дължина на рамката или -1 при невалидно заглавие
         """
-        self.recv_msg_len = self.transport.read_data(self.recv_msg_buff)
-        self.handle_message()
-        return 0
+        rsp_len = self.get_unsigned_byte(message[start_pos + 1])
+        rsp_len = rsp_len << 8
+        rsp_len += self.get_unsigned_byte(message[start_pos + 2])
+
+        # Рамката съдържа поне адрес, код на команда и контролна сума
+        if rsp_len < 4 or rsp_len > 255:
+            return -1
+
+        return rsp_len + 3
+
+    def _get_frame_reader_id(self, message, start_pos):
+        """Връща идентификатора на четеца от валидна рамка.
+
+        Args:
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началото на рамката
+
+        Returns:
+            bytes: Идентификатор на четеца (2 байта)
+        """
+        return bytes(message[start_pos + 3:start_pos + 5])
+
+    @classmethod
+    def get_tag_count(cls, message, start_index):
+        """Връща броя тагове в известие, след като провери дължините.
+
+        Обявеният брой трябва да съвпада точно с дължината на рамката и
+        рамката трябва да е изцяло в буфера. Проверката е преди четенето на
+        записите.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            int: Брой тагове
+
+        Raises:
+            ValueError: При несъответствие между брой и дължина
+        """
+        if len(message) < start_index + cls.TAG_HEADER_LEN:
+            raise ValueError("R2000 tag notification header is truncated")
+
+        frame_len = ((message[start_index + 1] << 8) | message[start_index + 2]) + 3
+        tag_count = (message[start_index + 7] << 8) | message[start_index + 8]
+        expected_len = cls.TAG_HEADER_LEN + tag_count * cls.TAG_EPC_LENGTH + 1
+
+        if frame_len != expected_len:
+            raise ValueError(f"R2000 tag count {tag_count} does not match frame length {frame_len}")
+
+        if len(message) < start_index + frame_len:
+            raise ValueError(f"R2000 tag notification is truncated: {len(message) - start_index} of {frame_len} bytes")
+
+        return tag_count
+
+    @classmethod
+    def decode_tag_epcs(cls, message, start_index):
+        """Декодира всички EPC на известие за тагове с едно struct.unpack_from.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            list: EPC (bytes по 12 байта) в реда на рамката
+
+        Raises:
+            ValueError: При несъответствие между брой и дължина
+        """
+        tag_count = cls.get_tag_count(message, start_index)
+        record_struct = _TAG_RECORD_STRUCTS.get(tag_count)
 
-    def handle_message(self):
-        """Обработва съобщение."""
-        message = self.recv_msg_buff
-        buff_pos = 0
-        rsp_len = 0
+        if record_struct is None:
+            record_struct = struct.Struct(f"{cls.TAG_EPC_LENGTH}s" * tag_count)
+            _TAG_RECORD_STRUCTS[tag_count] = record_struct
 
-        while buff_pos <= self.recv_msg_len - 7:
-            if message[buff_pos] != self.START_RSP_FLAG:
-                buff_pos += 1
-                continue
+        return list(record_struct.unpack_from(message, start_index + cls.TAG_HEADER_LEN))
 
-            rsp_len = self.get_unsigned_byte(message[buff_pos + 1])
-            rsp_len = rsp_len << 8
-            rsp_len += self.get_unsigned_byte(message[buff_pos + 2])
+    def get_tag_reads(self, message, start_index, receive_time=None):
+        """Декодира известие за тагове като записи TagRead.
 
-            if rsp_len > 255:
-                buff_pos += 1
-                continue
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
 
-            checksum = message[buff_pos + rsp_len + 2]
-            calculated_checksum = self._calculate_checksum(message, buff_pos, rsp_len + 2)
+        Returns:
+            list: Записи TagRead с ключа на този четец
+        """
+        if receive_time is None:
+            receive_time = time.time()
 
-            if calculated_checksum == checksum:
-                # Валидация на данните и обработка на съобщението
-                self.notify_message_to_app(message, buff_pos)
-                # Преминаване към следващата команда
-                buff_pos = buff_pos + rsp_len + 3
-            else:
-                buff_pos += 1
+        key = self.key
+        return [TagRead(epc, None, None, None, key, receive_time) for epc in self.decode_tag_epcs(message, start_index)]
 
-    def notify_message_to_app(self, message, start_index):
-        """Известява приложението за съобщение.
+    def get_response_status(self, message, start_index):
+        """Връща статуса от отговор на команда (първият байт след кода на командата).
 
         Args:
-            message (bytearray): Съобщение
-            start_index (int): Начален индекс
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            int: Статус (0 - успех); 0, ако отговорът няма параметри
         """
-        app_notify = self.get_app_notify()
+        # Дължината без параметри е 4: адрес, код на команда и контролна сума
+        if ((message[start_index + 1] << 8) | message[start_index + 2]) <= 4:
+            return 0
 
-        if app_notify is None:
-            return
+        return message[start_index + 6]
 
-        command = message[start_index + 5]
+    def append_tags_to(self, batch, message, start_index, receive_time=None):
+        """Добавя таговете от известие към колонна партида.
 
-        if command == self.RFID_CMD_STOP_INVETORY:
-            app_notify.notify_stop_inventory(message, start_index)
-        elif command == self.RFID_CMD_RESET_DEVICE:
-            app_notify.notify_reset(message, start_index)
-        elif command == self.RFID_CMD_START_INVENTORY:
-            app_notify.notify_start_inventory(message, start_index)
-        elif command == self.RFID_CMD_TAG_NOTIFY:
-            app_notify.notify_recv_tags(message, start_index)
+        Записите се копират като един блок в матрицата с EPC.
+
+        Args:
+            batch (TagBatch): Партида
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            int: Брой добавени тагове
+        """
+        tag_count = self.get_tag_count(message, start_index)
+        block_start = start_index + self.TAG_HEADER_LEN
+        block = message[block_start:block_start + tag_count * self.TAG_EPC_LENGTH]
+        batch.append_epc_block(block, self.TAG_EPC_LENGTH, reader_key=self.key, receive_time=receive_time)
+        return tag_count
 
     def relay_operation(self, relay_no, operation_type, time):
         """Операция с релета.
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Типизирани събития от RFID четец.
+
+Всяка рамка от четеца се декодира веднъж в едно от тези събития, което се
+подава на абонатите на EventNotifyImpl. Абонатите получават готови полета
+и не четат отмествания в суровите байтове.
+"""
+
+STATUS_OK = 0
+
+
+class ReaderEvent:
+    """Общ клас на всички събития."""
+
+    __slots__ = ('reader_key', 'receive_time')
+
+    def __init__(self, reader_key=None, receive_time=None):
+        """Инициализация.
+
+        Args:
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване на хоста (time.time())
+        """
+        self.reader_key = reader_key
+        self.receive_time = receive_time
+
+    def __repr__(self):
+        """Текстово представяне."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._get_field_names())
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def _get_field_names(cls):
+        """Връща имената на полетата от __slots__ на класа и родителите му."""
+        names = []
+
+        for klass in reversed(cls.__mro__):
+            names.extend(klass.__dict__.get('__slots__', ()))
+
+        return names
+
+
+class TagReadEvent(ReaderEvent):
+    """Прочетени тагове от едно известие или от еднократна инвентаризация."""
+
+    __slots__ = ('tag_reads',)
+
+    def __init__(self, tag_reads, reader_key=None, receive_time=None):
+        """Инициализация.
+
+        Args:
+            tag_reads (list): Записи TagRead в реда на рамката
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване
+        """
+        super().__init__(reader_key, receive_time)
+        self.tag_reads = tag_reads
+
+
+class StatusEvent(ReaderEvent):
+    """Отговор на команда със статус (0 - успех)."""
+
+    __slots__ = ('status',)
+
+    def __init__(self, status, reader_key=None, receive_time=None):
+        """Инициализация.
+
+        Args:
+            status (int): Статус от отговора на четеца
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване
+        """
+        super().__init__(reader_key, receive_time)
+        self.status = status
+
+    @property
+    def success(self):
+        """Дали командата е успешна."""
+        return self.status == STATUS_OK
+
+
+class InventoryStartedEvent(StatusEvent):
+    """Четецът започна инвентаризация."""
+
+    __slots__ = ()
+
+
+class InventoryStoppedEvent(StatusEvent):
+    """Четецът спря инвентаризацията."""
+
+    __slots__ = ()
+
+
+class ResetEvent(StatusEvent):
+    """Четецът е ресетиран."""
+
+    __slots__ = ()
+
+
+class BlockReadEvent(StatusEvent):
+    """Прочетен блок от паметта на таг."""
+
+    __slots__ = ('membank', 'address', 'length', 'data')
+
+    def __init__(self, status, membank=None, address=None, length=None, data=None, reader_key=None,
+                 receive_time=None):
+        """Инициализация.
+
+        Args:
+            status (int): Статус от отговора на четеца
+            membank (int): Област на паметта или None при грешка
+            address (int): Адрес в думи
+            length (int): Дължина в думи
+            data (bytes): Прочетените данни или None при грешка
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване
+        """
+        super().__init__(status, reader_key, receive_time)
+        self.membank = membank
+        self.address = address
+        self.length = length
+        self.data = data
+
+
+class TagOperationEvent(StatusEvent):
+    """Резултат от запис, заключване или унищожаване на таг."""
+
+    __slots__ = ('operation',)
+
+    OPERATION_WRITE = 'write'
+    OPERATION_LOCK = 'lock'
+    OPERATION_KILL = 'kill'
+
+    def __init__(self, operation, status, reader_key=None, receive_time=None):
+        """Инициализация.
+
+        Args:
+            operation (str): Една от константите OPERATION_*
+            status (int): Статус от отговора на четеца
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване
+        """
+        super().__init__(status, reader_key, receive_time)
+        self.operation = operation
+
+
+class TagPresenceEvent(ReaderEvent):
+    """Промяна в присъствието на таг пред четец или в зона."""
+
+    __slots__ = ('epc', 'scope', 'scope_key', 'first_seen', 'last_seen')
+
+    SCOPE_READER = 'reader'
+    SCOPE_ZONE = 'zone'
+
+    def __init__(self, epc, scope, scope_key, first_seen, last_seen, reader_key=None, receive_time=None):
+        """Инициализация.
+
+        Args:
+            epc (bytes): EPC на тага
+            scope (str): SCOPE_READER или SCOPE_ZONE
+            scope_key (str): Ключ на четеца или име на зоната
+            first_seen (float): Първо прочитане в обхвата (time.time())
+            last_seen (float): Последно прочитане в обхвата
+            reader_key (str): Ключ на четеца с последното прочитане
+            receive_time (float): Момент на събитието
+        """
+        super().__init__(reader_key, receive_time)
+        self.epc = epc
+        self.scope = scope
+        self.scope_key = scope_key
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+
+
+class TagEnteredEvent(TagPresenceEvent):
+    """Таг е прочетен за първи път в обхвата."""
+
+    __slots__ = ()
+
+
+class TagExitedEvent(TagPresenceEvent):
+    """Таг не е прочетен в обхвата в продължение на timeout секунди."""
+
+    __slots__ = ()
@@ -7,13 +7,20 @@
 
 from abc import ABC, abstractmethod
 import socket
+import struct
 import serial
 
+from rfid.message.checksum import CHECKSUM_SUM, CHECKSUM_FUNCTIONS
+from rfid.message.frame_decoder import FrameDecoder
 from rfid.transport.transport import Transport
 from rfid.transport.transport_serial_port import TransportSerialPort
 from rfid.transport.transport_tcp_client import TransportTcpClient
+from rfid.transport.transport_tcp_server import TransportTcpServerConnection
 from rfid.transport.transport_udp import TransportUdp
 
+# Кодирани рамки на командите без параметри: {клас на четеца: {(reader_id, код, параметри): bytes}}
+_COMMAND_FRAME_CACHE = {}
+
 
 class RfidReader(ABC):
     """Абстрактен базов клас за RFID четци."""
@@ -27,10 +34,43 @@ class RfidReader(ABC):
     MAX_RECV_BUFF_SIZE = 1024
     MAX_SEND_BUFF_SIZE = 128
 
+    # Описание на рамките за поточния декодер (задава се от наследниците)
+    FRAME_START_FLAGS = ()
+    FRAME_HEADER_LEN = 1
+    # Вид на контролната сума (None, ако наследникът я изчислява сам)
+    CHECKSUM_TYPE = CHECKSUM_SUM
+    # struct формат на заглавието на командите (задава се от наследниците)
+    COMMAND_HEADER_FORMAT = None
+    # Известия към приложението: {(тип на рамката, код на команда): име на метод на AppNotify}
+    # Тип None означава, че форматът на рамките няма поле за тип.
+    NOTIFY_HANDLERS = {}
+    # Отговори, които старите имплементации на AppNotify не получават; свързват се
+    # само ако app_notify има NOTIFY_OPTIONAL_RESPONSES = True (например EventNotifyImpl)
+    OPTIONAL_NOTIFY_HANDLERS = {}
+    # Слетите NOTIFY_HANDLERS и OPTIONAL_NOTIFY_HANDLERS на класа и родителите му
+    # (попълват се от __init_subclass__)
+    _dispatch_table = {}
+    _optional_dispatch_table = {}
+    # Отместване на полето за тип (None - няма) и на кода на командата в рамката
+    FRAME_TYPE_OFFSET = None
+    FRAME_COMMAND_OFFSET = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Слива таблиците на класа с таблиците на родителя веднъж при създаването му."""
+        super().__init_subclass__(**kwargs)
+        dispatch_table = dict(cls._dispatch_table)
+        dispatch_table.update(cls.__dict__.get('NOTIFY_HANDLERS', {}))
+        cls._dispatch_table = dispatch_table
+        optional_dispatch_table = dict(cls._optional_dispatch_table)
+        optional_dispatch_table.update(cls.__dict__.get('OPTIONAL_NOTIFY_HANDLERS', {}))
+        cls._optional_dispatch_table = optional_dispatch_table
+
     def __init__(self):
         """Инициализация на RFID четеца."""
         self.key = None
-        self.recv_msg_buff = bytearray(self.MAX_RECV_BUFF_SIZE)
+        # Място за едно пълно четене плюс пренесената непълна рамка
+        self.frame_decoder = FrameDecoder(self, self.MAX_RECV_BUFF_SIZE * 2)
+        self.recv_msg_buff = self.frame_decoder.buffer
         self.recv_msg_len = 0
         self.app_notify = None
         self.send_msg_buff = bytearray(self.MAX_SEND_BUFF_SIZE)
@@ -38,6 +78,18 @@ class RfidReader(ABC):
         self.recv_len = 0
         self.transport = None
         self.connect_type = 0
+        # Кодираните команди на този четец и reader_id, за който са кодирани
+        self._command_frames = {}
+        # {(код, формат на параметрите): (struct.Struct, дължина, стойности на заглавието)}
+        self._command_encoders = {}
+        self._command_frames_reader_id = None
+        # Обработчици, регистрирани с register_handler: {(тип, код): функция}
+        self._registered_handlers = {}
+        # Свързаните обработчици и app_notify, за който са свързани
+        self._notify_handlers = {}
+        self._notify_handlers_owner = None
+        # Опашка на NotifyExecutor (None - известяване в нишката за получаване)
+        self.notify_queue = None
 
     def get_app_notify(self):
         """Връща обекта за известяване."""
@@ -51,6 +103,23 @@ class RfidReader(ABC):
         """Връща ключа на четеца."""
         return self.key
 
+    def get_shard_key(self):
+        """Връща ключа за разпределяне на четеца по шардове.
+
+        Ключът на TCP и UDP четците съдържа само локалния адрес, който е
+        еднакъв за всички четци без зададен локален порт. Затова към него се
+        добавя адресът на четеца от конфигурацията на транспорта.
+
+        Returns:
+            str: Ключ, различен за всеки четец
+        """
+        remote_ip = getattr(self.transport, 'remote_ip', None)
+
+        if remote_ip:
+            return f"{self.key}>{remote_ip}:{self.transport.remote_port}"
+
+        return self.key
+
     def connect_physical_interface(self, physical_name, physical_param, local_addr_str, local_addr_port, connect_type):
         """Свързване към физически интерфейс.
 
@@ -92,8 +161,18 @@ class RfidReader(ABC):
                 self.transport = serial_port
 
         elif connect_type == self.CONNECT_TYPE_NET_TCP_SERVER:
-            # Не реализирано
-            pass
+            # physical_name/physical_param са адресът на четеца (None/0 - разпознаване
+            # по reader_id), а local_addr_str/local_addr_port - адресът на сървъра.
+            # Връзката се приема от TransportThreadManager след add_rfid_reader.
+            server_transport = TransportTcpServerConnection()
+            server_transport.set_config(physical_name, physical_param, local_addr_str, local_addr_port)
+            result = server_transport.request_local_resource()
+            if physical_name:
+                self.key = f"TCP_SERVER:{physical_name}:{physical_param}"
+            else:
+                self.key = f"TCP_SERVER:ID:{bytes(getattr(self, 'reader_id', b'')).hex()}"
+            if result == 0:
+                self.transport = server_transport
 
         return result
 
@@ -147,21 +226,346 @@ class RfidReader(ABC):
         """Унищожава таг."""
         pass
 
-    @abstractmethod
     def handle_recv(self):
-        """Обработва получени данни."""
+        """Обработва получени данни.
+
+        Прочетените байтове се добавят след непълната рамка от предишното
+        четене, така че рамка, разделена между две четения, не се губи.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        decoder = self.frame_decoder
+        recv_len = self.transport.read_data_into(decoder.buffer, decoder.data_len)
+
+        if recv_len < 0:
+            return -1
+
+        decoder.commit(recv_len)
+        self.handle_message()
+        return 0
+
+    def handle_data(self, data):
+        """Обработва данни, получени извън транспорта (например от asyncio).
+
+        Args:
+            data (bytes): Получени данни
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self.frame_decoder.feed(data)
+        self.recv_msg_len = self.frame_decoder.data_len
+        return 0
+
+    def handle_message(self):
+        """Обработва натрупаните в буфера съобщения."""
+        self.frame_decoder.decode()
+        self.recv_msg_len = self.frame_decoder.data_len
+
+    def get_discarded_bytes(self):
+        """Връща броя байтове, отхвърлени при синхронизация по рамките."""
+        return self.frame_decoder.get_discarded_bytes()
+
+    def _get_frame_reader_id(self, message, start_pos):
+        """Връща идентификатора на четеца от валидна рамка.
+
+        Args:
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началото на рамката
+
+        Returns:
+            bytes: Идентификатор или None, ако форматът не го съдържа
+        """
+        return None
+
+    def _calculate_checksum(self, message, start_pos, length):
+        """Изчислява контролна сума.
+
+        Args:
+            message (bytearray): Съобщение
+            start_pos (int): Начална позиция
+            length (int): Дължина
+
+        Returns:
+            int: Контролна сума
+        """
+        return CHECKSUM_FUNCTIONS[self.CHECKSUM_TYPE](message, start_pos, length)
+
+    @abstractmethod
+    def _get_frame_length(self, message, start_pos):
+        """Връща пълната дължина на рамката, започваща от start_pos.
+
+        Args:
+            message (bytearray): Буфер с получени данни
+            start_pos (int): Позиция на началния флаг
+
+        Returns:
+            int: Дължина на рамката или -1 при невалидно заглавие
+        """
+        pass
+
+    def _bind_notify_handlers(self):
+        """Свързва таблицата за разпределяне с текущия app_notify.
+
+        Кодовете, за които app_notify няма метод, не влизат в таблицата.
+        OPTIONAL_NOTIFY_HANDLERS се свързват само ако app_notify ги приема.
+        Регистрираните с register_handler обработчици са с предимство.
+        """
+        app_notify = self.get_app_notify()
+        handlers = {}
+
+        if app_notify is not None:
+            dispatch_table = self._dispatch_table
+
+            if getattr(app_notify, 'NOTIFY_OPTIONAL_RESPONSES', False):
+                dispatch_table = dict(dispatch_table)
+                dispatch_table.update(self._optional_dispatch_table)
+
+            for key, method_name in dispatch_table.items():
+                handler = getattr(app_notify, method_name, None)
+
+                if handler is not None:
+                    handlers[key] = handler
+
+        handlers.update(self._registered_handlers)
+        self._notify_handlers = handlers
+        self._notify_handlers_owner = app_notify
+
+    def register_handler(self, command_code, handler, frame_type=None):
+        """Регистрира обработчик за код на команда.
+
+        Обработчикът замества метода на app_notify за същия код, ако има такъв.
+
+        Args:
+            command_code (int): Код на командата
+            handler (callable): Функция handler(message, start_index)
+            frame_type (int): Тип на рамката (None за формати без поле за тип)
+        """
+        self._registered_handlers[(frame_type, command_code)] = handler
+        self._bind_notify_handlers()
+
+    def unregister_handler(self, command_code, frame_type=None):
+        """Премахва обработчик, регистриран с register_handler.
+
+        Args:
+            command_code (int): Код на командата
+            frame_type (int): Тип на рамката (None за формати без поле за тип)
+        """
+        self._registered_handlers.pop((frame_type, command_code), None)
+        self._bind_notify_handlers()
+
+    def notify_message_to_app(self, message, start_index):
+        """Известява приложението за съобщение.
+
+        Обработчикът се търси в таблицата по (тип на рамката, код на команда);
+        кодове без обработчик се пропускат. Ако четецът е свързан с
+        NotifyExecutor, копие на рамката се обработва в неговите нишки.
+
+        Args:
+            message (bytearray): Съобщение
+            start_index (int): Начален индекс
+        """
+        if self.get_app_notify() is not self._notify_handlers_owner:
+            self._bind_notify_handlers()
+
+        type_offset = self.FRAME_TYPE_OFFSET
+        frame_type = None if type_offset is None else message[start_index + type_offset]
+        handler = self._notify_handlers.get((frame_type, message[start_index + self.FRAME_COMMAND_OFFSET]))
+
+        if handler is None:
+            return
+
+        if self.notify_queue is None:
+            handler(message, start_index)
+        else:
+            self.notify_queue.put(handler, message, start_index)
+
+    @abstractmethod
+    def get_tag_reads(self, message, start_index, receive_time=None):
+        """Декодира известие за тагове като записи TagRead с ключа на четеца.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            list: Записи TagRead
+        """
         pass
 
+    def get_identified_tag_reads(self, message, start_index, receive_time=None):
+        """Декодира отговора на еднократна инвентаризация като записи TagRead.
+
+        По подразбиране отговорът има формата на известие за тагове.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            list: Записи TagRead (празен при неуспех)
+        """
+        return self.get_tag_reads(message, start_index, receive_time)
+
     @abstractmethod
-    def handle_message(self):
-        """Обработва съобщение."""
+    def get_response_status(self, message, start_index):
+        """Връща статуса от отговор на команда.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            int: Статус (0 - успех)
+        """
         pass
 
+    def get_tag_block(self, message, start_index):
+        """Декодира отговор на четене на блок от таг.
+
+        Args:
+            message (bytearray): Буфер с рамката
+            start_index (int): Начало на рамката
+
+        Returns:
+            tuple: (област, адрес, дължина, данни) или None при неуспех
+        """
+        return None
+
     @abstractmethod
-    def notify_message_to_app(self, message, start_index):
-        """Известява приложението за съобщение."""
+    def _get_command_header(self, command_code, frame_len):
+        """Връща стойностите на заглавието за COMMAND_HEADER_FORMAT.
+
+        Args:
+            command_code (int): Код на командата
+            frame_len (int): Пълна дължина на рамката с контролната сума
+
+        Returns:
+            tuple: Стойности на полетата на заглавието
+        """
         pass
 
+    def encode_command_into(self, buffer, command_code, params_format='', params=()):
+        """Кодира команда в буфер с едно struct.pack_into.
+
+        Заглавието и параметрите се описват с един struct формат, затова
+        рамката се записва наведнъж, след което се добавя контролната сума.
+
+        Args:
+            buffer (bytearray): Буфер за рамката
+            command_code (int): Код на командата
+            params_format (str): struct формат на параметрите (без префикс за подредба)
+            params (tuple): Стойности на параметрите
+
+        Returns:
+            int: Дължина на рамката
+        """
+        if getattr(self, 'reader_id', b'') != self._command_frames_reader_id:
+            self._reset_command_frames()
+
+        key = (command_code, params_format)
+        encoder = self._command_encoders.get(key)
+
+        if encoder is None:
+            command_struct = struct.Struct(self.COMMAND_HEADER_FORMAT + params_format)
+            frame_len = command_struct.size + 1
+            encoder = (command_struct, frame_len, self._get_command_header(command_code, frame_len))
+            self._command_encoders[key] = encoder
+
+        command_struct, frame_len, header = encoder
+        command_struct.pack_into(buffer, 0, *(header + params))
+        buffer[frame_len - 1] = self._calculate_checksum(buffer, 0, frame_len - 1)
+        return frame_len
+
+    def send_command(self, command_code, params_format='', *params):
+        """Кодира команда в буфера за изпращане и я изпраща.
+
+        Args:
+            command_code (int): Код на командата
+            params_format (str): struct формат на параметрите
+            *params: Стойности на параметрите
+
+        Returns:
+            int: Резултат от изпращането
+        """
+        self.send_index = self.encode_command_into(self.send_msg_buff, command_code, params_format, params)
+        return self.transport.send_data(self.send_msg_buff, self.send_index)
+
+    def get_command_frame(self, command_code, params=b''):
+        """Връща кодираната рамка на команда с фиксирани параметри.
+
+        Рамките се кодират веднъж за клас на четеца и reader_id и се
+        споделят между четците с еднакъв reader_id. Кешът на четеца се
+        изчиства при промяна на reader_id (включително при промяна на място).
+
+        Args:
+            command_code (int): Код на командата
+            params (bytes): Фиксирани параметри
+
+        Returns:
+            bytes: Пълна рамка с контролната сума
+        """
+        if getattr(self, 'reader_id', b'') != self._command_frames_reader_id:
+            self._reset_command_frames()
+
+        key = (command_code, params)
+        frame = self._command_frames.get(key)
+
+        if frame is None:
+            class_frames = _COMMAND_FRAME_CACHE.setdefault(type(self), {})
+            frame = class_frames.get((self._command_frames_reader_id,) + key)
+
+            if frame is None:
+                buffer = bytearray(self.MAX_SEND_BUFF_SIZE)
+                frame_len = self.encode_command_into(buffer, command_code, f"{len(params)}s", (params,))
+                frame = bytes(buffer[:frame_len])
+                class_frames[(self._command_frames_reader_id,) + key] = frame
+
+            self._command_frames[key] = frame
+
+        return frame
+
+    def send_cached_command(self, command_code, params=b''):
+        """Изпраща кодираната рамка на команда с фиксирани параметри.
+
+        Args:
+            command_code (int): Код на командата
+            params (bytes): Фиксирани параметри
+
+        Returns:
+            int: Резултат от изпращането
+        """
+        frame = self.get_command_frame(command_code, params)
+        return self.transport.send_data(frame, len(frame))
+
+    def _reset_command_frames(self):
+        """Изчиства кодираните команди след промяна на reader_id."""
+        self.invalidate_command_frames()
+        self._command_frames_reader_id = bytes(getattr(self, 'reader_id', b''))
+
+    def set_reader_id(self, reader_id):
+        """Задава идентификатора на четеца и изчиства кодираните команди.
+
+        Args:
+            reader_id (bytes): Идентификатор на четеца (2 байта)
+        """
+        self.reader_id = bytearray(reader_id)
+        self.invalidate_command_frames()
+
+    def invalidate_command_frames(self):
+        """Изчиства кодираните команди на четеца."""
+        self._command_frames = {}
+        self._command_encoders = {}
+        self._command_frames_reader_id = None
+
+    @classmethod
+    def clear_command_frame_cache(cls):
+        """Изчиства споделения кеш с кодирани команди на класа."""
+        _COMMAND_FRAME_CACHE.pop(cls, None)
+
     def get_transport(self):
         """Връща транспортния обект."""
         return self.transport
\ No newline at end of file
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Колонна партида от прочитания на тагове.
+
+TagBatch пази прочитанията като колони (struct-of-arrays): EPC в матрица от
+байтове с фиксирана ширина, а RSSI, време, антена и индекс на четеца в масиви
+от модула array. Декодерите добавят ред по ред без междинни обекти.
+
+NumPy е незадължителна зависимост (pip install rfid_reader_sdk[numpy]). Когато
+е налична, филтрирането, групирането и as_numpy() работят векторизирано върху
+копия на колоните. Без NumPy същите операции се изпълняват с array и
+itertools. Добавянето винаги е в масивите от array, защото разширяването на
+NumPy масив копира всички данни.
+"""
+
+import itertools
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from rfid.reader.tag_read import TagRead
+
+# Стойност на липсващо поле в целочислените колони
+MISSING = -1
+
+# Колони: име -> (typecode на array, dtype на NumPy)
+COLUMNS = {
+    'epc_lengths': ('B', 'uint8'),
+    'rssi': ('h', 'int16'),
+    'timestamps': ('q', 'int64'),
+    'antennas': ('h', 'int16'),
+    'reader_indexes': ('H', 'uint16'),
+    'receive_times': ('d', 'float64'),
+}
+
+
+class TagBatch:
+    """Колонна партида от прочитания на тагове."""
+
+    DEFAULT_EPC_WIDTH = 12
+
+    def __init__(self, epc_width=DEFAULT_EPC_WIDTH, use_numpy=None):
+        """Инициализация.
+
+        Args:
+            epc_width (int): Ширина на реда в матрицата с EPC (по-късите EPC се допълват с нули)
+            use_numpy (bool): Да се използва ли NumPy (None - ако е инсталиран)
+        """
+        if use_numpy and numpy is None:
+            raise ImportError("NumPy is not installed")
+
+        self.epc_width = epc_width
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.epcs = bytearray()
+        for name, (typecode, _) in COLUMNS.items():
+            setattr(self, name, array(typecode))
+        # Ключове на четците; reader_indexes сочи в този списък
+        self.readers = []
+        self._reader_indexes = {}
+        self._numpy_columns = None
+
+    def __len__(self):
+        """Брой прочитания в партидата."""
+        return len(self.epc_lengths)
+
+    def get_reader_index(self, reader_key):
+        """Връща индекса на четеца, като го добавя при нужда."""
+        index = self._reader_indexes.get(reader_key)
+
+        if index is None:
+            index = len(self.readers)
+            self.readers.append(reader_key)
+            self._reader_indexes[reader_key] = index
+
+        return index
+
+    def append(self, epc, rssi=None, timestamp=None, antenna=None, reader_key=None, receive_time=None):
+        """Добавя едно прочитане.
+
+        Args:
+            epc (bytes): EPC на тага (най-много epc_width байта)
+            rssi (int): Сила на сигнала или None
+            timestamp (int): Време от четеца или None
+            antenna (int): Номер на антената или None
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване на хоста (None - текущото)
+        """
+        epc_len = len(epc)
+
+        if epc_len > self.epc_width:
+            raise ValueError(f"EPC is {epc_len} bytes, the batch holds at most {self.epc_width}")
+
+        self.epcs += epc
+        if epc_len < self.epc_width:
+            self.epcs += bytes(self.epc_width - epc_len)
+
+        self.epc_lengths.append(epc_len)
+        self.rssi.append(MISSING if rssi is None else rssi)
+        self.timestamps.append(MISSING if timestamp is None else timestamp)
+        self.antennas.append(MISSING if antenna is None else antenna)
+        self.reader_indexes.append(self.get_reader_index(reader_key))
+        self.receive_times.append(time.time() if receive_time is None else receive_time)
+        self._numpy_columns = None
+
+    def append_epc_block(self, block, epc_length, antenna=None, reader_key=None, receive_time=None):
+        """Добавя блок от последователни записи EPC с еднаква дължина.
+
+        Когато дължината е равна на epc_width, блокът се копира наведнъж в
+        матрицата. RSSI и времето от четеца се отбелязват като липсващи.
+
+        Args:
+            block (bytes): Записите един след друг
+            epc_length (int): Дължина на един запис
+            antenna (int): Номер на антената или None
+            reader_key (str): Ключ на четеца
+            receive_time (float): Време на получаване (None - текущото)
+
+        Returns:
+            int: Брой добавени записи
+        """
+        if epc_length > self.epc_width:
+            raise ValueError(f"EPC is {epc_length} bytes, the batch holds at most {self.epc_width}")
+
+        if len(block) % epc_length:
+            raise ValueError(f"Block of {len(block)} bytes is not a multiple of {epc_length}")
+
+        count = len(block) // epc_length
+
+        if epc_length == self.epc_width:
+            self.epcs += block
+        else:
+            padding = bytes(self.epc_width - epc_length)
+            for start in range(0, len(block), epc_length):
+                self.epcs += block[start:start + epc_length]
+                self.epcs += padding
+
+        self.epc_lengths.extend(array('B', [epc_length]) * count)
+        self.rssi.extend(array('h', [MISSING]) * count)
+        self.timestamps.extend(array('q', [MISSING]) * count)
+        self.antennas.extend(array('h', [MISSING if antenna is None else antenna]) * count)
+        self.reader_indexes.extend(array('H', [self.get_reader_index(reader_key)]) * count)
+        self.receive_times.extend(array('d', [time.time() if receive_time is None else receive_time]) * count)
+        self._numpy_columns = None
+        return count
+
+    def append_tag_read(self, tag_read):
+        """Добавя запис TagRead."""
+        self.append(tag_read.epc, tag_read.rssi, tag_read.timestamp, tag_read.antenna,
+                    tag_read.reader_key, tag_read.receive_time)
+
+    def extend_tag_reads(self, tag_reads):
+        """Добавя няколко записа TagRead."""
+        for tag_read in tag_reads:
+            self.append_tag_read(tag_read)
+
+    def get_epc(self, index):
+        """Връща EPC на реда index (без допълващите нули)."""
+        start = index * self.epc_width
+        return bytes(self.epcs[start:start + self.epc_lengths[index]])
+
+    def get_tag_read(self, index):
+        """Връща реда index като TagRead (без TID)."""
+        rssi = self.rssi[index]
+        timestamp = self.timestamps[index]
+        antenna = self.antennas[index]
+        return TagRead(self.get_epc(index),
+                       None if rssi == MISSING else rssi,
+                       None if timestamp == MISSING else timestamp,
+                       None,
+                       self.readers[self.reader_indexes[index]],
+                       self.receive_times[index],
+                       None if antenna == MISSING else antenna)
+
+    def iter_tag_reads(self):
+        """Обхожда партидата като записи TagRead."""
+        for index in range(len(self)):
+            yield self.get_tag_read(index)
+
+    def as_numpy(self):
+        """Връща колоните като NumPy масиви.
+
+        Масивите са копия и се кешират до следващото добавяне, затова
+        партидата може да продължи да расте.
+
+        Returns:
+            dict: Колоните от COLUMNS и 'epcs' (матрица uint8 с epc_width колони)
+        """
+        if numpy is None:
+            raise ImportError("NumPy is not installed")
+
+        if self._numpy_columns is None:
+            columns = {name: numpy.array(getattr(self, name), dtype=dtype)
+                       for name, (_, dtype) in COLUMNS.items()}
+            columns['epcs'] = numpy.frombuffer(bytes(self.epcs), dtype=numpy.uint8).reshape(-1, self.epc_width)
+            self._numpy_columns = columns
+
+        return self._numpy_columns
+
+    def make_mask(self, min_rssi=None, max_rssi=None, reader_key=None, antenna=None,
+                  start_time=None, end_time=None, epc=None):
+        """Изгражда маска на редовете, които отговарят на всички зададени условия.
+
+        Args:
+            min_rssi (int): Най-малко RSSI (стойности както в TagRead)
+            max_rssi (int): Най-голямо RSSI
+            reader_key (str): Само прочитания от този четец
+            antenna (int): Само прочитания от тази антена
+            start_time (float): Най-ранно време на получаване
+            end_time (float): Време на получаване, преди което да са прочитанията
+            epc (bytes): Само прочитания на този EPC
+
+        Returns:
+            Маска (numpy.ndarray от bool или list от bool)
+        """
+        if self.use_numpy:
+            return self._make_numpy_mask(min_rssi, max_rssi, reader_key, antenna, start_time, end_time, epc)
+
+        conditions = []
+
+        if min_rssi is not None:
+            conditions.append(map(lambda value: value != MISSING and value >= min_rssi, self.rssi))
+        if max_rssi is not None:
+            conditions.append(map(lambda value: value != MISSING and value <= max_rssi, self.rssi))
+        if reader_key is not None:
+            reader_index = self._reader_indexes.get(reader_key, -1)
+            conditions.append(map(reader_index.__eq__, self.reader_indexes))
+        if antenna is not None:
+            conditions.append(map(antenna.__eq__, self.antennas))
+        if start_time is not None:
+            conditions.append(map(lambda value: value >= start_time, self.receive_times))
+        if end_time is not None:
+            conditions.append(map(lambda value: value < end_time, self.receive_times))
+        if epc is not None:
+            conditions.append(self.get_epc(index) == epc for index in range(len(self)))
+
+        if not conditions:
+            return [True] * len(self)
+
+        return [all(row) for row in zip(*conditions)]
+
+    def _make_numpy_mask(self, min_rssi, max_rssi, reader_key, antenna, start_time, end_time, epc):
+        """Векторизиран вариант на make_mask."""
+        columns = self.as_numpy()
+        mask = numpy.ones(len(self), dtype=bool)
+
+        if min_rssi is not None:
+            mask &= (columns['rssi'] != MISSING) & (columns['rssi'] >= min_rssi)
+        if max_rssi is not None:
+            mask &= (columns['rssi'] != MISSING) & (columns['rssi'] <= max_rssi)
+        if reader_key is not None:
+            mask &= columns['reader_indexes'] == self._reader_indexes.get(reader_key, -1)
+        if antenna is not None:
+            mask &= columns['antennas'] == antenna
+        if start_time is not None:
+            mask &= columns['receive_times'] >= start_time
+        if end_time is not None:
+            mask &= columns['receive_times'] < end_time
+        if epc is not None:
+            if len(epc) > self.epc_width:
+                mask[:] = False
+            else:
+                row = numpy.frombuffer(epc.ljust(self.epc_width, b'\x00'), dtype=numpy.uint8)
+                mask &= (columns['epcs'] == row).all(axis=1) & (columns['epc_lengths'] == len(epc))
+
+        return mask
+
+    def take(self, indexes):
+        """Връща нова партида с редовете index от indexes (в този ред).
+
+        Args:
+            indexes: Индекси на редовете (последователност или numpy.ndarray)
+
+        Returns:
+            TagBatch: Нова партида със същите четци
+        """
+        batch = self._new_like()
+
+        if self.use_numpy:
+            indexes = numpy.asarray(indexes, dtype=numpy.intp)
+            columns = self.as_numpy()
+            batch.epcs = bytearray(columns['epcs'][indexes].tobytes())
+            for name in COLUMNS:
+                getattr(batch, name).frombytes(columns[name][indexes].tobytes())
+            return batch
+
+        width = self.epc_width
+        epcs = self.epcs
+        batch.epcs = bytearray(b''.join(epcs[index * width:(index + 1) * width] for index in indexes))
+        for name, (typecode, _) in COLUMNS.items():
+            column = getattr(self, name)
+            setattr(batch, name, array(typecode, (column[index] for index in indexes)))
+        return batch
+
+    def filter(self, mask=None, **criteria):
+        """Връща нова партида с редовете, за които маската е вярна.
+
+        Args:
+            mask: Маска от make_mask (None - изгражда се от criteria)
+            **criteria: Условия за make_mask
+
+        Returns:
+            TagBatch: Нова партида
+        """
+        if mask is None:
+            mask = self.make_mask(**criteria)
+
+        if self.use_numpy:
+            return self.take(numpy.flatnonzero(mask))
+
+        return self.take(list(itertools.compress(range(len(self)), mask)))
+
+    def group_by_epc(self):
+        """Групира редовете по EPC.
+
+        Returns:
+            dict: {EPC (bytes): индекси на редовете в реда на добавяне}
+        """
+        if not len(self):
+            return {}
+
+        if self.use_numpy:
+            return self._group_by_epc_numpy()
+
+        groups = {}
+        for index in range(len(self)):
+            groups.setdefault(self.get_epc(index), []).append(index)
+        return groups
+
+    def _group_by_epc_numpy(self):
+        """Векторизиран вариант на group_by_epc."""
+        columns = self.as_numpy()
+        # Дължината е част от ключа, за да не се сливат EPC, различаващи се само с крайни нули
+        keys = numpy.concatenate([columns['epcs'], columns['epc_lengths'][:, None]], axis=1)
+        keys = numpy.ascontiguousarray(keys).view(numpy.dtype((numpy.void, self.epc_width + 1))).ravel()
+        unique_keys, inverse, counts = numpy.unique(keys, return_inverse=True, return_counts=True)
+        order = numpy.argsort(inverse, kind='stable')
+        groups = {}
+
+        for key, indexes in zip(unique_keys, numpy.split(order, numpy.cumsum(counts)[:-1])):
+            key = key.tobytes()
+            groups[key[:key[-1]]] = indexes
+
+        return groups
+
+    def extend(self, other):
+        """Добавя редовете на друга партида със същата ширина на EPC."""
+        if other.epc_width != self.epc_width:
+            raise ValueError(f"EPC width mismatch: {other.epc_width} != {self.epc_width}")
+
+        self.epcs += other.epcs
+        for name in COLUMNS:
+            if name != 'reader_indexes':
+                getattr(self, name).extend(getattr(other, name))
+
+        # Индексите на четците се преномерират към списъка на тази партида
+        remap = [self.get_reader_index(reader_key) for reader_key in other.readers]
+        if remap == list(range(len(remap))):
+            self.reader_indexes.extend(other.reader_indexes)
+        else:
+            self.reader_indexes.extend(remap[index] for index in other.reader_indexes)
+
+        self._numpy_columns = None
+
+    @classmethod
+    def concat(cls, batches, epc_width=None, use_numpy=None):
+        """Слива няколко партиди в нова.
+
+        Args:
+            batches (list): Партиди с еднаква ширина на EPC
+            epc_width (int): Ширина на EPC при празен списък
+            use_numpy (bool): Да се използва ли NumPy
+
+        Returns:
+            TagBatch: Нова партида
+        """
+        batches = list(batches)
+
+        if epc_width is None:
+            epc_width = batches[0].epc_width if batches else cls.DEFAULT_EPC_WIDTH
+
+        result = cls(epc_width, use_numpy)
+        for batch in batches:
+            result.extend(batch)
+        return result
+
+    def clear(self):
+        """Изчиства редовете (четците се запазват)."""
+        self.epcs = bytearray()
+        for name, (typecode, _) in COLUMNS.items():
+            setattr(self, name, array(typecode))
+        self._numpy_columns = None
+
+    def _new_like(self):
+        """Празна партида със същите настройки и четци."""
+        batch = type(self)(self.epc_width, self.use_numpy)
+        batch.readers = list(self.readers)
+        batch._reader_indexes = dict(self._reader_indexes)
+        return batch
+
+    def __repr__(self):
+        """Текстово представяне."""
+        return f"TagBatch(rows={len(self)}, epc_width={self.epc_width}, readers={len(self.readers)})"
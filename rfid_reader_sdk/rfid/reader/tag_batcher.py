@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Доставяне на прочетените тагове на партиди.
+
+TagBatcher натрупва прочитанията от TagReadEvent в TagBatch и подава
+партидата на on_tag_batch(batch), когато се събере max_reads прочитания,
+когато изтекат max_delay_ms от първото прочитане в партидата или при спиране
+на инвентаризацията - което настъпи първо. Проверката по време се изпълнява
+от таймер на шарда на TransportThreadManager, без отделна нишка за четеца.
+"""
+
+import threading
+import time
+
+from rfid.reader.reader_events import TagReadEvent, InventoryStoppedEvent
+from rfid.reader.tag_batch import TagBatch
+
+
+class TagBatcher:
+    """Натрупва прочитания на тагове и ги подава на партиди."""
+
+    # Причини за подаване на партида (ключове в статистиката)
+    FLUSH_SIZE = 'size'
+    FLUSH_TIME = 'time'
+    FLUSH_STOP = 'stop'
+    FLUSH_MANUAL = 'manual'
+
+    def __init__(self, on_tag_batch, max_reads=1000, max_delay_ms=100, scheduler=None,
+                 epc_width=TagBatch.DEFAULT_EPC_WIDTH, use_numpy=None):
+        """Инициализация.
+
+        Args:
+            on_tag_batch (callable): Функция on_tag_batch(batch), която получава TagBatch
+            max_reads (int): Брой прочитания, при който партидата се подава веднага
+            max_delay_ms (float): Най-много милисекунди от първото прочитане до подаването
+            scheduler: Обект с call_later(delay, callback, *args), например шардът от
+                TransportThreadManager.get_reader_shard(reader). Без него времето се
+                проверява само при следващото прочитане.
+            epc_width (int): Ширина на EPC в партидите
+            use_numpy (bool): Дали партидите използват NumPy (None - ако е наличен)
+        """
+        self.on_tag_batch = on_tag_batch
+        self.max_reads = max(1, max_reads)
+        self.max_delay = max_delay_ms / 1000.0
+        self.scheduler = scheduler
+        self.epc_width = epc_width
+        self.use_numpy = use_numpy
+        self._lock = threading.Lock()
+        self._batch = TagBatch(epc_width, use_numpy)
+        self._batch_started = None  # time.monotonic() на първото прочитане в партидата
+        self._timer_pending = False
+        # Статистика
+        self.batch_count = 0
+        self.read_count = 0
+        self.flush_reasons = {self.FLUSH_SIZE: 0, self.FLUSH_TIME: 0, self.FLUSH_STOP: 0, self.FLUSH_MANUAL: 0}
+
+    def attach(self, event_notify):
+        """Абонира се за таговете и спирането на инвентаризацията.
+
+        Args:
+            event_notify (EventNotifyImpl): Източник на събития
+        """
+        event_notify.subscribe(TagReadEvent, self._on_tag_read_event)
+        event_notify.subscribe(InventoryStoppedEvent, self._on_inventory_stopped)
+
+    def detach(self, event_notify):
+        """Прекратява абонамента и подава натрупаните прочитания.
+
+        Args:
+            event_notify (EventNotifyImpl): Източник на събития
+        """
+        event_notify.unsubscribe(TagReadEvent, self._on_tag_read_event)
+        event_notify.unsubscribe(InventoryStoppedEvent, self._on_inventory_stopped)
+        self.flush()
+
+    def _on_tag_read_event(self, event):
+        """Обработва TagReadEvent."""
+        self.add_tag_reads(event.tag_reads)
+
+    def _on_inventory_stopped(self, event):
+        """Обработва InventoryStoppedEvent."""
+        self.flush(self.FLUSH_STOP)
+
+    def add_tag_reads(self, tag_reads):
+        """Добавя прочитания към текущата партида.
+
+        Args:
+            tag_reads (list): Записи TagRead
+        """
+        if not tag_reads:
+            return
+
+        ready = []
+        schedule = False
+
+        with self._lock:
+            now = time.monotonic()
+
+            if self._batch_started is not None and now - self._batch_started >= self.max_delay:
+                # Таймерът още не е изпълнен (или няма такъв) - партидата е закъсняла
+                ready.append(self._swap_batch(self.FLUSH_TIME))
+
+            if self._batch_started is None:
+                self._batch_started = now
+
+            self._batch.extend_tag_reads(tag_reads)
+            self.read_count += len(tag_reads)
+
+            if len(self._batch) >= self.max_reads:
+                ready.append(self._swap_batch(self.FLUSH_SIZE))
+            elif self.scheduler is not None and not self._timer_pending:
+                self._timer_pending = True
+                schedule = True
+
+        if schedule:
+            self.scheduler.call_later(self.max_delay, self._on_timer)
+
+        for batch in ready:
+            self.on_tag_batch(batch)
+
+    def _swap_batch(self, reason):
+        """Заменя текущата партида с нова празна (под заключването).
+
+        Args:
+            reason (str): Причина за подаването (FLUSH_*)
+
+        Returns:
+            TagBatch: Натрупаната партида
+        """
+        batch = self._batch
+        self._batch = TagBatch(self.epc_width, self.use_numpy)
+        self._batch_started = None
+
+        if len(batch):
+            self.batch_count += 1
+            self.flush_reasons[reason] += 1
+
+        return batch
+
+    def _on_timer(self):
+        """Таймер на шарда: подава партидата, ако времето ѝ е изтекло."""
+        with self._lock:
+            self._timer_pending = False
+
+            if self._batch_started is None:
+                return
+
+            remaining = self._batch_started + self.max_delay - time.monotonic()
+
+            if remaining > 0:
+                # Партидата е започнала след подаване по брой - таймерът се подновява
+                self._timer_pending = True
+                batch = None
+            else:
+                batch = self._swap_batch(self.FLUSH_TIME)
+
+        if batch is None:
+            self.scheduler.call_later(remaining, self._on_timer)
+        else:
+            self.on_tag_batch(batch)
+
+    def flush(self, reason=FLUSH_MANUAL):
+        """Подава натрупаните прочитания веднага.
+
+        Args:
+            reason (str): Причина за статистиката (FLUSH_*)
+        """
+        with self._lock:
+            batch = self._swap_batch(reason)
+
+        if len(batch):
+            self.on_tag_batch(batch)
+
+    def get_statistics(self):
+        """Връща статистиката.
+
+        Returns:
+            dict: Брой партиди и прочитания, чакащи прочитания и причини за подаване
+        """
+        return {
+            'batches': self.batch_count,
+            'reads': self.read_count,
+            'pending_reads': len(self._batch),
+            'flush_reasons': dict(self.flush_reasons),
+        }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Компактен запис за едно прочитане на таг.
+
+TagRead използва __slots__ и няма __dict__, затова заема няколко пъти по-малко
+памет от дървото TagTLV с по един TLV обект за всяко поле. Записите се
+декодират наведнъж от байтовете на TLV и притежават данните си (EPC и TID са
+bytes), така че могат да се пазят и след известяването.
+"""
+
+import binascii
+
+
+class TagRead:
+    """Едно прочитане на таг."""
+
+    __slots__ = ('epc', 'rssi', 'timestamp', 'tid', 'reader_key', 'receive_time', 'antenna')
+
+    def __init__(self, epc, rssi=None, timestamp=None, tid=None, reader_key=None, receive_time=None,
+                 antenna=None):
+        """Инициализация.
+
+        Args:
+            epc (bytes): EPC на тага
+            rssi (int): Сила на сигнала (-dBm) или None
+            timestamp (int): Време от четеца (Unix секунди) или None
+            tid (bytes): TID на тага или None
+            reader_key (str): Ключ на четеца, от който е прочетен тагът
+            receive_time (float): Време на получаване на хоста (time.time())
+            antenna (int): Номер на антената или None, ако четецът не го съобщава
+        """
+        self.epc = epc
+        self.rssi = rssi
+        self.timestamp = timestamp
+        self.tid = tid
+        self.reader_key = reader_key
+        self.receive_time = receive_time
+        self.antenna = antenna
+
+    @property
+    def epc_hex(self):
+        """EPC като шестнадесетичен низ."""
+        return binascii.hexlify(self.epc).decode('ascii')
+
+    @property
+    def tid_hex(self):
+        """TID като шестнадесетичен низ или None."""
+        if self.tid is None:
+            return None
+        return binascii.hexlify(self.tid).decode('ascii')
+
+    def __eq__(self, other):
+        """Сравнява всички полета."""
+        if not isinstance(other, TagRead):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        """Текстово представяне."""
+        return (f"TagRead(epc={self.epc_hex}, rssi={self.rssi}, timestamp={self.timestamp}, "
+                f"tid={self.tid_hex}, reader_key={self.reader_key!r}, receive_time={self.receive_time}, "
+                f"antenna={self.antenna})")
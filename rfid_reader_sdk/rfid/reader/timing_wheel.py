@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Йерархично колело на таймерите.
+
+Времето е разделено на тикове с продължителност resolution. Ниво 0 има по
+една клетка за всеки от следващите slots_per_level тика, ниво 1 - по една
+клетка за всеки slots_per_level тика и т.н. Поставянето на елемент е O(1).
+При преминаване в нов блок на по-високо ниво елементите от неговата клетка
+се разпределят в по-ниските нива, така че всеки елемент се мести най-много
+веднъж на ниво. Проверката на празни тикове също е O(1).
+
+Елементи със срок след максималния обхват се поставят в последната клетка
+и при изтичане се връщат на извикващия, който проверява истинския срок.
+"""
+
+
+class TimingWheel:
+    """Йерархично колело на таймерите с фиксирана резолюция."""
+
+    def __init__(self, resolution=0.1, max_timeout=3600.0, slots_per_level=64, start_time=0.0):
+        """Инициализация.
+
+        Args:
+            resolution (float): Продължителност на един тик в секунди
+            max_timeout (float): Най-дългото забавяне, което колелото поставя точно
+            slots_per_level (int): Брой клетки на всяко ниво
+            start_time (float): Време, от което започва броенето на тиковете
+        """
+        if resolution <= 0:
+            raise ValueError("Timing wheel resolution must be positive")
+
+        self.resolution = resolution
+        self.slots_per_level = max(2, slots_per_level)
+        self.level_spans = [1]  # Брой тикове, които покрива една клетка на ниво
+
+        while self.level_spans[-1] * self.slots_per_level * resolution < max_timeout:
+            self.level_spans.append(self.level_spans[-1] * self.slots_per_level)
+
+        self.max_ticks = self.level_spans[-1] * self.slots_per_level - 1
+        self.levels = [[[] for _ in range(self.slots_per_level)] for _ in self.level_spans]
+        self.current_tick = self.get_tick(start_time)
+        self.count = 0
+
+    def get_tick(self, timestamp):
+        """Връща номера на тика за момент във времето."""
+        return int(timestamp / self.resolution)
+
+    def __len__(self):
+        """Брой поставени елементи."""
+        return self.count
+
+    def schedule(self, item, deadline):
+        """Поставя елемент, който изтича в момента deadline.
+
+        Args:
+            item: Произволен обект
+            deadline (float): Момент на изтичане (в същата скала като advance())
+        """
+        self._place(item, self.get_tick(deadline))
+        self.count += 1
+
+    def _place(self, item, deadline_tick):
+        """Поставя елемент в клетката на нивото, което покрива срока му."""
+        ticks = deadline_tick - self.current_tick
+
+        if ticks <= 0:
+            # Срокът е в текущия тик - изтича при следващото advance()
+            deadline_tick = self.current_tick + 1
+            ticks = 1
+        elif ticks > self.max_ticks:
+            deadline_tick = self.current_tick + self.max_ticks
+            ticks = self.max_ticks
+
+        slots = self.slots_per_level
+        level = 0
+
+        while ticks >= self.level_spans[level] * slots:
+            level += 1
+
+        self.levels[level][(deadline_tick // self.level_spans[level]) % slots].append((deadline_tick, item))
+
+    def advance(self, now):
+        """Придвижва колелото до момента now.
+
+        Args:
+            now (float): Текущ момент
+
+        Returns:
+            list: Изтеклите елементи
+        """
+        target_tick = self.get_tick(now)
+        expired = []
+
+        if not self.count:
+            # Празните тикове не се обхождат
+            if target_tick > self.current_tick:
+                self.current_tick = target_tick
+            return expired
+
+        slots = self.slots_per_level
+        levels = self.levels
+        level_spans = self.level_spans
+
+        while self.current_tick < target_tick and self.count:
+            tick = self.current_tick + 1
+            self.current_tick = tick
+
+            # Пренасяне от по-високите нива при започване на нов блок
+            for level in range(len(level_spans) - 1, 0, -1):
+                span = level_spans[level]
+                if tick % span == 0:
+                    slot = levels[level][(tick // span) % slots]
+                    if slot:
+                        items = list(slot)
+                        slot.clear()
+                        for deadline_tick, item in items:
+                            if deadline_tick <= tick:
+                                expired.append(item)
+                                self.count -= 1
+                            else:
+                                self._place(item, deadline_tick)
+
+            slot = levels[0][tick % slots]
+            if slot:
+                expired.extend(item for _, item in slot)
+                self.count -= len(slot)
+                slot.clear()
+
+        if target_tick > self.current_tick:
+            self.current_tick = target_tick
+
+        return expired
@@ -13,6 +13,8 @@ from .protocol_base import UHFFrame, UHFFrameType, TLVBase
 from .notification_frames import NotificationFrame, NotificationType
 from .tlv_structures import (
     TagTLV,
+    decode_tag_read,
+    decode_tag_fields,
     EPCTLV,
     RSSITLV,
     TimeTLV,
@@ -38,6 +40,8 @@ __all__ = [
     'NotificationFrame',
     'NotificationType',
     'TagTLV',
+    'decode_tag_read',
+    'decode_tag_fields',
     'EPCTLV',
     'RSSITLV',
     'TimeTLV',
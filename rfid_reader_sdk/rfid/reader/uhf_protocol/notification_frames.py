@@ -8,6 +8,7 @@ typically containing information about detected tags.
 
 import enum
 import logging
+import time
 from typing import List, Dict, Any, Tuple, Optional, Union, ByteString
 
 from .protocol_base import UHFFrame, UHFFrameType, TLVBase, TLVType
@@ -94,20 +95,90 @@ class NotificationFrame(UHFFrame):
         Returns:
             list: List of TagTLV objects
         """
-        from .tlv_structures import TagTLV
-
-        tags = []
-
         # Process only tag upload notifications
         if self.notification_type != NotificationType.TAGS_UPLOADED:
-            return tags
+            return []
 
         # Extract Tag TLVs
-        for tlv in self.get_tlvs():
-            if tlv.type == TLVType.TAG:
-                tags.append(tlv)
+        return self.find_all_tlvs(TLVType.TAG)
+
+    def get_tag_reads(self, reader_key: Optional[str] = None,
+                      receive_time: Optional[float] = None) -> List['TagRead']:
+        """
+        Get the tags of the notification frame as compact TagRead records
+
+        Each Tag TLV is decoded in one pass from the payload bytes, without
+        building TLV objects. Use get_tags() when the full TLV tree is needed.
+
+        Args:
+            reader_key: Key of the reader the frame was received from
+            receive_time: Host receive time (defaults to the current time)
+
+        Returns:
+            list: List of TagRead records
+        """
+        from .tlv_structures import decode_tag_read
+
+        if self.notification_type != NotificationType.TAGS_UPLOADED:
+            return []
+
+        if self._tlv_index is None:
+            self._build_tlv_index()
+
+        if receive_time is None:
+            receive_time = time.time()
+
+        payload = self._payload
+        offsets = self._tlv_offsets
+        tag_reads = []
+
+        for position in self._tlv_index.get(TLVType.TAG, ()):
+            start = offsets[position] + 2
+            tag_read = decode_tag_read(payload, start, start + payload[start - 1], reader_key, receive_time)
+            if tag_read is not None:
+                tag_reads.append(tag_read)
+
+        return tag_reads
+
+    def append_tags_to(self, batch: 'TagBatch', reader_key: Optional[str] = None,
+                       receive_time: Optional[float] = None) -> int:
+        """
+        Append the tags of the notification frame to a columnar TagBatch
+
+        Like get_tag_reads(), but the decoded fields go straight into the
+        batch columns without TagRead records.
+
+        Args:
+            batch: Batch to append to
+            reader_key: Key of the reader the frame was received from
+            receive_time: Host receive time (defaults to the current time)
+
+        Returns:
+            int: Number of appended tags
+        """
+        from .tlv_structures import decode_tag_fields
+
+        if self.notification_type != NotificationType.TAGS_UPLOADED:
+            return 0
+
+        if self._tlv_index is None:
+            self._build_tlv_index()
+
+        if receive_time is None:
+            receive_time = time.time()
+
+        payload = self._payload
+        offsets = self._tlv_offsets
+        appended = 0
+
+        for position in self._tlv_index.get(TLVType.TAG, ()):
+            start = offsets[position] + 2
+            epc, rssi, timestamp, _, antenna = decode_tag_fields(payload, start, start + payload[start - 1])
+            if epc is not None:
+                batch.append(epc, rssi, timestamp, antenna, reader_key, receive_time)
+                appended += 1
 
-        return tags
+        return appended
 
     def __str__(self) -> str:
         """String representation of the notification frame"""
@@ -3,6 +3,22 @@ UHF Protocol Base Implementation
 
 This module provides base classes and structures for the UHF RFID protocol.
 It defines the fundamental components like UHF frames and TLV structures.
+
+Zero-copy parsing and buffer ownership:
+
+UHFFrame.from_bytes(data, zero_copy=True) and UHFFrame.from_buffer() parse a
+frame over a memoryview of the caller's buffer. The payload and every TLV
+value are then views into that buffer, and no frame bytes are copied. The
+frame borrows the buffer:
+
+- A borrowed frame and its TLVs are valid only while the buffer content is
+  unchanged. For the receive buffer of a reader this means only inside the
+  notify_* callback, because the decoder reuses the buffer for the next
+  frames.
+- To keep a frame or a TLV after the callback, call materialize() on it.
+  It copies the referenced bytes and the object then owns them.
+- Values that are views are not hashable when the buffer is a bytearray.
+  Materialize them (or convert with bytes()) before using them as keys.
 """
 
 import enum
@@ -11,8 +27,13 @@ import binascii
 import logging
 from typing import List, Dict, Any, Tuple, Optional, Union, ByteString
 
+from ...message.checksum import xor_checksum
+
 logger = logging.getLogger(__name__)
 
+# Raw TLV value types (memoryview when parsed with zero_copy)
+RAW_VALUE_TYPES = (bytes, bytearray, memoryview)
+
 
 class UHFFrameType(enum.IntEnum):
     """UHF Frame Types"""
@@ -35,6 +56,7 @@ class TLVType(enum.IntEnum):
     RSSI = 0x05  # Signal strength
     TIME = 0x06  # Timestamp
     STATUS = 0x07  # Status code
+    ANTENNA = 0x08  # Antenna number
     VERSION = 0x20  # Version information
     DEVICE_TYPE = 0x21  # Device type
     TAG = 0x50  # Tag information (compound TLV)
@@ -65,7 +87,7 @@ class TLVBase:
     @property
     def length(self) -> int:
         """Get the length of the value"""
-        if isinstance(self._value, bytes):
+        if isinstance(self._value, RAW_VALUE_TYPES):
             return len(self._value)
         elif isinstance(self._value, list):
             # Calculate total length of all sub-TLVs
@@ -89,7 +111,7 @@ class TLVBase:
         Returns:
             bytes: Encoded TLV
         """
-        if isinstance(self._value, bytes):
+        if isinstance(self._value, RAW_VALUE_TYPES):
             # Simple TLV with byte value
             return bytes([self.type, self.length]) + self._value
         elif isinstance(self._value, list):
@@ -100,11 +122,39 @@ class TLVBase:
         # Empty value
         return bytes([self.type, 0])
 
+    @property
+    def is_borrowed(self) -> bool:
+        """Check if the value is a view into a buffer the TLV does not own"""
+        if isinstance(self._value, memoryview):
+            return True
+        elif isinstance(self._value, list):
+            return any(tlv.is_borrowed for tlv in self._value)
+        return False
+
+    def materialize(self) -> 'TLVBase':
+        """
+        Copy a borrowed value into bytes owned by the TLV
+
+        Sub-TLVs of a compound TLV are materialized too.
+
+        Returns:
+            TLVBase: This TLV
+        """
+        if isinstance(self._value, memoryview):
+            self._value = self._value.tobytes()
+        elif isinstance(self._value, list):
+            for tlv in self._value:
+                tlv.materialize()
+        return self
+
     @classmethod
     def from_bytes(cls, data: bytes, offset: int = 0) -> Tuple[Any, int]:
         """
         Parse TLV from bytes
 
+        When data is a memoryview, the value is a view into the same buffer
+        and is not copied.
+
         Args:
             data: Raw data
             offset: Starting offset in data
@@ -132,7 +182,7 @@ class TLVBase:
     def __str__(self) -> str:
         """String representation of the TLV"""
         tlv_name = TLVType.get_name(self.type)
-        if isinstance(self._value, bytes):
+        if isinstance(self._value, RAW_VALUE_TYPES):
             hex_value = binascii.hexlify(self._value).decode('ascii')
             return f"{tlv_name}(0x{self.type:02X}) [Len={self.length}]: {hex_value}"
         elif isinstance(self._value, list):
@@ -166,6 +216,20 @@ class UHFFrame:
         self.command_code = command_code
         self.payload = payload or b''
 
+    @property
+    def payload(self) -> bytes:
+        """Get the frame payload"""
+        return self._payload
+
+    @payload.setter
+    def payload(self, new_payload: bytes):
+        """Set the frame payload and drop the parsed TLVs"""
+        self._payload = new_payload
+        # TLVs are indexed and decoded lazily, on first access
+        self._tlv_offsets = None
+        self._tlv_index = None
+        self._tlv_cache = None
+
     @property
     def payload_length(self) -> int:
         """Get the length of the payload"""
@@ -182,10 +246,7 @@ class UHFFrame:
             int: Calculated checksum
         """
         # Simple XOR-based checksum
-        checksum = 0
-        for byte in data:
-            checksum ^= byte
-        return checksum
+        return xor_checksum(data)
 
     def to_bytes(self) -> bytes:
         """
@@ -209,24 +270,79 @@ class UHFFrame:
         # Construct complete frame
         return self.HEADER + frame_data + bytes([checksum])
 
+    @property
+    def is_borrowed(self) -> bool:
+        """Check if the payload is a view into a buffer the frame does not own"""
+        return isinstance(self._payload, memoryview)
+
+    def materialize(self) -> 'UHFFrame':
+        """
+        Copy a borrowed payload and the decoded TLVs into owned bytes
+
+        The TLV index stays valid, because the offsets do not change.
+
+        Returns:
+            UHFFrame: This frame
+        """
+        if isinstance(self._payload, memoryview):
+            self._payload = self._payload.tobytes()
+
+        for tlv in self._tlv_cache or ():
+            if tlv is not None:
+                tlv.materialize()
+
+        return self
+
+    @classmethod
+    def from_buffer(cls, buffer: ByteString, start_index: int = 0, zero_copy: bool = True) -> 'UHFFrame':
+        """
+        Parse the frame that starts at start_index in a larger buffer
+
+        Typically used with the message and start_index of a notify_* callback.
+        With zero_copy the frame borrows the buffer (see the module docstring).
+
+        Args:
+            buffer: Buffer with the frame
+            start_index: Offset of the frame header
+            zero_copy: Parse over a memoryview instead of copying
+
+        Returns:
+            UHFFrame: Parsed frame
+        """
+        if len(buffer) < start_index + 8:
+            raise ValueError(f"Frame too short: {len(buffer) - start_index} bytes")
+
+        frame_length = 9 + ((buffer[start_index + 6] << 8) | buffer[start_index + 7])
+        view = memoryview(buffer)[start_index:start_index + frame_length]
+
+        if not zero_copy:
+            return cls.from_bytes(view.tobytes())
+
+        return cls.from_bytes(view, zero_copy=True)
+
     @classmethod
-    def from_bytes(cls, data: bytes) -> 'UHFFrame':
+    def from_bytes(cls, data: bytes, zero_copy: bool = False) -> 'UHFFrame':
         """
         Parse frame from bytes
 
         Args:
             data: Raw data
+            zero_copy: Parse over a memoryview of data, so the payload and
+                the TLV values are views (see the module docstring)
 
         Returns:
             UHFFrame: Parsed frame
         """
+        if zero_copy and not isinstance(data, memoryview):
+            data = memoryview(data)
+
         # Check minimum length
         if len(data) < 9:  # Header(2) + Type(1) + Addr(2) + Code(1) + Length(2) + Checksum(1)
             raise ValueError(f"Frame too short: {len(data)} bytes")
 
         # Check header
         if data[0:2] != cls.HEADER:
-            raise ValueError(f"Invalid header: {data[0:2]}")
+            raise ValueError(f"Invalid header: {bytes(data[0:2])}")
 
         # Extract fields
         frame_type = data[2]
@@ -246,8 +362,11 @@ class UHFFrame:
         payload = data[8:8 + payload_length]
         received_checksum = data[-1]
 
+        if not zero_copy and isinstance(payload, memoryview):
+            payload = payload.tobytes()
+
         # Verify checksum
-        calculated_checksum = cls().calculate_checksum(data[:-1])
+        calculated_checksum = UHFFrame(UHFFrameType(frame_type)).calculate_checksum(data[:-1])
         if calculated_checksum != received_checksum:
             raise ValueError(
                 f"Checksum mismatch: calculated 0x{calculated_checksum:02X}, received 0x{received_checksum:02X}")
@@ -263,25 +382,71 @@ class UHFFrame:
             # Default to base frame
             return cls(UHFFrameType(frame_type), address, command_code, payload)
 
+    def _build_tlv_index(self) -> None:
+        """
+        Index the top-level TLVs of the payload in a single pass
+
+        Only the TLV headers are read. The offsets are kept in payload order,
+        and the index maps each TLV type to the positions of its TLVs.
+        """
+        payload = self._payload
+        payload_len = len(payload)
+        offsets = []
+        index = {}
+        offset = 0
+
+        while offset < payload_len:
+            if offset + 2 > payload_len:
+                logger.error(f"Error parsing TLV at offset {offset}: Insufficient data for TLV header")
+                break
+
+            tlv_type = payload[offset]
+            tlv_length = payload[offset + 1]
+
+            if offset + 2 + tlv_length > payload_len:
+                logger.error(f"Error parsing TLV at offset {offset}: Insufficient data for TLV value "
+                             f"(type=0x{tlv_type:02X}, length={tlv_length})")
+                break
+
+            index.setdefault(tlv_type, []).append(len(offsets))
+            offsets.append(offset)
+            offset += 2 + tlv_length
+
+        self._tlv_offsets = offsets
+        self._tlv_index = index
+        self._tlv_cache = [None] * len(offsets)
+
+    def _get_tlv_at(self, position: int) -> TLVBase:
+        """
+        Get the decoded TLV at a position of the index, decoding it once
+
+        Args:
+            position: Position of the TLV in payload order
+
+        Returns:
+            TLVBase: Decoded TLV
+        """
+        tlv = self._tlv_cache[position]
+
+        if tlv is None:
+            tlv, _ = TLVBase.from_bytes(self._payload, self._tlv_offsets[position])
+            self._tlv_cache[position] = tlv
+
+        return tlv
+
     def get_tlvs(self) -> List[TLVBase]:
         """
         Extract TLVs from payload
 
+        The TLVs are decoded once and memoized on the frame.
+
         Returns:
             list: List of TLV objects
         """
-        tlvs = []
-        offset = 0
+        if self._tlv_offsets is None:
+            self._build_tlv_index()
 
-        while offset < len(self.payload):
-            try:
-                tlv, offset = TLVBase.from_bytes(self.payload, offset)
-                tlvs.append(tlv)
-            except ValueError as e:
-                logger.error(f"Error parsing TLV at offset {offset}: {e}")
-                break
-
-        return tlvs
+        return [self._get_tlv_at(position) for position in range(len(self._tlv_offsets))]
 
     def find_tlv(self, tlv_type: int) -> Optional[TLVBase]:
         """
@@ -293,11 +458,29 @@ class UHFFrame:
         Returns:
             TLVBase: Found TLV, or None if not found
         """
-        for tlv in self.get_tlvs():
-            if tlv.type == tlv_type:
-                return tlv
+        if self._tlv_index is None:
+            self._build_tlv_index()
+
+        positions = self._tlv_index.get(tlv_type)
+        if positions:
+            return self._get_tlv_at(positions[0])
         return None
 
+    def find_all_tlvs(self, tlv_type: int) -> List[TLVBase]:
+        """
+        Find all TLVs of specified type
+
+        Args:
+            tlv_type: TLV type to find
+
+        Returns:
+            list: Found TLVs in payload order
+        """
+        if self._tlv_index is None:
+            self._build_tlv_index()
+
+        return [self._get_tlv_at(position) for position in self._tlv_index.get(tlv_type, ())]
+
     def __str__(self) -> str:
         """String representation of the frame"""
         frame_type_name = UHFFrameType(self.frame_type).name
@@ -12,6 +12,7 @@ import logging
 from typing import List, Dict, Any, Tuple, Optional, Union, ByteString, Type, ClassVar
 
 from .protocol_base import TLVBase, TLVType
+from ..tag_read import TagRead
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +56,82 @@ def create_tlv_from_type(tlv_type: int, value: bytes) -> TLVBase:
     return TLVBase(tlv_type, value)
 
 
+def decode_tag_fields(data: ByteString, start: int, end: int) -> Tuple[Optional[bytes], Optional[int],
+                                                                     Optional[int], Optional[bytes],
+                                                                     Optional[int]]:
+    """
+    Decode the value of a Tag TLV (0x50) in a single pass
+
+    The sub-TLVs are read straight from the bytes, without creating TLV
+    objects. EPC and TID are copied into bytes, so they stay valid after the
+    buffer is reused.
+
+    Args:
+        data: Buffer with the Tag TLV value
+        start: Offset of the first sub-TLV
+        end: Offset just past the Tag TLV value
+
+    Returns:
+        tuple: (epc, rssi, timestamp, tid, antenna), with None for missing fields
+    """
+    epc = None
+    rssi = None
+    timestamp = None
+    tid = None
+    antenna = None
+    offset = start
+
+    while offset + 2 <= end:
+        tlv_type = data[offset]
+        value_start = offset + 2
+        offset = value_start + data[offset + 1]
+
+        if offset > end:
+            logger.error(f"Error parsing sub-TLV at offset {value_start - 2 - start}: "
+                         f"Insufficient data for TLV value (type=0x{tlv_type:02X})")
+            break
+
+        if tlv_type == TLVType.EPC:
+            epc = bytes(data[value_start:offset])
+        elif tlv_type == TLVType.RSSI:
+            if offset > value_start:
+                rssi = data[value_start]
+        elif tlv_type == TLVType.TIME:
+            if offset - value_start >= 4:
+                timestamp = int.from_bytes(data[value_start:value_start + 4], 'big')
+        elif tlv_type == TLVType.TID:
+            tid = bytes(data[value_start:offset])
+        elif tlv_type == TLVType.ANTENNA:
+            if offset > value_start:
+                antenna = data[value_start]
+
+    return epc, rssi, timestamp, tid, antenna
+
+
+def decode_tag_read(data: ByteString, start: int, end: int,
+                    reader_key: Optional[str] = None,
+                    receive_time: Optional[float] = None) -> Optional[TagRead]:
+    """
+    Decode the value of a Tag TLV (0x50) into a TagRead in a single pass
+
+    Args:
+        data: Buffer with the Tag TLV value
+        start: Offset of the first sub-TLV
+        end: Offset just past the Tag TLV value
+        reader_key: Key of the reader the tag was read by
+        receive_time: Host receive time (time.time())
+
+    Returns:
+        TagRead: Decoded record, or None if the value has no EPC
+    """
+    epc, rssi, timestamp, tid, antenna = decode_tag_fields(data, start, end)
+
+    if epc is None:
+        return None
+
+    return TagRead(epc, rssi, timestamp, tid, reader_key, receive_time, antenna)
+
+
 @register_tlv_type(TLVType.EPC)
 class EPCTLV(TLVBase):
     """EPC (Electronic Product Code) TLV"""
@@ -359,6 +436,45 @@ class TagTLV(TLVBase):
                 return binascii.hexlify(tlv.value).decode('ascii')
         return None
 
+    def to_tag_read(self, reader_key: Optional[str] = None,
+                    receive_time: Optional[float] = None) -> Optional[TagRead]:
+        """
+        Convert the Tag TLV to a compact TagRead record
+
+        Args:
+            reader_key: Key of the reader the tag was read by
+            receive_time: Host receive time
+
+        Returns:
+            TagRead: Record, or None if the tag has no EPC
+        """
+        value = self.to_bytes()
+        return decode_tag_read(value, 2, len(value), reader_key, receive_time)
+
+    @classmethod
+    def from_tag_read(cls, tag_read: TagRead) -> 'TagTLV':
+        """
+        Build the full Tag TLV tree from a TagRead (for debugging or round trips)
+
+        Args:
+            tag_read: Tag record
+
+        Returns:
+            TagTLV: Tag TLV with EPC, RSSI, Time and TID sub-TLVs
+        """
+        tag_tlv = cls([EPCTLV(tag_read.epc)])
+
+        if tag_read.rssi is not None:
+            tag_tlv.add_tlv(RSSITLV(tag_read.rssi))
+
+        if tag_read.timestamp is not None:
+            tag_tlv.add_tlv(TimeTLV(tag_read.timestamp))
+
+        if tag_read.tid is not None:
+            tag_tlv.add_tlv(TIDTLV(tag_read.tid))
+
+        return tag_tlv
+
     @classmethod
     def from_value(cls, value: bytes) -> 'TagTLV':
         """
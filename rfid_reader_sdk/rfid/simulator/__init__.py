@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Локален симулатор на RFID четци за тестове на производителността.
+"""
+
+from .tag_population import SimulatedTag, TagPopulation
+from .protocols import SimulatorProtocol, GeneralProtocol, MReaderProtocol, R2000Protocol, PROTOCOLS
+from .reader_simulator import ReaderSimulator, SimulatorSession
\ No newline at end of file
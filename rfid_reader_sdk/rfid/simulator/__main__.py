@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Стартиране на симулатора от командния ред.
+
+    rfid-reader-simulator --family r2000 --transport tcp --port 5060 --tags 1000 --rate 5000
+"""
+
+import argparse
+import json
+import time
+
+from rfid.simulator.reader_simulator import ReaderSimulator
+from rfid.simulator.tag_population import TagPopulation
+from rfid.simulator.protocols import PROTOCOLS
+
+
+def main(argv=None):
+    """Стартира симулатора и отпечатва статистика всяка секунда."""
+    parser = argparse.ArgumentParser(description="Local RFID reader simulator")
+    parser.add_argument('--family', choices=sorted(PROTOCOLS), default='general', help="Reader family")
+    parser.add_argument('--transport', choices=('tcp', 'udp'), default='tcp', help="Transport")
+    parser.add_argument('--host', default='127.0.0.1', help="Local address")
+    parser.add_argument('--port', type=int, default=5060, help="Local port")
+    parser.add_argument('--tags', type=int, default=100, help="Number of tags in the field")
+    parser.add_argument('--epc-length', type=int, default=12, help="EPC length in bytes")
+    parser.add_argument('--antennas', type=int, default=1, help="Number of antennas")
+    parser.add_argument('--rate', type=float, default=1000, help="Tags per second during inventory")
+    parser.add_argument('--address', type=lambda value: int(value, 0), default=0, help="Reader address")
+    parser.add_argument('--seed', type=int, default=0, help="Tag population seed")
+    args = parser.parse_args(argv)
+
+    population = TagPopulation(args.tags, args.epc_length, args.antennas, args.seed)
+    simulator = ReaderSimulator(args.family, args.transport, args.host, args.port,
+                                population, args.rate, args.address)
+    address = simulator.start()
+    print(f"Simulating {args.family} reader on {args.transport}://{address[0]}:{address[1]}")
+
+    try:
+        while True:
+            time.sleep(1)
+            print(json.dumps(simulator.get_statistics()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Протоколи на симулираните четци.
+
+Всеки клас разпознава командите, които изпраща съответният четец от SDK
+(GeneralReader, MRfidReader, R2000Reader), и кодира отговори и известия за
+тагове в същия формат, който очакват декодерите на SDK.
+"""
+
+from abc import ABC, abstractmethod
+
+from rfid.message.checksum import sum_checksum
+
+
+class SimulatorProtocol(ABC):
+    """Базов клас за протокол на симулиран четец."""
+
+    # Начални флагове на командните рамки
+    COMMAND_START_FLAGS = b''
+    # Брой байтове, нужни за определяне на дължината на командата
+    COMMAND_HEADER_LEN = 1
+    # Дали четецът изпраща тагове веднага след свързване
+    AUTO_START_INVENTORY = False
+
+    def __init__(self, address=0):
+        """Инициализация на протокола.
+
+        Args:
+            address (int): Адрес (reader_id) на симулирания четец
+        """
+        self.address = address
+
+    def decode_commands(self, buffer):
+        """Извлича пълните команди от буфера и ги премахва от него.
+
+        Args:
+            buffer (bytearray): Получени данни
+
+        Returns:
+            list: Списък с (код на командата, параметри)
+        """
+        commands = []
+        pos = 0
+
+        while True:
+            start = -1
+            for flag in self.COMMAND_START_FLAGS:
+                index = buffer.find(flag, pos)
+                if index >= 0 and (start < 0 or index < start):
+                    start = index
+
+            if start < 0:
+                pos = len(buffer)
+                break
+
+            pos = start
+            if len(buffer) - pos < self.COMMAND_HEADER_LEN:
+                break
+
+            frame_len = self._get_command_length(buffer, pos)
+            if frame_len == 0:
+                # Непълна команда
+                break
+
+            if frame_len < 0:
+                pos += 1
+                continue
+
+            commands.append(self._parse_command(buffer[pos:pos + frame_len]))
+            pos += frame_len
+
+        del buffer[:pos]
+        return commands
+
+    @abstractmethod
+    def _get_command_length(self, buffer, pos):
+        """Връща дължината на валидна команда, 0 при непълна или -1 при невалидна."""
+        pass
+
+    @abstractmethod
+    def _parse_command(self, frame):
+        """Връща (код на командата, параметри) от пълна командна рамка."""
+        pass
+
+    @abstractmethod
+    def handle_command(self, session, command, params):
+        """Обработва команда и връща отговора.
+
+        Args:
+            session: Сесията, получила командата (inventory_active се променя тук)
+            command (int): Код на командата
+            params (bytes): Параметри на командата
+
+        Returns:
+            bytes: Отговор към хоста (празен, ако няма отговор)
+        """
+        pass
+
+    @abstractmethod
+    def build_tag_frames(self, tags):
+        """Кодира известия за тагове.
+
+        Args:
+            tags (list): Списък със SimulatedTag
+
+        Returns:
+            list: Списък с (рамка, брой тагове в рамката)
+        """
+        pass
+
+    def _checked_length(self, buffer, pos, frame_len):
+        """Проверява наличността и контролната сума на рамка с дължина frame_len."""
+        if len(buffer) - pos < frame_len:
+            return 0
+        if sum_checksum(buffer[pos:pos + frame_len - 1]) != buffer[pos + frame_len - 1]:
+            return -1
+        return frame_len
+
+
+class GeneralProtocol(SimulatorProtocol):
+    """Протокол на стандартен четец (0xA0 команди, 0xE4 отговори, 0xE0 известия)."""
+
+    START_CMD_FLAG = 0xA0
+    START_RSP_FLAG = 0xE4
+    START_NOTIFY_FLAG = 0xE0
+
+    CMD_NOTIFY_TAG = 0xFF
+    CMD_RESET_DEVICE = 0x65
+    CMD_STOP_INVENTORY = 0xFE
+    CMD_READ_TAG_BLOCK = 0x80
+    CMD_WRITE_TAG_BLOCK = 0x81
+    CMD_IDENTIFY_TAG = 0x82
+    CMD_KILL_TAG = 0x86
+    CMD_LOCK_TAG = 0x87
+
+    COMMAND_START_FLAGS = (bytes([START_CMD_FLAG]),)
+    COMMAND_HEADER_LEN = 2
+    # GeneralReader няма команда за старт - четецът изпраща тагове сам
+    AUTO_START_INVENTORY = True
+
+    STATUS_OK = 0x00
+    STATUS_FAIL = 0x01
+
+    def _get_command_length(self, buffer, pos):
+        """Дължината е байт 1 плюс флага и самия байт."""
+        cmd_len = buffer[pos + 1]
+        if cmd_len < 2:
+            return -1
+        return self._checked_length(buffer, pos, cmd_len + 2)
+
+    def _parse_command(self, frame):
+        """Командата е байт 2, параметрите са до контролната сума."""
+        return frame[2], bytes(frame[3:-1])
+
+    def _response(self, command, payload):
+        """Кодира отговор 0xE4."""
+        frame = bytearray([self.START_RSP_FLAG, len(payload) + 2, command])
+        frame += payload
+        frame.append(sum_checksum(frame))
+        return bytes(frame)
+
+    def handle_command(self, session, command, params):
+        """Обработва команда на GeneralReader."""
+        tag = session.population.get_tag(session.operation_index)
+
+        if command == self.CMD_STOP_INVENTORY:
+            session.inventory_active = False
+            return self._response(command, bytes([self.STATUS_OK]))
+
+        if command == self.CMD_RESET_DEVICE:
+            session.inventory_active = self.AUTO_START_INVENTORY
+            return self._response(command, bytes([self.STATUS_OK]))
+
+        if command == self.CMD_IDENTIFY_TAG:
+            if tag is None:
+                return self._response(command, bytes([self.STATUS_FAIL]))
+            return self._response(command, bytes([len(tag.epc)]) + tag.epc)
+
+        if command == self.CMD_READ_TAG_BLOCK and len(params) >= 4:
+            membank, addr, length = params[1], params[2], params[3]
+            data = tag.read_block(membank, addr, length) if tag is not None else None
+            if data is None:
+                return self._response(command, bytes([self.STATUS_FAIL]))
+            return self._response(command, bytes([self.STATUS_OK, membank, addr, length]) + data)
+
+        if command == self.CMD_WRITE_TAG_BLOCK and len(params) >= 5:
+            membank, addr, length = params[2], params[3], params[4]
+            data = params[5:5 + length * 2]
+            status = self.STATUS_FAIL
+            if tag is not None and len(data) == length * 2 and tag.write_block(membank, addr, data) == 0:
+                status = self.STATUS_OK
+            return self._response(command, bytes([status]))
+
+        if command in (self.CMD_LOCK_TAG, self.CMD_KILL_TAG):
+            return self._response(command, bytes([self.STATUS_OK if tag is not None else self.STATUS_FAIL]))
+
+        return b''
+
+    def build_tag_frames(self, tags):
+        """Едно известие 0xE0 на таг: FF, номер на устройството, дължина, EPC."""
+        frames = []
+
+        for tag in tags:
+            frame = bytearray([self.START_NOTIFY_FLAG, len(tag.epc) + 4, self.CMD_NOTIFY_TAG,
+                               self.address & 0xFF, len(tag.epc)])
+            frame += tag.epc
+            frame.append(sum_checksum(frame))
+            frames.append((bytes(frame), 1))
+
+        return frames
+
+
+class MReaderProtocol(SimulatorProtocol):
+    """Протокол на M четец ('RF' рамки с TLV параметри)."""
+
+    FRAME_TYPE_COMMAND = 0
+    FRAME_TYPE_RESPONSE = 1
+    FRAME_TYPE_NOTIFY = 2
+
+    CMD_RESET = 0x10
+    CMD_INVENTORY = 0x21
+    CMD_INVENTORY_ONCE = 0x22
+    CMD_STOP = 0x23
+    CMD_RELAY = 0x4C
+    NOTIFY_TAG = 0x80
+
+    TLV_EPC = 0x01
+    TLV_RSSI = 0x05
+    TLV_STATUS = 0x07
+    TLV_ANTENNA = 0x08
+    TLV_TAG = 0x50
+
+    COMMAND_START_FLAGS = (b'RF',)
+    COMMAND_HEADER_LEN = 8
+
+    def _get_command_length(self, buffer, pos):
+        """Проверява и двете тълкувания на полето за дължина.
+
+        MRfidReader записва в полето дължина на параметрите плюс 3, а
+        протоколът UHF - само дължината на параметрите.
+        """
+        if buffer[pos + 2] != self.FRAME_TYPE_COMMAND:
+            return -1
+
+        field_len = (buffer[pos + 6] << 8) | buffer[pos + 7]
+        incomplete = False
+
+        for frame_len in (field_len + 6, field_len + 9):
+            if frame_len < 9:
+                continue
+            result = self._checked_length(buffer, pos, frame_len)
+            if result > 0:
+                return result
+            if result == 0:
+                incomplete = True
+
+        return 0 if incomplete else -1
+
+    def _parse_command(self, frame):
+        """Командата е байт 5, параметрите са от байт 8 до контролната сума."""
+        return frame[5], bytes(frame[8:-1])
+
+    def _frame(self, frame_type, command, payload):
+        """Кодира 'RF' рамка с полето за дължина, което очаква MRfidReader."""
+        frame = bytearray(b'RF')
+        frame += bytes([frame_type, (self.address >> 8) & 0xFF, self.address & 0xFF, command,
+                        (len(payload) >> 8) & 0xFF, len(payload) & 0xFF])
+        frame += payload
+        frame.append(sum_checksum(frame))
+        return bytes(frame)
+
+    def handle_command(self, session, command, params):
+        """Обработва команда на MRfidReader."""
+        status = bytes([self.TLV_STATUS, 1, 0])
+
+        if command == self.CMD_INVENTORY:
+            session.inventory_active = True
+        elif command == self.CMD_STOP:
+            session.inventory_active = False
+        elif command == self.CMD_RESET:
+            session.inventory_active = False
+        elif command == self.CMD_INVENTORY_ONCE:
+            tag = session.population.get_tag(session.operation_index)
+            response = self._frame(self.FRAME_TYPE_RESPONSE, command, status)
+            if tag is not None:
+                response += self.build_tag_frames([tag])[0][0]
+            return response
+        elif command != self.CMD_RELAY:
+            return b''
+
+        return self._frame(self.FRAME_TYPE_RESPONSE, command, status)
+
+    def build_tag_frames(self, tags):
+        """Едно известие на таг с TLV 0x50 { EPC, RSSI, антена }.
+
+        EPC е първият вложен TLV, както очаква MRfidReaderNotifyImpl.
+        """
+        frames = []
+
+        for tag in tags:
+            tag_tlv = bytes([self.TLV_EPC, len(tag.epc)]) + tag.epc
+            tag_tlv += bytes([self.TLV_RSSI, 1, tag.rssi, self.TLV_ANTENNA, 1, tag.antenna])
+            payload = bytes([self.TLV_TAG, len(tag_tlv)]) + tag_tlv
+            frames.append((self._frame(self.FRAME_TYPE_NOTIFY, self.NOTIFY_TAG, payload), 1))
+
+        return frames
+
+
+class R2000Protocol(SimulatorProtocol):
+    """Протокол на R2000 четец (0xAA команди, 0xBB отговори)."""
+
+    START_CMD_FLAG = 0xAA
+    START_RSP_FLAG = 0xBB
+
+    CMD_TAG_NOTIFY = 0x10
+    CMD_STOP_INVENTORY = 0x31
+    CMD_START_INVENTORY = 0x32
+    CMD_RESET_DEVICE = 0x65
+
+    # R2000ReaderNotifyImpl чете EPC с фиксирана дължина
+    EPC_LENGTH = 12
+    # Най-много тагове в една рамка (дължината е до 255 байта)
+    MAX_TAGS_PER_FRAME = 20
+
+    COMMAND_START_FLAGS = (bytes([START_CMD_FLAG]),)
+    COMMAND_HEADER_LEN = 3
+
+    def _get_command_length(self, buffer, pos):
+        """Дължината е в байтове 1-2 (без флага и самите байтове)."""
+        cmd_len = (buffer[pos + 1] << 8) | buffer[pos + 2]
+        if cmd_len < 4 or cmd_len > 255:
+            return -1
+        return self._checked_length(buffer, pos, cmd_len + 3)
+
+    def _parse_command(self, frame):
+        """Командата е байт 5, параметрите са до контролната сума."""
+        return frame[5], bytes(frame[6:-1])
+
+    def _frame(self, command, payload):
+        """Кодира рамка 0xBB."""
+        frame_len = len(payload) + 4
+        frame = bytearray([self.START_RSP_FLAG, (frame_len >> 8) & 0xFF, frame_len & 0xFF,
+                           (self.address >> 8) & 0xFF, self.address & 0xFF, command])
+        frame += payload
+        frame.append(sum_checksum(frame))
+        return bytes(frame)
+
+    def handle_command(self, session, command, params):
+        """Обработва команда на R2000Reader."""
+        if command == self.CMD_START_INVENTORY:
+            session.inventory_active = True
+        elif command == self.CMD_STOP_INVENTORY:
+            session.inventory_active = False
+        elif command == self.CMD_RESET_DEVICE:
+            session.inventory_active = False
+        else:
+            return b''
+
+        return self._frame(command, b'\x00')
+
+    def build_tag_frames(self, tags):
+        """Рамки 0x10 със статус, брой тагове и по 12 байта EPC на таг."""
+        frames = []
+
+        for start in range(0, len(tags), self.MAX_TAGS_PER_FRAME):
+            group = tags[start:start + self.MAX_TAGS_PER_FRAME]
+            payload = bytearray([0x00, (len(group) >> 8) & 0xFF, len(group) & 0xFF])
+            for tag in group:
+                payload += tag.epc[:self.EPC_LENGTH].ljust(self.EPC_LENGTH, b'\x00')
+            frames.append((self._frame(self.CMD_TAG_NOTIFY, payload), len(group)))
+
+        return frames
+
+
+PROTOCOLS = {
+    'general': GeneralProtocol,
+    'm': MReaderProtocol,
+    'r2000': R2000Protocol,
+}
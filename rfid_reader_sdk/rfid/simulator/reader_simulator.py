@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Локален симулатор на RFID четец през TCP или UDP.
+
+Симулаторът слуша на локален адрес, приема командите на SDK и по време на
+инвентаризация изпраща известия за таговете от TagPopulation с
+зададена честота (тагове в секунда).
+"""
+
+import selectors
+import socket
+import threading
+import time
+
+from rfid.simulator.protocols import PROTOCOLS
+from rfid.simulator.tag_population import TagPopulation
+
+
+class SimulatorSession:
+    """Връзка на хост към симулирания четец."""
+
+    # Максимален размер на неизпратените данни, преди генерирането да спре
+    MAX_PENDING_BYTES = 1 << 20
+
+    def __init__(self, simulator, sock=None, peer_addr=None):
+        """Инициализация на сесията.
+
+        Args:
+            simulator (ReaderSimulator): Симулаторът
+            sock (socket.socket): TCP сокет (None за UDP)
+            peer_addr (tuple): Адрес на хоста
+        """
+        self.simulator = simulator
+        self.population = simulator.population
+        self.sock = sock
+        self.peer_addr = peer_addr
+        self.recv_buff = bytearray()
+        self.send_buff = bytearray()
+        self.inventory_active = simulator.protocol.AUTO_START_INVENTORY
+        self.operation_index = 0
+        self.frame_index = 0
+        self.tag_credit = 0.0
+
+
+class ReaderSimulator:
+    """Симулиран четец, който говори протокола на избраната фамилия."""
+
+    TRANSPORT_TCP = 'tcp'
+    TRANSPORT_UDP = 'udp'
+
+    # Интервал на генериране на тагове
+    TICK_INTERVAL = 0.001
+    # Максимален размер на UDP дейтаграма с няколко рамки
+    MAX_DATAGRAM_SIZE = 1400
+
+    def __init__(self, family='general', transport=TRANSPORT_TCP, host='127.0.0.1', port=0,
+                 population=None, tag_rate=1000, address=0):
+        """Инициализация на симулатора.
+
+        Args:
+            family (str): Фамилия четци ('general', 'm' или 'r2000')
+            transport (str): 'tcp' или 'udp'
+            host (str): Локален адрес
+            port (int): Локален порт (0 - произволен свободен порт)
+            population (TagPopulation): Таговете в полето на четеца
+            tag_rate (float): Тагове в секунда по време на инвентаризация
+            address (int): Адрес (reader_id) на четеца
+        """
+        if family not in PROTOCOLS:
+            raise ValueError(f"Unknown reader family: {family}")
+
+        self.family = family
+        self.protocol = PROTOCOLS[family](address)
+        self.transport = transport
+        self.host = host
+        self.port = port
+        self.population = population if population is not None else TagPopulation()
+        self.tag_rate = tag_rate
+        self.sock = None
+        self.sessions = {}  # TCP сокет или UDP адрес -> SimulatorSession
+        self._selector = None
+        self._thread = None
+        self._running = False
+        self._tag_frames = self.protocol.build_tag_frames(self.population.tags)
+        # Статистика
+        self.commands_received = 0
+        self.tags_sent = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def get_address(self):
+        """Връща адреса, на който слуша симулаторът."""
+        return self.sock.getsockname() if self.sock else (self.host, self.port)
+
+    def get_statistics(self):
+        """Връща статистиката на симулатора."""
+        return {
+            'sessions': len(self.sessions),
+            'commands_received': self.commands_received,
+            'tags_sent': self.tags_sent,
+            'frames_sent': self.frames_sent,
+            'bytes_sent': self.bytes_sent,
+        }
+
+    def start(self):
+        """Отваря сокета и стартира нишката на симулатора.
+
+        Returns:
+            tuple: Адресът, на който слуша симулаторът
+        """
+        self._selector = selectors.DefaultSelector()
+
+        if self.transport == self.TRANSPORT_TCP:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind((self.host, self.port))
+            self.sock.listen(16)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind((self.host, self.port))
+
+        self.sock.setblocking(False)
+        self._selector.register(self.sock, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"ReaderSimulator-{self.family}", daemon=True)
+        self._thread.start()
+        return self.get_address()
+
+    def stop(self):
+        """Спира симулатора и затваря всички връзки."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+
+        for session in list(self.sessions.values()):
+            if session.sock is not None:
+                session.sock.close()
+        self.sessions.clear()
+
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+    def _run(self):
+        """Цикъл на симулатора."""
+        last_tick = time.perf_counter()
+
+        while self._running:
+            generating = any(session.inventory_active for session in self.sessions.values())
+            timeout = self.TICK_INTERVAL if generating or self._has_pending() else 0.1
+
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self.sock:
+                    if self.transport == self.TRANSPORT_TCP:
+                        self._accept()
+                    else:
+                        self._recv_datagrams()
+                else:
+                    self._recv_stream(key.data)
+
+            now = time.perf_counter()
+            elapsed = now - last_tick
+            last_tick = now
+
+            for session in list(self.sessions.values()):
+                if session.inventory_active:
+                    self._generate_tags(session, elapsed)
+                self._flush(session)
+
+    def _has_pending(self):
+        """Проверява за неизпратени данни."""
+        return any(session.send_buff for session in self.sessions.values())
+
+    def _accept(self):
+        """Приема нови TCP връзки."""
+        while True:
+            try:
+                sock, addr = self.sock.accept()
+            except (BlockingIOError, OSError):
+                return
+
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            session = SimulatorSession(self, sock, addr)
+            self.sessions[sock] = session
+            self._selector.register(sock, selectors.EVENT_READ, session)
+
+    def _close_session(self, session):
+        """Затваря TCP сесия."""
+        self.sessions.pop(session.sock, None)
+        try:
+            self._selector.unregister(session.sock)
+        except (KeyError, ValueError):
+            pass
+        session.sock.close()
+
+    def _recv_stream(self, session):
+        """Чете команди от TCP връзка."""
+        try:
+            data = session.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+
+        if not data:
+            self._close_session(session)
+            return
+
+        session.recv_buff += data
+        self._process_commands(session)
+
+    def _recv_datagrams(self):
+        """Чете команди от UDP хостове."""
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except (BlockingIOError, OSError):
+                return
+
+            session = self.sessions.get(addr)
+            if session is None:
+                # Адресът на UDP хоста става известен с първата му команда
+                session = SimulatorSession(self, None, addr)
+                self.sessions[addr] = session
+
+            session.recv_buff += data
+            self._process_commands(session)
+
+    def _process_commands(self, session):
+        """Обработва пълните команди в буфера на сесията."""
+        for command, params in self.protocol.decode_commands(session.recv_buff):
+            self.commands_received += 1
+            response = self.protocol.handle_command(session, command, params)
+            if response:
+                session.send_buff += response
+
+    def _generate_tags(self, session, elapsed):
+        """Добавя известия за тагове според честотата и изминалото време."""
+        frames = self._tag_frames
+        if not frames or len(session.send_buff) > SimulatorSession.MAX_PENDING_BYTES:
+            return
+
+        session.tag_credit += self.tag_rate * elapsed
+        send_buff = session.send_buff
+
+        while session.tag_credit >= 1:
+            frame, tag_count = frames[session.frame_index]
+            session.frame_index = (session.frame_index + 1) % len(frames)
+            send_buff += frame
+            session.tag_credit -= tag_count
+            self.tags_sent += tag_count
+            self.frames_sent += 1
+
+    def _flush(self, session):
+        """Изпраща натрупаните данни."""
+        if not session.send_buff:
+            return
+
+        try:
+            if session.sock is not None:
+                sent = session.sock.send(session.send_buff)
+            else:
+                sent = self._send_datagrams(session)
+        except BlockingIOError:
+            return
+        except OSError:
+            if session.sock is not None:
+                self._close_session(session)
+            else:
+                session.send_buff.clear()
+            return
+
+        self.bytes_sent += sent
+        del session.send_buff[:sent]
+
+    def _send_datagrams(self, session):
+        """Изпраща данните на UDP хоста на части до MAX_DATAGRAM_SIZE байта.
+
+        Рамките не се разделят между дейтаграми.
+        """
+        send_buff = session.send_buff
+        view = memoryview(send_buff)
+        sent = 0
+
+        try:
+            while sent < len(send_buff):
+                end = self._datagram_end(send_buff, sent)
+                self.sock.sendto(view[sent:end], session.peer_addr)
+                sent = end
+        finally:
+            view.release()
+
+        return sent
+
+    def _datagram_end(self, send_buff, start):
+        """Връща края на дейтаграма, която съдържа само цели рамки."""
+        limit = min(len(send_buff), start + self.MAX_DATAGRAM_SIZE)
+        end = start
+
+        while end < limit:
+            frame_len = self._frame_length(send_buff, end)
+            if end + frame_len > limit:
+                break
+            end += frame_len
+
+        # Рамка, по-голяма от лимита, се изпраща сама
+        return end if end > start else start + self._frame_length(send_buff, start)
+
+    def _frame_length(self, send_buff, pos):
+        """Дължина на изходяща рамка, започваща от pos."""
+        flag = send_buff[pos]
+        if flag == ord('R'):
+            return ((send_buff[pos + 6] << 8) | send_buff[pos + 7]) + 9
+        if flag == 0xBB:
+            return ((send_buff[pos + 1] << 8) | send_buff[pos + 2]) + 3
+        return send_buff[pos + 1] + 2
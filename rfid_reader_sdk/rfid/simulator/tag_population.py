@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Популация от симулирани тагове.
+"""
+
+import random
+
+
+class SimulatedTag:
+    """Симулиран таг с EPC и памет."""
+
+    def __init__(self, epc, rssi, antenna, tid=b''):
+        """Инициализация на тага.
+
+        Args:
+            epc (bytes): EPC на тага
+            rssi (int): Сила на сигнала (0-255)
+            antenna (int): Номер на антената, която вижда тага
+            tid (bytes): TID на тага
+        """
+        self.epc = epc
+        self.rssi = rssi
+        self.antenna = antenna
+        # Области на паметта: резервирана, EPC, TID, потребителска
+        self.memory = {
+            0: bytearray(8),
+            1: bytearray(4) + bytearray(epc),
+            2: bytearray(tid),
+            3: bytearray(64),
+        }
+
+    def read_block(self, membank, addr, length):
+        """Чете length думи (по 2 байта) от адрес addr.
+
+        Returns:
+            bytes: Данни или None, ако областта е невалидна
+        """
+        bank = self.memory.get(membank)
+        if bank is None:
+            return None
+
+        start = addr * 2
+        end = start + length * 2
+        if end > len(bank):
+            bank.extend(bytearray(end - len(bank)))
+
+        return bytes(bank[start:end])
+
+    def write_block(self, membank, addr, data):
+        """Записва данни от адрес addr (в думи).
+
+        Returns:
+            int: Резултат от операцията
+        """
+        bank = self.memory.get(membank)
+        if bank is None:
+            return -1
+
+        start = addr * 2
+        end = start + len(data)
+        if end > len(bank):
+            bank.extend(bytearray(end - len(bank)))
+
+        bank[start:end] = data
+        if membank == 1 and len(bank) >= 4:
+            self.epc = bytes(bank[4:])
+
+        return 0
+
+
+class TagPopulation:
+    """Набор от тагове в полето на симулирания четец."""
+
+    def __init__(self, size=100, epc_length=12, antennas=1, seed=0):
+        """Създава популацията.
+
+        Args:
+            size (int): Брой тагове
+            epc_length (int): Дължина на EPC в байтове
+            antennas (int): Брой антени, между които се разпределят таговете
+            seed (int): Начална стойност на генератора (за повторяемост)
+        """
+        generator = random.Random(seed)
+        self.tags = []
+
+        for index in range(size):
+            # Последните 4 байта са пореден номер, за да са EPC уникални
+            prefix = bytes(generator.getrandbits(8) for _ in range(max(0, epc_length - 4)))
+            epc = (prefix + index.to_bytes(4, 'big'))[-epc_length:]
+            tid = b'\xE2\x00' + bytes(generator.getrandbits(8) for _ in range(10))
+            self.tags.append(SimulatedTag(epc, generator.randint(0x40, 0xC0), index % antennas + 1, tid))
+
+    def __len__(self):
+        """Връща броя тагове."""
+        return len(self.tags)
+
+    def get_tag(self, index=0):
+        """Връща таг по индекс (тагът пред антената при единични операции)."""
+        if not self.tags:
+            return None
+        return self.tags[index % len(self.tags)]
@@ -8,4 +8,14 @@ from .transport import Transport
 from .transport_serial_port import TransportSerialPort
 from .transport_tcp_client import TransportTcpClient
 from .transport_udp import TransportUdp
-from .transport_thread_manager import TransportThreadManager
\ No newline at end of file
+from .transport_thread_manager import TransportThreadManager
+from .transport_asyncio import (
+    AsyncioTransport,
+    AsyncioTcpClientTransport,
+    AsyncioUdpTransport,
+    AsyncioSerialTransport,
+)
+from .transport_tcp_server import TransportTcpServer, TransportTcpServerConnection
+from .transport_udp_endpoint import TransportUdpEndpoint, TransportUdpShared
+
+from .transport_capture import CaptureWriter, CaptureReader, CaptureReplayer, TransportCapture, TransportReplay
\ No newline at end of file
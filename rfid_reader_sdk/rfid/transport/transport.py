@@ -54,4 +54,24 @@ class Transport(ABC):
         Returns:
             int: Брой прочетени байтове
         """
-        pass
\ No newline at end of file
+        pass
+
+    def read_data_into(self, data, offset=0):
+        """Четене на данни директно в буфер, започвайки от зададено отместване.
+
+        Подразбиращата се имплементация използва read_data върху memoryview
+        към свободната част на буфера. Наследниците я заменят с четене без
+        междинно копие (recv_into, recvfrom_into, readinto).
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        view = memoryview(data)[offset:]
+        try:
+            return self.read_data(view)
+        finally:
+            view.release()
\ No newline at end of file
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Asyncio транспорти за RFID четци.
+
+Транспортите работят директно в цикъла на събитията на asyncio, без
+ReceiveThread на TransportThreadManager. Получените байтове се подават на
+поточния декодер на четеца, така че се използват същите парсери на рамки
+като при синхронните транспорти.
+"""
+
+import asyncio
+import socket
+from abc import abstractmethod
+
+from rfid.transport.transport import Transport
+from rfid.transport.transport_serial_port import TransportSerialPort
+
+
+class _ReaderStreamProtocol(asyncio.BufferedProtocol):
+    """Поточен протокол, който записва директно в буфера на четеца."""
+
+    def __init__(self, owner, reader):
+        """Инициализация на протокола.
+
+        Args:
+            owner (AsyncioTransport): Транспортът, създал протокола
+            reader (RfidReader): Четецът, който обработва данните
+        """
+        self.owner = owner
+        self.reader = reader
+
+    def connection_made(self, transport):
+        """Извиква се при установяване на връзката."""
+        self.owner._on_connection_made(transport)
+
+    def get_buffer(self, sizehint):
+        """Връща свободната част на буфера на декодера."""
+        return self.reader.frame_decoder.get_write_buffer()
+
+    def buffer_updated(self, nbytes):
+        """Обработва байтовете, записани в буфера на декодера."""
+        self.reader.frame_decoder.commit(nbytes)
+        try:
+            self.reader.handle_message()
+        except Exception as e:
+            print(f"Error handling receive: {e}")
+
+    def eof_received(self):
+        """Затваря връзката, когато четецът я затвори."""
+        return False
+
+    def connection_lost(self, exc):
+        """Извиква се при прекъсване на връзката."""
+        self.owner._on_connection_lost(exc)
+
+    def pause_writing(self):
+        """Спира изпращането при пълен изходящ буфер."""
+        self.owner._pause_writing()
+
+    def resume_writing(self):
+        """Възобновява изпращането."""
+        self.owner._resume_writing()
+
+
+class _ReaderDatagramProtocol(asyncio.DatagramProtocol):
+    """Протокол за дейтаграми, който подава данните на четеца."""
+
+    def __init__(self, owner, reader):
+        """Инициализация на протокола.
+
+        Args:
+            owner (AsyncioTransport): Транспортът, създал протокола
+            reader (RfidReader): Четецът, който обработва данните
+        """
+        self.owner = owner
+        self.reader = reader
+
+    def connection_made(self, transport):
+        """Извиква се при създаване на сокета."""
+        self.owner._on_connection_made(transport)
+
+    def datagram_received(self, data, addr):
+        """Обработва получена дейтаграма."""
+        try:
+            self.reader.handle_data(data)
+        except Exception as e:
+            print(f"Error handling receive: {e}")
+
+    def error_received(self, exc):
+        """Извиква се при грешка при изпращане или получаване."""
+        print(f"UDP read error: {exc}")
+
+    def connection_lost(self, exc):
+        """Извиква се при затваряне на сокета."""
+        self.owner._on_connection_lost(exc)
+
+    def pause_writing(self):
+        """Спира изпращането при пълен изходящ буфер."""
+        self.owner._pause_writing()
+
+    def resume_writing(self):
+        """Възобновява изпращането."""
+        self.owner._resume_writing()
+
+
+class AsyncioTransport(Transport):
+    """Базов клас за транспорти върху asyncio."""
+
+    def __init__(self):
+        """Инициализация на транспорта."""
+        super().__init__()
+        self.asyncio_transport = None
+        self._write_paused = False
+        self._drain_waiters = []
+
+    def _on_connection_made(self, asyncio_transport):
+        """Запомня транспорта на asyncio след установяване на връзката."""
+        self.asyncio_transport = asyncio_transport
+        self.connect_status = self.CONNECT_STATUS_CONNECTED
+
+    def _on_connection_lost(self, exc):
+        """Освобождава чакащите drain() при прекъсване на връзката."""
+        if exc is not None:
+            print(f"Connection lost: {exc}")
+
+        self.asyncio_transport = None
+        self.connect_status = self.CONNECT_STATUS_DISCONNECT
+        self._resume_writing()
+
+    def _pause_writing(self):
+        """Отбелязва, че изходящият буфер е пълен."""
+        self._write_paused = True
+
+    def _resume_writing(self):
+        """Събужда чакащите drain()."""
+        self._write_paused = False
+
+        for waiter in self._drain_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+        self._drain_waiters.clear()
+
+    async def drain(self):
+        """Изчаква, докато изходящият буфер се освободи."""
+        if not self._write_paused:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    @abstractmethod
+    async def open(self, reader):
+        """Отваря връзката в текущия цикъл на събитията.
+
+        Args:
+            reader (RfidReader): Четецът, който обработва получените данни
+
+        Returns:
+            int: Резултат от операцията
+        """
+        pass
+
+    def request_local_resource(self):
+        """Заявка за локален ресурс.
+
+        Връзката се отваря асинхронно чрез open().
+
+        Returns:
+            int: Резултат от операцията
+        """
+        return 0 if self.asyncio_transport else -1
+
+    def release_resource(self):
+        """Освобождаване на ресурси.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if not self.asyncio_transport:
+            return 0
+
+        self.asyncio_transport.close()
+        self.asyncio_transport = None
+        self.connect_status = self.CONNECT_STATUS_DISCONNECT
+        return 0
+
+    def send_data(self, data, data_len):
+        """Изпращане на данни.
+
+        Args:
+            data (bytes): Данни за изпращане
+            data_len (int): Дължина на данните
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if not self.asyncio_transport:
+            return -1
+
+        self.asyncio_transport.write(bytes(data[:data_len]))
+        return 0
+
+    def read_data(self, data):
+        """Четене на данни.
+
+        Данните се подават на четеца от цикъла на събитията, затова тук
+        няма какво да се прочете.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        return 0
+
+
+class AsyncioTcpClientTransport(AsyncioTransport):
+    """TCP клиент транспорт върху asyncio."""
+
+    def __init__(self):
+        """Инициализация на TCP клиент транспорт."""
+        super().__init__()
+        self.remote_ip = None
+        self.remote_port = 0
+        self.local_ip = None
+        self.local_port = 0
+
+    def set_config(self, remote_ip, remote_port, local_ip, local_port):
+        """Задаване на конфигурация.
+
+        Args:
+            remote_ip (str): Отдалечен IP адрес
+            remote_port (int): Отдалечен порт
+            local_ip (str): Локален IP адрес
+            local_port (int): Локален порт
+        """
+        self.remote_ip = remote_ip
+        self.remote_port = remote_port
+        self.local_ip = local_ip
+        self.local_port = local_port
+
+    async def open(self, reader):
+        """Свързва се към четеца.
+
+        Args:
+            reader (RfidReader): Четецът, който обработва получените данни
+
+        Returns:
+            int: Резултат от операцията
+        """
+        loop = asyncio.get_running_loop()
+        local_addr = None
+
+        if self.local_ip is not None and self.local_port != 0:
+            local_addr = (self.local_ip, self.local_port)
+
+        try:
+            await loop.create_connection(
+                lambda: _ReaderStreamProtocol(self, reader),
+                self.remote_ip, self.remote_port, local_addr=local_addr)
+            return 0
+        except OSError as e:
+            print(f"TCP client connection error: {e}")
+            return -1
+
+
+class AsyncioUdpTransport(AsyncioTransport):
+    """UDP транспорт върху asyncio."""
+
+    def __init__(self):
+        """Инициализация на UDP транспорт."""
+        super().__init__()
+        self.remote_ip = ""
+        self.remote_port = 0
+        self.local_ip = ""
+        self.local_port = 0
+        self.dst_addr = None
+
+    def set_config(self, remote_ip, remote_port, local_ip, local_port):
+        """Задаване на конфигурация.
+
+        Args:
+            remote_ip (str): Отдалечен IP адрес
+            remote_port (int): Отдалечен порт
+            local_ip (str): Локален IP адрес
+            local_port (int): Локален порт
+        """
+        self.remote_ip = remote_ip
+        self.remote_port = remote_port
+        self.local_ip = local_ip
+        self.local_port = local_port
+        self.dst_addr = (self.remote_ip, self.remote_port)
+
+    async def open(self, reader):
+        """Създава UDP сокета.
+
+        Args:
+            reader (RfidReader): Четецът, който обработва получените данни
+
+        Returns:
+            int: Резултат от операцията
+        """
+        loop = asyncio.get_running_loop()
+        local_addr = None
+
+        if self.local_port != 0:
+            local_addr = (self.local_ip if self.local_ip else '', self.local_port)
+
+        try:
+            await loop.create_datagram_endpoint(
+                lambda: _ReaderDatagramProtocol(self, reader),
+                local_addr=local_addr, family=socket.AF_INET)
+            return 0
+        except OSError as e:
+            print(f"UDP socket error: {e}")
+            return -1
+
+    def send_data(self, data, data_len):
+        """Изпращане на данни.
+
+        Args:
+            data (bytes): Данни за изпращане
+            data_len (int): Дължина на данните
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if not self.asyncio_transport:
+            return -1
+
+        self.asyncio_transport.sendto(bytes(data[:data_len]), self.dst_addr)
+        return 0
+
+
+class AsyncioSerialTransport(TransportSerialPort):
+    """Сериен порт транспорт върху asyncio.
+
+    Файловият дескриптор на порта се наблюдава с loop.add_reader, затова
+    транспортът работи само с цикли на събитията, базирани на селектор
+    (POSIX).
+    """
+
+    def __init__(self):
+        """Инициализация на сериен порт транспорт."""
+        super().__init__()
+        self._loop = None
+        self._fd = None
+
+    async def open(self, reader):
+        """Отваря серийния порт и го регистрира в цикъла на събитията.
+
+        Args:
+            reader (RfidReader): Четецът, който обработва получените данни
+
+        Returns:
+            int: Резултат от операцията
+        """
+        result = self.request_local_resource()
+        if result != 0:
+            return result
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            fd = self.serial_port_channel.fileno()
+            loop.add_reader(fd, self._on_readable, reader)
+        except (AttributeError, NotImplementedError, OSError) as e:
+            print(f"Serial port asyncio error: {e}")
+            self.release_resource()
+            return -1
+
+        self._loop = loop
+        self._fd = fd
+        return 0
+
+    def _on_readable(self, reader):
+        """Обработва данните, когато портът е готов за четене."""
+        try:
+            reader.handle_recv()
+        except Exception as e:
+            print(f"Error handling serial port: {e}")
+
+    async def drain(self):
+        """Записът в серийния порт е синхронен, затова няма какво да се чака."""
+        return
+
+    def release_resource(self):
+        """Освобождаване на ресурси.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if self._loop is not None and self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._loop = None
+            self._fd = None
+
+        return super().release_resource()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Запис и възпроизвеждане на получените от четците данни.
+
+TransportCapture обвива реален транспорт и записва всеки прочетен блок
+байтове във файл заедно с монотонно време в наносекунди и ключа на четеца.
+CaptureReplayer подава записа обратно през handle_recv на четците с
+оригиналната скорост, N пъти по-бързо или възможно най-бързо.
+
+Формат на файла: заглавие MAGIC, следвано от записи. Ключовете на четците
+се записват веднъж (запис KEY) и после се указват с номер (запис DATA):
+
+    KEY:  <B тип><H номер><H дължина> ключ (UTF-8)
+    DATA: <B тип><H номер><q време в ns><I дължина> данни
+"""
+
+import struct
+import threading
+import time
+
+from rfid.transport.transport import Transport
+
+MAGIC = b'RFIDCAP\x01'
+
+RECORD_KEY = 1
+RECORD_DATA = 2
+
+_KEY_HEADER = struct.Struct('<BHH')
+_DATA_HEADER = struct.Struct('<BHqI')
+
+
+class CaptureWriter:
+    """Записва блокове данни от един или повече четци в един файл."""
+
+    def __init__(self, path):
+        """Отваря файла за запис.
+
+        Args:
+            path (str): Път до файла
+        """
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._key_ids = {}
+        self._lock = threading.Lock()
+        self.chunk_count = 0
+        self.byte_count = 0
+
+    def write(self, key, data, timestamp_ns=None):
+        """Записва блок данни.
+
+        Args:
+            key (str): Ключ на четеца
+            data (bytes): Получените данни
+            timestamp_ns (int): Монотонно време в ns (по подразбиране - текущото)
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        with self._lock:
+            if self._file is None:
+                return
+
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = len(self._key_ids)
+                encoded_key = str(key).encode('utf-8')
+                self._file.write(_KEY_HEADER.pack(RECORD_KEY, key_id, len(encoded_key)))
+                self._file.write(encoded_key)
+                self._key_ids[key] = key_id
+
+            self._file.write(_DATA_HEADER.pack(RECORD_DATA, key_id, timestamp_ns, len(data)))
+            self._file.write(data)
+            self.chunk_count += 1
+            self.byte_count += len(data)
+
+    def flush(self):
+        """Записва буферираните данни на диска."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """Затваря файла."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CaptureReader:
+    """Чете записите от файл, създаден от CaptureWriter."""
+
+    def __init__(self, path):
+        """Инициализация на четеца на записи.
+
+        Args:
+            path (str): Път до файла
+        """
+        self.path = path
+
+    def __iter__(self):
+        """Връща записите като (време в ns, ключ на четеца, данни)."""
+        keys = {}
+
+        with open(self.path, 'rb') as capture_file:
+            if capture_file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a capture file: {self.path}")
+
+            while True:
+                record_type = capture_file.read(1)
+                if not record_type:
+                    break
+
+                if record_type[0] == RECORD_KEY:
+                    header = record_type + capture_file.read(_KEY_HEADER.size - 1)
+                    if len(header) < _KEY_HEADER.size:
+                        break
+                    _, key_id, key_len = _KEY_HEADER.unpack(header)
+                    keys[key_id] = capture_file.read(key_len).decode('utf-8')
+
+                elif record_type[0] == RECORD_DATA:
+                    header = record_type + capture_file.read(_DATA_HEADER.size - 1)
+                    if len(header) < _DATA_HEADER.size:
+                        break
+                    _, key_id, timestamp_ns, data_len = _DATA_HEADER.unpack(header)
+                    data = capture_file.read(data_len)
+                    if len(data) < data_len:
+                        # Непълен последен запис (прекъснат запис)
+                        break
+                    yield timestamp_ns, keys.get(key_id), data
+
+                else:
+                    raise ValueError(f"Unknown capture record type: {record_type[0]}")
+
+
+class TransportCapture(Transport):
+    """Транспорт, който записва всички прочетени данни на друг транспорт.
+
+    Подходящ е за TCP клиент, UDP и сериен порт. Атрибутите на обвития
+    транспорт (client_socket, socket_channel, serial_port_channel и др.) са
+    достъпни директно, затова TransportThreadManager го регистрира както
+    оригиналния транспорт.
+    """
+
+    def __init__(self, transport, writer, key):
+        """Инициализация на транспорта.
+
+        Args:
+            transport (Transport): Обвитият транспорт
+            writer (CaptureWriter): Файлът за запис
+            key (str): Ключ на четеца, с който се маркират данните
+        """
+        super().__init__()
+        self.transport = transport
+        self.writer = writer
+        self.key = key
+
+    @classmethod
+    def attach(cls, reader, writer):
+        """Обвива транспорта на свързан четец.
+
+        Извиква се след connect_physical_interface и преди add_rfid_reader.
+
+        Args:
+            reader (RfidReader): Четецът
+            writer (CaptureWriter): Файлът за запис
+
+        Returns:
+            TransportCapture: Новият транспорт на четеца
+        """
+        capture = cls(reader.get_transport(), writer, reader.get_key())
+        reader.transport = capture
+        return capture
+
+    def __getattr__(self, name):
+        """Препраща непознатите атрибути към обвития транспорт."""
+        if name == 'transport':
+            raise AttributeError(name)
+        return getattr(self.transport, name)
+
+    def request_local_resource(self):
+        """Заявка за локален ресурс."""
+        return self.transport.request_local_resource()
+
+    def release_resource(self):
+        """Освобождаване на ресурси."""
+        self.writer.flush()
+        return self.transport.release_resource()
+
+    def send_data(self, data, data_len):
+        """Изпращане на данни."""
+        return self.transport.send_data(data, data_len)
+
+    def read_data(self, data):
+        """Четене на данни със запис на прочетеното.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        return self.read_data_into(data, 0)
+
+    def read_data_into(self, data, offset=0):
+        """Четене на данни директно в буфер със запис на прочетеното.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        recv_len = self.transport.read_data_into(data, offset)
+
+        if recv_len > 0:
+            self.writer.write(self.key, data[offset:offset + recv_len])
+
+        return recv_len
+
+
+class TransportReplay(Transport):
+    """Транспорт, който връща данни от запис вместо от четец.
+
+    Данните се подават от CaptureReplayer; изпратените команди се игнорират.
+    """
+
+    def __init__(self):
+        """Инициализация на транспорта."""
+        super().__init__()
+        self._pending = memoryview(b'')
+
+    def push(self, data):
+        """Задава следващия блок данни за прочитане."""
+        self._pending = memoryview(data)
+
+    def get_pending_len(self):
+        """Връща броя още непрочетени байтове от текущия блок."""
+        return len(self._pending)
+
+    def request_local_resource(self):
+        """Заявка за локален ресурс."""
+        self.connect_status = self.CONNECT_STATUS_CONNECTED
+        return 0
+
+    def release_resource(self):
+        """Освобождаване на ресурси."""
+        self._pending = memoryview(b'')
+        self.connect_status = self.CONNECT_STATUS_DISCONNECT
+        return 0
+
+    def send_data(self, data, data_len):
+        """Командите към четеца не се изпращат при възпроизвеждане."""
+        return 0
+
+    def read_data(self, data):
+        """Четене на данни."""
+        return self.read_data_into(data, 0)
+
+    def read_data_into(self, data, offset=0):
+        """Копира толкова от текущия блок, колкото се побира в буфера.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        recv_len = min(len(self._pending), len(data) - offset)
+        data[offset:offset + recv_len] = self._pending[:recv_len]
+        self._pending = self._pending[recv_len:]
+        return recv_len
+
+
+class CaptureReplayer:
+    """Възпроизвежда файл със запис през handle_recv на четците."""
+
+    def __init__(self, path, speed=1.0):
+        """Инициализация на възпроизвеждането.
+
+        Args:
+            path (str): Път до файла
+            speed (float): Множител на скоростта (1.0 - оригинална,
+                0 - възможно най-бързо)
+        """
+        self.path = path
+        self.speed = speed
+        self.reader_map = {}  # ключ от записа -> четец
+        self.chunk_count = 0
+        self.byte_count = 0
+        self.skipped_chunks = 0
+
+    def add_reader(self, reader, key=None):
+        """Добавя четец, който получава данните със зададения ключ.
+
+        Args:
+            reader (RfidReader): Четецът
+            key (str): Ключ в записа (по подразбиране - ключът на четеца)
+        """
+        transport = TransportReplay()
+        transport.request_local_resource()
+        reader.transport = transport
+        reader.frame_decoder.reset()
+        self.reader_map[key if key is not None else reader.get_key()] = reader
+
+    def run(self):
+        """Възпроизвежда целия запис.
+
+        Returns:
+            float: Продължителност на възпроизвеждането в секунди
+        """
+        reader_map = self.reader_map
+        speed = self.speed
+        first_timestamp = None
+        start = time.perf_counter()
+
+        for timestamp_ns, key, data in CaptureReader(self.path):
+            reader = reader_map.get(key)
+            if reader is None:
+                self.skipped_chunks += 1
+                continue
+
+            if speed > 0:
+                if first_timestamp is None:
+                    first_timestamp = timestamp_ns
+                delay = (timestamp_ns - first_timestamp) / 1e9 / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            transport = reader.get_transport()
+            transport.push(data)
+            while transport.get_pending_len() > 0:
+                reader.handle_recv()
+
+            self.chunk_count += 1
+            self.byte_count += len(data)
+
+        return time.perf_counter() - start
@@ -5,6 +5,7 @@
 Еквивалент на TransportSerialPort.java
 """
 
+import os
 import serial
 import serial.tools.list_ports
 from rfid.transport.transport import Transport
@@ -106,28 +107,43 @@ class TransportSerialPort(Transport):
         Args:
             data (bytearray): Буфер за прочетените данни
 
+        Returns:
+            int: Брой прочетени байтове
+        """
+        return self.read_data_into(data, 0)
+
+    def read_data_into(self, data, offset=0):
+        """Четене на данни директно в буфер (os.readv или readinto).
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
+
         Returns:
             int: Брой прочетени байтове
         """
         if not self.serial_port_channel:
             return -1
 
+        view = memoryview(data)[offset:]
         try:
             available = self.serial_port_channel.in_waiting
             if available == 0:
                 return 0
 
-            received = self.serial_port_channel.read(min(available, len(data)))
-            recv_len = len(received)
+            read_view = view[:min(available, len(view))]
 
-            if recv_len > 0:
-                for i in range(recv_len):
-                    data[i] = received[i]
+            # На POSIX четем директно от файловия дескриптор в буфера;
+            # readinto на pyserial минава през междинен bytes обект
+            if hasattr(os, 'readv') and hasattr(self.serial_port_channel, 'fd'):
+                return os.readv(self.serial_port_channel.fd, [read_view])
 
-            return recv_len
-        except serial.SerialException as e:
+            return self.serial_port_channel.readinto(read_view)
+        except (serial.SerialException, OSError) as e:
             print(f"Serial port read error: {e}")
             return -1
+        finally:
+            view.release()
 
     def __del__(self):
         """Деструктор."""
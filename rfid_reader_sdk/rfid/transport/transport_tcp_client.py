@@ -91,27 +91,35 @@ class TransportTcpClient(Transport):
         Args:
             data (bytearray): Буфер за прочетените данни
 
+        Returns:
+            int: Брой прочетени байтове
+        """
+        return self.read_data_into(data, 0)
+
+    def read_data_into(self, data, offset=0):
+        """Четене на данни директно в буфер чрез recv_into.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
+
         Returns:
             int: Брой прочетени байтове
         """
         if not self.client_socket:
             return -1
 
+        view = memoryview(data)[offset:]
         try:
-            received = self.client_socket.recv(len(data))
-            recv_len = len(received)
-
-            if recv_len > 0:
-                for i in range(recv_len):
-                    data[i] = received[i]
-
-            return recv_len
+            return self.client_socket.recv_into(view)
         except BlockingIOError:
             # Не блокирай, ако няма данни
             return 0
         except socket.error as e:
             print(f"TCP read error: {e}")
             return -1
+        finally:
+            view.release()
 
     def release_resource(self):
         """Освобождаване на ресурси.
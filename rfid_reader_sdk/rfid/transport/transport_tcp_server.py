@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+TCP сървър транспорт за RFID четци.
+
+Четците се свързват към един слушащ порт (например четци зад NAT, които
+са настроени да се свързват към колектор). Всяка приета връзка се
+свързва с инстанция на четец по адреса на отсрещната страна или по
+идентификатора на четеца в първата валидна рамка.
+"""
+
+import socket
+
+from rfid.message.frame_decoder import FrameDecoder
+from rfid.transport.transport_tcp_client import TransportTcpClient
+
+
+class TransportTcpServerConnection(TransportTcpClient):
+    """Транспорт за входяща връзка от четец към TransportTcpServer.
+
+    remote_ip/remote_port от конфигурацията задават очаквания адрес на
+    четеца (None/0 означава произволен), а local_ip/local_port - адреса, на
+    който слуша сървърът.
+    """
+
+    def __init__(self):
+        """Инициализация на транспорта."""
+        super().__init__()
+        self.server = None
+        self.peer_addr = None
+
+    def request_local_resource(self):
+        """Заявка за локален ресурс.
+
+        Връзката се установява от четеца, затова тук само се приема, че
+        транспортът чака входяща връзка.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        return 0
+
+    def attach_socket(self, server, client_socket, peer_addr):
+        """Свързва приета връзка с транспорта.
+
+        Args:
+            server (TransportTcpServer): Сървърът, приел връзката
+            client_socket (socket.socket): Сокетът на връзката
+            peer_addr (tuple): Адрес на четеца
+        """
+        self.server = server
+        self.client_socket = client_socket
+        self.peer_addr = peer_addr
+        self.connect_status = self.CONNECT_STATUS_CONNECTED
+
+    def read_data_into(self, data, offset=0):
+        """Четене на данни директно в буфер чрез recv_into.
+
+        При затворена от четеца връзка ресурсите се освобождават и
+        транспортът отново чака входяща връзка.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        if not self.client_socket:
+            return -1
+
+        view = memoryview(data)[offset:]
+        try:
+            recv_len = self.client_socket.recv_into(view)
+            if recv_len == 0 and len(view) > 0:
+                # Четецът е затворил връзката
+                self.release_resource()
+                return -1
+
+            return recv_len
+        except BlockingIOError:
+            return 0
+        except socket.error as e:
+            print(f"TCP server connection read error: {e}")
+            self.release_resource()
+            return -1
+        finally:
+            view.release()
+
+    def release_resource(self):
+        """Освобождаване на ресурси.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if self.client_socket and self.server:
+            self.server.connection_closed(self.client_socket)
+
+        self.peer_addr = None
+        return super().release_resource()
+
+
+class _PendingConnection:
+    """Приета връзка, чийто четец се разпознава по идентификатора в рамките."""
+
+    MAX_PENDING_BYTES = 4096
+
+    def __init__(self, server, client_socket, peer_addr):
+        """Инициализация на чакащата връзка.
+
+        Args:
+            server (TransportTcpServer): Сървърът, приел връзката
+            client_socket (socket.socket): Сокетът на връзката
+            peer_addr (tuple): Адрес на четеца
+        """
+        self.server = server
+        self.client_socket = client_socket
+        self.peer_addr = peer_addr
+        self.data = bytearray()
+
+    def get_key(self):
+        """Връща ключа на връзката."""
+        return f"TCP_PENDING:{self.peer_addr[0]}:{self.peer_addr[1]}"
+
+    def handle_recv(self):
+        """Чете данни и се опитва да разпознае четеца.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        try:
+            received = self.client_socket.recv(self.MAX_PENDING_BYTES)
+        except BlockingIOError:
+            return 0
+        except socket.error as e:
+            print(f"TCP server connection read error: {e}")
+            received = b''
+
+        if not received:
+            self.server.drop_pending(self)
+            return -1
+
+        self.data += received
+        reader = self.server.identify_reader(self.data)
+
+        if reader is not None:
+            self.server.attach_pending(self, reader)
+        elif len(self.data) >= self.MAX_PENDING_BYTES:
+            print(f"Unidentified reader connection from {self.peer_addr}")
+            self.server.drop_pending(self)
+
+        return 0
+
+
+class _ReaderIdProbe:
+    """Търси първата валидна рамка за даден четец и взема идентификатора от нея."""
+
+    def __init__(self, reader):
+        """Инициализация на пробата.
+
+        Args:
+            reader (RfidReader): Четецът, чийто формат на рамки се използва
+        """
+        self.reader = reader
+        self.FRAME_START_FLAGS = reader.FRAME_START_FLAGS
+        self.FRAME_HEADER_LEN = reader.FRAME_HEADER_LEN
+        self.CHECKSUM_TYPE = getattr(reader, 'CHECKSUM_TYPE', None)
+        self.reader_id = None
+
+    def _get_frame_length(self, message, start_pos):
+        """Делегира към формата на четеца."""
+        return self.reader._get_frame_length(message, start_pos)
+
+    def _calculate_checksum(self, message, start_pos, length):
+        """Делегира към формата на четеца."""
+        return self.reader._calculate_checksum(message, start_pos, length)
+
+    def notify_message_to_app(self, message, start_index):
+        """Запомня идентификатора от първата валидна рамка."""
+        if self.reader_id is None:
+            self.reader_id = self.reader._get_frame_reader_id(message, start_index)
+
+    def find_reader_id(self, data):
+        """Връща идентификатора от първата валидна рамка в data или None."""
+        decoder = FrameDecoder(self, max(len(data), 1))
+        decoder.feed(data)
+        return self.reader_id
+
+
+class TransportTcpServer:
+    """Слушащ TCP сокет, към който се свързват много четци.
+
+    Сървърът се регистрира в селектора на TransportThreadManager; неговият
+    handle_recv() приема всички чакащи връзки. Сокетите на приетите връзки
+    се регистрират в същия селектор чрез функциите, зададени със
+    set_selector_callbacks().
+    """
+
+    DEFAULT_BACKLOG = 128
+
+    def __init__(self, local_ip, local_port, backlog=DEFAULT_BACKLOG, recv_buffer_size=0, send_buffer_size=0):
+        """Инициализация на сървъра.
+
+        Args:
+            local_ip (str): Локален IP адрес (None или '' за всички интерфейси)
+            local_port (int): Локален порт
+            backlog (int): Дължина на опашката за приемане на връзки
+            recv_buffer_size (int): SO_RCVBUF за всяка връзка (0 - по подразбиране)
+            send_buffer_size (int): SO_SNDBUF за всяка връзка (0 - по подразбиране)
+        """
+        self.local_ip = local_ip
+        self.local_port = local_port
+        self.backlog = backlog
+        self.recv_buffer_size = recv_buffer_size
+        self.send_buffer_size = send_buffer_size
+        self.listen_socket = None
+        self.addr_map = {}  # (ip, port) -> четец; port 0 означава произволен порт
+        self.id_readers = []  # Четци, разпознавани по идентификатор
+        self.pending_connections = {}  # сокет -> _PendingConnection
+        self.reader_factory = None
+        self._register = None
+        self._unregister = None
+
+    def get_key(self):
+        """Връща ключа на сървъра."""
+        return f"TCP_SERVER:{self.local_ip}:{self.local_port}"
+
+    def set_selector_callbacks(self, register, unregister):
+        """Задава функциите за регистриране на сокети в селектора.
+
+        Args:
+            register (callable): register(sock, handler)
+            unregister (callable): unregister(sock)
+        """
+        self._register = register
+        self._unregister = unregister
+
+    def set_reader_factory(self, reader_factory):
+        """Задава функция, която създава четец за връзка от непознат адрес.
+
+        Args:
+            reader_factory (callable): reader_factory(peer_addr) -> RfidReader или None
+        """
+        self.reader_factory = reader_factory
+
+    def request_local_resource(self):
+        """Отваря слушащия сокет.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if self.listen_socket:
+            return 0
+
+        try:
+            self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listen_socket.bind((self.local_ip if self.local_ip else '', self.local_port))
+            self.listen_socket.listen(self.backlog)
+            self.listen_socket.setblocking(False)
+            return 0
+        except socket.error as e:
+            print(f"TCP server error: {e}")
+            if self.listen_socket:
+                self.listen_socket.close()
+                self.listen_socket = None
+            return -1
+
+    def release_resource(self):
+        """Затваря слушащия сокет и чакащите връзки.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        for pending in list(self.pending_connections.values()):
+            self.drop_pending(pending)
+
+        if not self.listen_socket:
+            return 0
+
+        if self._unregister:
+            self._unregister(self.listen_socket)
+
+        try:
+            self.listen_socket.close()
+            return 0
+        except socket.error as e:
+            print(f"TCP server close error: {e}")
+            return -1
+        finally:
+            self.listen_socket = None
+
+    def bind_reader(self, reader, peer_ip=None, peer_port=0):
+        """Свързва четец с очаквания адрес или с идентификатора му.
+
+        Args:
+            reader (RfidReader): Четецът
+            peer_ip (str): IP адрес на четеца или None за разпознаване по reader_id
+            peer_port (int): Порт на четеца или 0 за произволен порт
+        """
+        if peer_ip:
+            self.addr_map[(peer_ip, peer_port)] = reader
+        elif reader not in self.id_readers:
+            self.id_readers.append(reader)
+
+    def unbind_reader(self, reader):
+        """Премахва четеца от сървъра.
+
+        Args:
+            reader (RfidReader): Четецът
+        """
+        for addr in [addr for addr, bound in self.addr_map.items() if bound is reader]:
+            del self.addr_map[addr]
+
+        if reader in self.id_readers:
+            self.id_readers.remove(reader)
+
+    def handle_recv(self):
+        """Приема всички чакащи входящи връзки.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if not self.listen_socket:
+            return -1
+
+        while True:
+            try:
+                client_socket, peer_addr = self.listen_socket.accept()
+            except BlockingIOError:
+                break
+            except socket.error as e:
+                print(f"TCP accept error: {e}")
+                break
+
+            self._configure_socket(client_socket)
+            reader = self.addr_map.get(peer_addr) or self.addr_map.get((peer_addr[0], 0))
+
+            if reader is None and self.reader_factory is not None:
+                reader = self.reader_factory(peer_addr)
+                if reader is not None:
+                    self.bind_reader(reader, peer_addr[0], peer_addr[1])
+
+            if reader is not None:
+                self.attach_connection(reader, client_socket, peer_addr)
+            elif self.id_readers:
+                pending = _PendingConnection(self, client_socket, peer_addr)
+                self.pending_connections[client_socket] = pending
+                self._register(client_socket, pending)
+            else:
+                print(f"Unknown reader connection from {peer_addr}")
+                client_socket.close()
+
+        return 0
+
+    def _configure_socket(self, client_socket):
+        """Настройва сокета на приета връзка."""
+        client_socket.setblocking(False)
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        if self.recv_buffer_size > 0:
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+
+        if self.send_buffer_size > 0:
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+
+    def attach_connection(self, reader, client_socket, peer_addr, initial_data=None):
+        """Свързва приета връзка с четеца и я регистрира в селектора.
+
+        Предишната връзка на четеца (ако има такава) се затваря.
+
+        Args:
+            reader (RfidReader): Четецът
+            client_socket (socket.socket): Сокетът на връзката
+            peer_addr (tuple): Адрес на четеца
+            initial_data (bytes): Вече прочетени данни от връзката
+        """
+        transport = reader.get_transport()
+
+        if not isinstance(transport, TransportTcpServerConnection):
+            transport = TransportTcpServerConnection()
+            transport.set_config(peer_addr[0], peer_addr[1], self.local_ip, self.local_port)
+            reader.transport = transport
+
+        if transport.client_socket:
+            transport.release_resource()
+
+        if reader.get_key() is None:
+            reader.key = f"TCP_SERVER:{peer_addr[0]}:{peer_addr[1]}"
+
+        reader.connect_type = reader.CONNECT_TYPE_NET_TCP_SERVER
+        transport.attach_socket(self, client_socket, peer_addr)
+        reader.frame_decoder.reset()
+        self._register(client_socket, reader)
+
+        if initial_data:
+            reader.handle_data(initial_data)
+
+    def identify_reader(self, data):
+        """Търси четец, чийто идентификатор съвпада с този в рамките.
+
+        Args:
+            data (bytearray): Данни, получени от връзката
+
+        Returns:
+            RfidReader: Намереният четец или None
+        """
+        probed_ids = {}
+
+        for reader in self.id_readers:
+            # Форматът на рамките зависи само от класа на четеца
+            reader_class = type(reader)
+            if reader_class not in probed_ids:
+                probed_ids[reader_class] = _ReaderIdProbe(reader).find_reader_id(data)
+
+            reader_id = probed_ids[reader_class]
+            if reader_id is not None and reader_id == bytes(getattr(reader, 'reader_id', b'')):
+                return reader
+
+        return None
+
+    def attach_pending(self, pending, reader):
+        """Свързва разпозната чакаща връзка с четеца."""
+        del self.pending_connections[pending.client_socket]
+        self._unregister(pending.client_socket)
+        self.attach_connection(reader, pending.client_socket, pending.peer_addr, bytes(pending.data))
+
+    def drop_pending(self, pending):
+        """Затваря чакаща връзка."""
+        self.pending_connections.pop(pending.client_socket, None)
+        self._unregister(pending.client_socket)
+        pending.client_socket.close()
+
+    def connection_closed(self, client_socket):
+        """Премахва сокета на затворена връзка от селектора."""
+        if self._unregister:
+            self._unregister(client_socket)
@@ -5,25 +5,219 @@
 Еквивалент на TransportThreadManager.java
 """
 
+import bisect
+import collections
+import heapq
+import itertools
+import socket
 import threading
 import selectors
 import time
-from socket import socket
+import zlib
+
+from rfid.transport.transport_tcp_server import TransportTcpServer
+from rfid.transport.transport_udp_endpoint import TransportUdpShared
+
+
+class ReceiveShard:
+    """Селектор с отделна нишка за получаване, която обслужва част от четците.
+
+    Нишката блокира в select() до следващия таймер на шарда (или без
+    таймаут, ако няма таймери). Промени в регистрациите, спиране, изчакващи
+    команди и по-ранни таймери събуждат нишката чрез двойка свързани сокети.
+    """
+
+    # Интервал на проверка на серийни портове без файлов дескриптор
+    POLL_INTERVAL = 0.005
+
+    def __init__(self, index):
+        """Инициализация на шарда.
+
+        Args:
+            index (int): Номер на шарда
+        """
+        self.index = index
+        self.selector = selectors.DefaultSelector()
+        self.polled_readers = []  # Четци без файлов дескриптор (сериен порт на Windows)
+        self.lock = threading.RLock()
+        self.thread = None
+        self.pending_calls = collections.deque()  # Команди за изпълнение в нишката
+        self.timers = []  # Хийп с (момент по time.monotonic(), пореден номер, функция, аргументи)
+        self._timer_lock = threading.Lock()
+        self._timer_sequence = itertools.count()
+        self._wakeup_pending = False
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self.selector.register(self._wakeup_recv, selectors.EVENT_READ, self)
+        # Статистика
+        self.event_count = 0
+        self.busy_ns = 0
+        self.cpu_ns = 0
+
+    def get_load(self):
+        """Връща броя обслужвани източници на данни."""
+        return len(self.selector.get_map()) - 1 + len(self.polled_readers)
+
+    def wakeup(self):
+        """Събужда нишката, ако е блокирала в select()."""
+        if self._wakeup_pending:
+            return
+
+        self._wakeup_pending = True
+        try:
+            self._wakeup_send.send(b'\x00')
+        except (BlockingIOError, OSError):
+            # Буферът е пълен (нишката ще се събуди) или шардът е затворен
+            pass
+
+    def call_soon(self, callback, *args):
+        """Изпълнява callback(*args) в нишката на шарда.
+
+        Args:
+            callback (callable): Функция за изпълнение
+            *args: Аргументи на функцията
+        """
+        self.pending_calls.append((callback, args))
+        self.wakeup()
+
+    def call_later(self, delay, callback, *args):
+        """Изпълнява callback(*args) в нишката на шарда след delay секунди.
+
+        Args:
+            delay (float): Забавяне в секунди
+            callback (callable): Функция за изпълнение
+            *args: Аргументи на функцията
+        """
+        deadline = time.monotonic() + max(0.0, delay)
+
+        with self._timer_lock:
+            heapq.heappush(self.timers, (deadline, next(self._timer_sequence), callback, args))
+            earliest = self.timers[0][0] == deadline
+
+        # Нишката може да спи до по-късен таймер
+        if earliest:
+            self.wakeup()
+
+    def get_timer_timeout(self):
+        """Връща секундите до следващия таймер или None, ако няма таймери."""
+        with self._timer_lock:
+            if not self.timers:
+                return None
+            return max(0.0, self.timers[0][0] - time.monotonic())
+
+    def run_due_timers(self):
+        """Изпълнява таймерите, чийто момент е настъпил."""
+        now = time.monotonic()
+        timers = self.timers
+
+        while True:
+            with self._timer_lock:
+                if not timers or timers[0][0] > now:
+                    return
+                _, _, callback, args = heapq.heappop(timers)
+
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error handling timer: {e}")
+
+    def handle_recv(self):
+        """Изчиства сигнала за събуждане и изпълнява изчакващите команди.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self._wakeup_pending = False
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+        pending_calls = self.pending_calls
+        while pending_calls:
+            callback, args = pending_calls.popleft()
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error handling command: {e}")
+
+        return 0
+
+    def close(self):
+        """Затваря селектора и сокетите за събуждане."""
+        self.selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+        self.polled_readers.clear()
+        self.pending_calls.clear()
+        self.timers.clear()
+
+    def get_statistics(self):
+        """Връща статистиката на шарда.
+
+        Returns:
+            dict: Брой регистрации, четци, събития, време за обработка и CPU време
+        """
+        handlers = [key.data for key in list(self.selector.get_map().values()) if key.data is not self]
+
+        return {
+            'shard': self.index,
+            'registrations': len(handlers) + len(self.polled_readers),
+            'readers': sum(1 for handler in handlers if hasattr(handler, 'handle_message'))
+                       + len(self.polled_readers),
+            'events': self.event_count,
+            'pending_calls': len(self.pending_calls),
+            'timers': len(self.timers),
+            'busy_ns': self.busy_ns,
+            'cpu_ns': self.cpu_ns,
+        }
 
 
 class TransportThreadManager:
-    """Мениджър на транспортни нишки за RFID четци."""
+    """Мениджър на транспортни нишки за RFID четци.
+
+    Източниците на данни (сокети, серийни портове, слушащи сокети) се
+    разпределят между един или повече шардове - всеки със собствен селектор
+    и нишка. Разпределението е по консистентно хеширане на get_shard_key()
+    (или get_key()) на обработчика или към най-слабо натоварения шард.
+    """
+
+    # Начини за разпределяне на четците по шардове
+    SHARD_ASSIGN_CONSISTENT_HASH = 0
+    SHARD_ASSIGN_LEAST_LOAD = 1
+
+    # Брой виртуални възли на шард в кръга за консистентно хеширане
+    HASH_RING_REPLICAS = 64
 
     _instance = None
     _instance_lock = threading.Lock()
 
-    def __init__(self):
-        """Инициализация на мениджъра на транспортни нишки."""
-        self.selector = selectors.DefaultSelector()
+    def __init__(self, shard_count=1, shard_assignment=SHARD_ASSIGN_CONSISTENT_HASH):
+        """Инициализация на мениджъра на транспортни нишки.
+
+        Args:
+            shard_count (int): Брой шардове (нишки за получаване)
+            shard_assignment (int): Начин за разпределяне на четците
+        """
+        self.shards = [ReceiveShard(index) for index in range(max(1, shard_count))]
+        self.shard_assignment = shard_assignment
         self.reader_map = {}  # Речник с четци
-        self._receive_thread = None
+        self.tcp_servers = {}  # (локален IP, локален порт) -> TransportTcpServer
+        self.udp_endpoints = {}  # (локален IP, локален порт) -> TransportUdpEndpoint
+        self._registrations = {}  # файлов обект -> (шард, обработчик)
+        self._handler_shards = {}  # обработчик -> шард
+        self._registry_lock = threading.RLock()
+        self._hash_ring = []
+        self._hash_ring_shards = []
         self._running = False
 
+        ring = sorted((zlib.crc32(f"{shard.index}:{replica}".encode()), shard.index)
+                      for shard in self.shards for replica in range(self.HASH_RING_REPLICAS))
+        self._hash_ring = [point for point, _ in ring]
+        self._hash_ring_shards = [index for _, index in ring]
+
     @classmethod
     def get_instance(cls):
         """Връща инстанция на мениджъра на транспортни нишки.
@@ -39,12 +233,17 @@ class TransportThreadManager:
         return cls._instance
 
     @classmethod
-    def initialize_transport_manager(cls):
-        """Инициализация на мениджъра на транспортни нишки."""
+    def initialize_transport_manager(cls, shard_count=1, shard_assignment=SHARD_ASSIGN_CONSISTENT_HASH):
+        """Инициализация на мениджъра на транспортни нишки.
+
+        Args:
+            shard_count (int): Брой шардове (използва се при първото създаване)
+            shard_assignment (int): Начин за разпределяне на четците
+        """
         if cls._instance is None:
             with cls._instance_lock:
                 if cls._instance is None:
-                    cls._instance = cls()
+                    cls._instance = cls(shard_count, shard_assignment)
 
         cls.initialize_threads()
 
@@ -52,18 +251,152 @@ class TransportThreadManager:
     def initialize_threads(cls):
         """Инициализация на нишките."""
         instance = cls.get_instance()
-        if instance._receive_thread is None:
-            instance._running = True
-            instance._receive_thread = ReceiveThread(instance)
-            instance._receive_thread.start()
+        instance._running = True
+
+        for shard in instance.shards:
+            if shard.thread is None:
+                shard.thread = ReceiveThread(instance, shard)
+                shard.thread.start()
 
     def get_reader_iterator(self):
         """Връща итератор за речника с четци."""
         return self.reader_map.items()
 
+    @property
+    def selector(self):
+        """Селекторът на първия шард (за съвместимост)."""
+        return self.shards[0].selector
+
     def get_selector(self):
-        """Връща селектора за неблокиращо I/O."""
-        return self.selector
+        """Връща селектора за неблокиращо I/O (на първия шард)."""
+        return self.shards[0].selector
+
+    def get_shard_statistics(self):
+        """Връща статистиката на всички шардове.
+
+        Returns:
+            list: Речник със статистика за всеки шард
+        """
+        return [shard.get_statistics() for shard in self.shards]
+
+    def _select_shard(self, key):
+        """Избира шард за нов източник на данни.
+
+        Args:
+            key (str): Ключ на обработчика
+
+        Returns:
+            ReceiveShard: Избраният шард
+        """
+        if len(self.shards) == 1:
+            return self.shards[0]
+
+        if self.shard_assignment == self.SHARD_ASSIGN_LEAST_LOAD or key is None:
+            return min(self.shards, key=lambda shard: shard.get_load())
+
+        index = bisect.bisect(self._hash_ring, zlib.crc32(str(key).encode()))
+        if index == len(self._hash_ring):
+            index = 0
+        return self.shards[self._hash_ring_shards[index]]
+
+    @staticmethod
+    def _get_shard_key(handler):
+        """Връща ключа за консистентно хеширане на обработчик.
+
+        Args:
+            handler: Четец, сървър или общ сокет
+
+        Returns:
+            str: get_shard_key() на четците, get_key() на останалите или None
+        """
+        if hasattr(handler, 'get_shard_key'):
+            return handler.get_shard_key()
+
+        if hasattr(handler, 'get_key'):
+            return handler.get_key()
+
+        return None
+
+    def _register(self, fileobj, handler):
+        """Регистрира източник на данни в избрания шард.
+
+        Args:
+            fileobj: Сокет или сериен порт
+            handler: Обект с метод handle_recv() (четец, сървър, общ сокет)
+        """
+        with self._registry_lock:
+            shard = self._select_shard(self._get_shard_key(handler))
+            with shard.lock:
+                shard.selector.register(fileobj, selectors.EVENT_READ, handler)
+            self._registrations[fileobj] = (shard, handler)
+            self._handler_shards[handler] = shard
+
+        # Селекторите, базирани на select()/poll(), виждат новия дескриптор
+        # едва при следващото извикване
+        shard.wakeup()
+
+    def _unregister(self, fileobj):
+        """Премахва източник на данни от шарда му.
+
+        Args:
+            fileobj: Сокет или сериен порт
+        """
+        with self._registry_lock:
+            registration = self._registrations.pop(fileobj, None)
+            if registration is None:
+                return
+
+            shard, handler = registration
+            if self._handler_shards.get(handler) is shard:
+                del self._handler_shards[handler]
+
+            with shard.lock:
+                try:
+                    shard.selector.unregister(fileobj)
+                except (KeyError, ValueError):
+                    pass
+
+        shard.wakeup()
+
+    def _move_registration(self, fileobj, target_shard):
+        """Премества източник на данни в друг шард.
+
+        Докато се държат заключванията на двата шарда, никоя от нишките не
+        обработва събития, затова източникът не се обработва от две нишки.
+        """
+        source_shard, handler = self._registrations[fileobj]
+        first, second = sorted((source_shard, target_shard), key=lambda shard: shard.index)
+
+        with first.lock, second.lock:
+            source_shard.selector.unregister(fileobj)
+            target_shard.selector.register(fileobj, selectors.EVENT_READ, handler)
+
+        self._registrations[fileobj] = (target_shard, handler)
+        self._handler_shards[handler] = target_shard
+        target_shard.wakeup()
+
+    def rebalance(self):
+        """Изравнява натоварването на шардовете.
+
+        Използва се при разпределяне към най-слабо натоварения шард; при
+        консистентно хеширане разпределението зависи само от ключовете.
+        """
+        if self.shard_assignment != self.SHARD_ASSIGN_LEAST_LOAD or len(self.shards) == 1:
+            return
+
+        with self._registry_lock:
+            while True:
+                busiest = max(self.shards, key=lambda shard: shard.get_load())
+                idlest = min(self.shards, key=lambda shard: shard.get_load())
+                if busiest.get_load() - idlest.get_load() <= 1:
+                    break
+
+                fileobj = next((fileobj for fileobj, (shard, _) in self._registrations.items()
+                                if shard is busiest), None)
+                if fileobj is None:
+                    break
+
+                self._move_registration(fileobj, idlest)
 
     def add_rfid_reader(self, reader):
         """Добавя RFID четец към мениджъра.
@@ -79,81 +412,263 @@ class TransportThreadManager:
         if reader.connect_type == reader.CONNECT_TYPE_NET_TCP_CLIENT:
             transport = reader.get_transport()
             if hasattr(transport, 'client_socket') and transport.client_socket:
-                self.selector.register(transport.client_socket, selectors.EVENT_READ, reader)
+                self._register(transport.client_socket, reader)
 
         elif reader.connect_type == reader.CONNECT_TYPE_NET_TCP_SERVER:
-            # Не е реализирано
-            pass
+            transport = reader.get_transport()
+            server = self.get_tcp_server(transport.local_ip, transport.local_port)
+            if server is None:
+                server = TransportTcpServer(transport.local_ip, transport.local_port)
+                result = self.add_tcp_server(server)
+            if result == 0:
+                server.bind_reader(reader, transport.remote_ip, transport.remote_port)
 
         elif reader.connect_type == reader.CONNECT_TYPE_NET_UDP:
             transport = reader.get_transport()
-            if hasattr(transport, 'socket_channel') and transport.socket_channel:
-                self.selector.register(transport.socket_channel, selectors.EVENT_READ, reader)
+            if isinstance(transport, TransportUdpShared):
+                # Общият сокет се регистрира в селектора само веднъж
+                result = self.add_udp_endpoint(transport.endpoint)
+            elif hasattr(transport, 'socket_channel') and transport.socket_channel:
+                self._register(transport.socket_channel, reader)
 
         elif reader.connect_type == reader.CONNECT_TYPE_SERIALPORT:
-            # Серийните портове се проверяват в цикъла на нишката
-            pass
+            transport = reader.get_transport()
+            if hasattr(transport, 'serial_port_channel') and transport.serial_port_channel:
+                try:
+                    # На POSIX портът има файлов дескриптор и се наблюдава от селектора
+                    self._register(transport.serial_port_channel, reader)
+                except (ValueError, OSError):
+                    # Иначе портът се проверява в цикъла на нишката
+                    with self._registry_lock:
+                        shard = self._select_shard(self._get_shard_key(reader))
+                        with shard.lock:
+                            shard.polled_readers.append(reader)
+                        self._handler_shards[reader] = shard
+                        shard.wakeup()
 
         self.reader_map[reader.get_key()] = reader
         return result
 
+    def remove_rfid_reader(self, reader):
+        """Премахва RFID четец от мениджъра.
+
+        Транспортът на четеца не се затваря.
+
+        Args:
+            reader: RFID четецът за премахване
+
+        Returns:
+            int: Резултат от операцията
+        """
+        with self._registry_lock:
+            for fileobj in [fileobj for fileobj, (_, handler) in self._registrations.items()
+                            if handler is reader]:
+                self._unregister(fileobj)
+
+            for shard in self.shards:
+                if reader in shard.polled_readers:
+                    with shard.lock:
+                        shard.polled_readers.remove(reader)
+                    self._handler_shards.pop(reader, None)
+
+        for server in self.tcp_servers.values():
+            server.unbind_reader(reader)
+
+        transport = reader.get_transport()
+        if isinstance(transport, TransportUdpShared):
+            transport.endpoint.detach_transport(transport)
+
+        if self.reader_map.get(reader.get_key()) is reader:
+            del self.reader_map[reader.get_key()]
+
+        self.rebalance()
+        return 0
+
+    def get_reader_shard(self, reader):
+        """Връща шарда, който получава данните на четеца.
+
+        Args:
+            reader: RFID четецът
+
+        Returns:
+            ReceiveShard: Шардът на четеца
+        """
+        shard = self._handler_shards.get(reader)
+        if shard is None:
+            # Четци зад общ UDP сокет се обслужват от шарда на сокета
+            shard = self._handler_shards.get(getattr(reader.get_transport(), 'endpoint', None))
+        if shard is None:
+            shard = self._select_shard(self._get_shard_key(reader))
+        return shard
+
+    def post_command(self, reader, command, *args):
+        """Изпраща команда към четеца от нишката, която получава данните му.
+
+        Командата се изпълнява без да се чака следващото събитие от
+        селектора, а изпращането и обработката на отговорите на четеца не се
+        застъпват.
+
+        Args:
+            reader: RFID четецът
+            command (callable): Метод на четеца, например reader.inventory
+            *args: Аргументи на командата
+        """
+        self.get_reader_shard(reader).call_soon(command, *args)
+
+    def add_tcp_server(self, server):
+        """Добавя слушащ TCP сървър, към който се свързват четци.
+
+        Сървър със собствени настройки (backlog, размер на буферите) се
+        добавя преди четците; иначе add_rfid_reader създава сървър с
+        настройки по подразбиране.
+
+        Args:
+            server (TransportTcpServer): Сървърът
+
+        Returns:
+            int: Резултат от операцията
+        """
+        server_key = (server.local_ip or '', server.local_port)
+        if server_key in self.tcp_servers:
+            return 0 if self.tcp_servers[server_key] is server else -1
+
+        result = server.request_local_resource()
+        if result != 0:
+            return result
+
+        server.set_selector_callbacks(self._register_connection, self._unregister)
+        self._register(server.listen_socket, server)
+        self.tcp_servers[server_key] = server
+        return 0
+
+    def get_tcp_server(self, local_ip, local_port):
+        """Връща TCP сървъра, който слуша на зададения адрес, или None."""
+        return self.tcp_servers.get((local_ip or '', local_port))
+
+    def add_udp_endpoint(self, endpoint):
+        """Добавя общ UDP сокет, който разпределя дейтаграмите по четци.
+
+        Args:
+            endpoint (TransportUdpEndpoint): Общият сокет
+
+        Returns:
+            int: Резултат от операцията
+        """
+        endpoint_key = (endpoint.local_ip or '', endpoint.local_port)
+        if endpoint_key in self.udp_endpoints:
+            return 0 if self.udp_endpoints[endpoint_key] is endpoint else -1
+
+        result = endpoint.request_local_resource()
+        if result != 0:
+            return result
+
+        self._register(endpoint.socket_channel, endpoint)
+        self.udp_endpoints[endpoint_key] = endpoint
+        return 0
+
+    def _register_connection(self, sock, handler):
+        """Регистрира приета връзка в селектора."""
+        self._register(sock, handler)
+
+        # Четци, създадени от reader_factory на сървъра, също влизат в речника
+        if hasattr(handler, 'handle_message') and handler.get_key() not in self.reader_map:
+            self.reader_map[handler.get_key()] = handler
+
     def stop(self):
         """Спира мениджъра и неговите нишки."""
         self._running = False
-        if self._receive_thread and self._receive_thread.is_alive():
-            self._receive_thread.join(2.0)  # Изчаква нишката да приключи
+        for shard in self.shards:
+            shard.wakeup()
 
-        # Затваря всички селектори
-        if self.selector:
-            self.selector.close()
+        for shard in self.shards:
+            if shard.thread and shard.thread.is_alive():
+                shard.thread.join(2.0)  # Изчаква нишката да приключи
+
+        # Затваря слушащите сокети
+        for server in self.tcp_servers.values():
+            server.release_resource()
 
         # Освобождава ресурси на четците
         for reader in self.reader_map.values():
             if reader.transport:
                 reader.transport.release_resource()
 
+        # Затваря общите UDP сокети
+        for endpoint in self.udp_endpoints.values():
+            endpoint.release_resource()
+
+        # Затваря всички селектори
+        for shard in self.shards:
+            shard.close()
+
+        self.tcp_servers.clear()
+        self.udp_endpoints.clear()
+        self._registrations.clear()
+        self._handler_shards.clear()
         self.reader_map.clear()
 
 
 class ReceiveThread(threading.Thread):
-    """Нишка за получаване на данни от RFID четци."""
+    """Нишка за получаване на данни от RFID четците на един шард."""
 
-    def __init__(self, manager):
+    def __init__(self, manager, shard):
         """Инициализация на нишката.
 
         Args:
             manager (TransportThreadManager): Мениджърът на транспортни нишки
+            shard (ReceiveShard): Шардът, който нишката обслужва
         """
-        super().__init__()
+        super().__init__(name=f"RfidReceiveThread-{shard.index}")
         self.daemon = True  # Нишката ще се прекрати автоматично при изход
         self.manager = manager
+        self.shard = shard
 
     def run(self):
         """Изпълнява се при стартиране на нишката."""
+        shard = self.shard
+        selector = shard.selector
+        cpu_start = time.thread_time_ns()
+
         while self.manager._running:
-            # Проверява за събития в селектора
-            selector = self.manager.get_selector()
-            if selector:
-                events = selector.select(0.01)  # Малко изчакване за да не натоварва CPU
+            # Блокира до събитие или следващия таймер; серийните портове без
+            # файлов дескриптор изискват периодична проверка
+            timeout = shard.get_timer_timeout()
+            if shard.polled_readers and (timeout is None or timeout > shard.POLL_INTERVAL):
+                timeout = shard.POLL_INTERVAL
+            events = selector.select(timeout)
+
+            busy_start = time.perf_counter_ns()
+
+            with shard.lock:
+                selector_map = selector.get_map()
 
                 for key, mask in events:
                     if mask & selectors.EVENT_READ:
+                        # Източникът може да е преместен в друг шард след select()
+                        current_key = selector_map.get(key.fd)
+                        if current_key is None or current_key.data is not key.data:
+                            continue
+
                         reader = key.data
                         try:
                             reader.handle_recv()
                         except Exception as e:
                             print(f"Error handling receive: {e}")
 
-            # Проверява сериен порт
-            for reader in self.manager.reader_map.values():
-                if reader.connect_type == reader.CONNECT_TYPE_SERIALPORT:
+                shard.event_count += len(events)
+
+                # Проверява серийните портове, които не са в селектора. Непълните
+                # рамки се пазят от декодера, затова не се чака натрупване на данни.
+                for reader in shard.polled_readers:
                     transport = reader.get_transport()
                     if hasattr(transport, 'serial_port_channel') and transport.serial_port_channel:
                         try:
                             if transport.serial_port_channel.in_waiting > 0:
-                                time.sleep(0.05)  # Малко изчакване за натрупване на данни
                                 reader.handle_recv()
                         except Exception as e:
                             print(f"Error handling serial port: {e}")
 
-            time.sleep(0.01)  # Предотвратява 100% натоварване на CPU
\ No newline at end of file
+                shard.run_due_timers()
+
+            shard.busy_ns += time.perf_counter_ns() - busy_start
+            shard.cpu_ns = time.thread_time_ns() - cpu_start
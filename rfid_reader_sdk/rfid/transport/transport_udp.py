@@ -21,6 +21,8 @@ class TransportUdp(Transport):
         self.local_port = 0
         self.socket_channel = None
         self.dst_addr = None
+        # SO_RCVBUF на сокета (0 - по подразбиране на ОС)
+        self.recv_buffer_size = 0
 
     def set_config(self, remote_ip, remote_port, local_ip, local_port):
         """Задаване на конфигурация.
@@ -52,8 +54,10 @@ class TransportUdp(Transport):
             # Направи сокета неблокиращ
             self.socket_channel.setblocking(False)
 
+            if self.recv_buffer_size > 0:
+                self.socket_channel.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+
             if self.local_port != 0:
-                self.socket_channel.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
                 self.socket_channel.bind((self.local_ip if self.local_ip else '', self.local_port))
 
             self.connect_status = self.CONNECT_STATUS_GET_LOCAL_RESOURCE
@@ -91,19 +95,24 @@ class TransportUdp(Transport):
         Returns:
             int: Брой прочетени байтове
         """
-        if not self.socket_channel:
-            return -1
+        return self.read_data_into(data, 0)
 
-        try:
-            received, source_addr = self.socket_channel.recvfrom(len(data))
-            recv_len = len(received)
+    def read_data_into(self, data, offset=0):
+        """Четене на данни директно в буфер чрез recvfrom_into.
 
-            if recv_len > 0:
-                for i in range(recv_len):
-                    data[i] = received[i]
+        Args:
+            data (bytearray): Буфер за прочетените данни
+            offset (int): Отместване в буфера, от което да се записва
 
-                print(f"Received from: {source_addr}, length: {recv_len}")
+        Returns:
+            int: Брой прочетени байтове
+        """
+        if not self.socket_channel:
+            return -1
 
+        view = memoryview(data)[offset:]
+        try:
+            recv_len, source_addr = self.socket_channel.recvfrom_into(view)
             return recv_len
         except BlockingIOError:
             # Не блокирай, ако няма данни
@@ -111,6 +120,8 @@ class TransportUdp(Transport):
         except socket.error as e:
             print(f"UDP read error: {e}")
             return -1
+        finally:
+            view.release()
 
     def release_resource(self):
         """Освобождаване на ресурси.
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Общ UDP сокет за много RFID четци.
+
+Вместо отделен сокет за всеки TransportUdp, един TransportUdpEndpoint
+получава всички дейтаграми и ги насочва към съответния четец по адреса
+на изпращача (ip, port).
+"""
+
+import socket
+
+from rfid.transport.transport import Transport
+
+
+class TransportUdpShared(Transport):
+    """Транспорт на четец, който използва общ TransportUdpEndpoint."""
+
+    def __init__(self, endpoint):
+        """Инициализация на транспорта.
+
+        Args:
+            endpoint (TransportUdpEndpoint): Общият UDP сокет
+        """
+        super().__init__()
+        self.endpoint = endpoint
+        self.remote_ip = ""
+        self.remote_port = 0
+        self.dst_addr = None
+
+    def set_config(self, remote_ip, remote_port):
+        """Задаване на адреса на четеца.
+
+        Args:
+            remote_ip (str): Отдалечен IP адрес
+            remote_port (int): Отдалечен порт
+        """
+        self.remote_ip = remote_ip
+        self.remote_port = remote_port
+        self.dst_addr = (self.remote_ip, self.remote_port)
+
+    def request_local_resource(self):
+        """Заявка за локален ресурс.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        result = self.endpoint.request_local_resource()
+        if result == 0:
+            self.connect_status = self.CONNECT_STATUS_GET_LOCAL_RESOURCE
+        return result
+
+    def release_resource(self):
+        """Освобождаване на ресурси.
+
+        Общият сокет остава отворен за останалите четци.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        self.endpoint.detach_transport(self)
+        self.connect_status = self.CONNECT_STATUS_DISCONNECT
+        return 0
+
+    def send_data(self, data, data_len):
+        """Изпращане на данни.
+
+        Args:
+            data (bytes): Данни за изпращане
+            data_len (int): Дължина на данните
+
+        Returns:
+            int: Резултат от операцията
+        """
+        return self.endpoint.send_to(data, data_len, self.dst_addr)
+
+    def read_data(self, data):
+        """Четене на данни.
+
+        Дейтаграмите се подават на четеца от TransportUdpEndpoint.
+
+        Args:
+            data (bytearray): Буфер за прочетените данни
+
+        Returns:
+            int: Брой прочетени байтове
+        """
+        return 0
+
+
+class TransportUdpEndpoint:
+    """Общ UDP сокет, който разпределя дейтаграмите по четци."""
+
+    MAX_DATAGRAM_SIZE = 65536
+
+    def __init__(self, local_ip, local_port, recv_buffer_size=0):
+        """Инициализация на общия сокет.
+
+        Args:
+            local_ip (str): Локален IP адрес (None или '' за всички интерфейси)
+            local_port (int): Локален порт
+            recv_buffer_size (int): SO_RCVBUF на сокета (0 - по подразбиране)
+        """
+        self.local_ip = local_ip
+        self.local_port = local_port
+        self.recv_buffer_size = recv_buffer_size
+        self.socket_channel = None
+        self.route_map = {}  # (ip, port) -> четец; port 0 означава произволен порт
+        self.unknown_datagrams = 0
+        self._recv_buff = bytearray(self.MAX_DATAGRAM_SIZE)
+        self._recv_view = memoryview(self._recv_buff)
+
+    def get_key(self):
+        """Връща ключа на общия сокет."""
+        return f"UDP_ENDPOINT:{self.local_ip}:{self.local_port}"
+
+    def request_local_resource(self):
+        """Отваря и свързва сокета, ако още не е отворен.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if self.socket_channel:
+            return 0
+
+        try:
+            self.socket_channel = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket_channel.setblocking(False)
+
+            if self.recv_buffer_size > 0:
+                self.socket_channel.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+
+            self.socket_channel.bind((self.local_ip if self.local_ip else '', self.local_port))
+            return 0
+        except socket.error as e:
+            print(f"UDP socket error: {e}")
+            if self.socket_channel:
+                self.socket_channel.close()
+                self.socket_channel = None
+            return -1
+
+    def release_resource(self):
+        """Затваря общия сокет.
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if not self.socket_channel:
+            return 0
+
+        try:
+            self.socket_channel.close()
+            return 0
+        except socket.error as e:
+            print(f"UDP close error: {e}")
+            return -1
+        finally:
+            self.socket_channel = None
+
+    def attach_reader(self, reader, remote_ip, remote_port):
+        """Свързва четец с общия сокет.
+
+        Args:
+            reader (RfidReader): Четецът
+            remote_ip (str): IP адрес на четеца
+            remote_port (int): Порт на четеца (0 - приемане от произволен порт)
+
+        Returns:
+            int: Резултат от операцията
+        """
+        transport = TransportUdpShared(self)
+        transport.set_config(remote_ip, remote_port)
+        result = transport.request_local_resource()
+
+        reader.connect_type = reader.CONNECT_TYPE_NET_UDP
+        reader.key = f"UDP:{remote_ip}:{remote_port}"
+
+        if result == 0:
+            reader.transport = transport
+            self.route_map[(remote_ip, remote_port)] = reader
+
+        return result
+
+    def detach_transport(self, transport):
+        """Премахва маршрута на транспорта от общия сокет.
+
+        Args:
+            transport (TransportUdpShared): Транспортът на четеца
+        """
+        route = (transport.remote_ip, transport.remote_port)
+        reader = self.route_map.get(route)
+
+        if reader is not None and reader.get_transport() is transport:
+            del self.route_map[route]
+
+    def send_to(self, data, data_len, dst_addr):
+        """Изпраща дейтаграма към четец.
+
+        Args:
+            data (bytes): Данни за изпращане
+            data_len (int): Дължина на данните
+            dst_addr (tuple): Адрес на четеца
+
+        Returns:
+            int: Резултат от операцията
+        """
+        if not self.socket_channel:
+            return -1
+
+        try:
+            self.socket_channel.sendto(memoryview(data)[:data_len], dst_addr)
+            return 0
+        except socket.error as e:
+            print(f"UDP send error: {e}")
+            return -1
+
+    def handle_recv(self):
+        """Изчерпва сокета и подава всяка дейтаграма на четеца ѝ.
+
+        Returns:
+            int: Брой обработени дейтаграми или -1 при грешка
+        """
+        if not self.socket_channel:
+            return -1
+
+        route_map = self.route_map
+        recv_view = self._recv_view
+        datagrams = 0
+
+        while True:
+            try:
+                recv_len, source_addr = self.socket_channel.recvfrom_into(self._recv_buff)
+            except BlockingIOError:
+                break
+            except socket.error as e:
+                print(f"UDP read error: {e}")
+                return -1
+
+            datagrams += 1
+            reader = route_map.get(source_addr)
+            if reader is None:
+                reader = route_map.get((source_addr[0], 0))
+                if reader is None:
+                    self.unknown_datagrams += 1
+                    continue
+
+            try:
+                reader.handle_data(recv_view[:recv_len])
+            except Exception as e:
+                print(f"Error handling receive: {e}")
+
+        return datagrams
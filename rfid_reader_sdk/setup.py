@@ -19,16 +19,24 @@ setup(
         "rfid.reader": ["*"],
         "rfid.reader.uhf_protocol": ["*"],  # добавете новия подпакет
     },
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=[
         "pyserial>=3.5",
     ],
+    extras_require={
+        "numpy": ["numpy>=1.17"],
+    },
+    entry_points={
+        "console_scripts": [
+            "rfid-reader-simulator=rfid.simulator.__main__:main",
+            "rfid-benchmark=rfid.benchmarks.__main__:main",
+        ],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",